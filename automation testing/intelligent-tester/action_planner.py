@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Natural-language action planner shared by the FastAPI backends
+"""
+import re
+
+# Try to import pyahocorasick, fall back to a single regex scan if not available
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Every keyword the planner branches on
+KEYWORDS = (
+    "login", "search", "fill", "form", "add to cart", "add first", "verify",
+    "check", "screenshot", "title", "password", "email", "submit",
+)
+
+if AHOCORASICK_AVAILABLE:
+    # One automaton walk finds every keyword, however many there are
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Regex fallback: the lookahead lets overlapping keywords match, so a hit means the same as `in`
+_KEYWORDS_RE = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in KEYWORDS) + "))",
+    re.IGNORECASE
+)
+
+# Extraction patterns, compiled once
+EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PASSWORD_RE = re.compile(r'password[:\s]+([^\s,]+)', re.IGNORECASE)
+SEARCH_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'search for (.+?)(?:\s+and|\s+then|$)',
+    r'find (.+?)(?:\s+and|\s+then|$)',
+    r'look for (.+?)(?:\s+and|\s+then|$)'
+)]
+FORM_NAME_RE = re.compile(r'name ["\']([^"\']+)["\']', re.IGNORECASE)
+FORM_EMAIL_RE = re.compile(r'email ["\']([^"\']+)["\']', re.IGNORECASE)
+TITLE_RE = re.compile(r'title contains ["\']([^"\']+)["\']', re.IGNORECASE)
+
+def _scan_keywords(prompt):
+    """Return the set of planner keywords present in the prompt"""
+    if AHOCORASICK_AVAILABLE:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(prompt.lower())}
+    return {m.group(1).lower() for m in _KEYWORDS_RE.finditer(prompt)}
+
+# Site-specific targets and defaults a backend may override per call
+PLAN_DEFAULTS = {
+    "search_term": "test",
+    "search_box": "search",
+    "search_button": "button[type='submit']",
+    "first_product": ".product:first-child",
+}
+
+def generate_intelligent_action_plan(prompt, website_url, **overrides):
+    """Generate intelligent action plan with advanced NLP analysis"""
+    options = {**PLAN_DEFAULTS, **overrides}
+    actions = []
+    hits = _scan_keywords(prompt)
+    
+    # Always start with navigation
+    actions.append({
+        "type": "navigate",
+        "description": f"Navigate to {website_url}",
+        "target": website_url,
+        "value": "",
+        "timeout": 30000
+    })
+    
+    # Smart wait after navigation
+    actions.append({
+        "type": "wait",
+        "description": "Wait for page to fully load",
+        "target": "time",
+        "value": "3000",
+        "timeout": 5000
+    })
+    
+    # Advanced prompt analysis
+    if "login" in hits:
+        actions.extend(_generate_login_actions(prompt, hits))
+    
+    if "search" in hits:
+        actions.extend(_generate_search_actions(prompt, options))
+    
+    if "fill" in hits and "form" in hits:
+        actions.extend(_generate_form_actions(prompt, hits))
+    
+    if "add to cart" in hits or "add first" in hits:
+        actions.extend(_generate_cart_actions(prompt, options))
+    
+    if "verify" in hits or "check" in hits:
+        actions.extend(_generate_verification_actions(prompt, hits))
+    
+    # Always add screenshot if mentioned or at the end
+    if "screenshot" in hits or not any(a["type"] == "screenshot" for a in actions):
+        actions.append({
+            "type": "screenshot",
+            "description": "Take final screenshot",
+            "target": "",
+            "value": "",
+            "timeout": 5000
+        })
+    
+    return _assign_parallel_groups(actions)
+
+# Actions that only read page state and can safely run side by side
+_READ_ONLY_ACTIONS = {"verify", "screenshot"}
+
+def _assign_parallel_groups(actions):
+    """Give each run of consecutive read-only actions a shared parallel_group"""
+    group = 0
+    previous_read_only = False
+    for action in actions:
+        read_only = action["type"] in _READ_ONLY_ACTIONS
+        if not (read_only and previous_read_only):
+            group += 1
+        action["parallel_group"] = group
+        previous_read_only = read_only
+    return actions
+
+def _generate_login_actions(prompt, hits):
+    """Generate login-specific actions"""
+    actions = []
+    
+    actions.append({
+        "type": "click",
+        "description": "Click login button",
+        "target": "login",
+        "value": "",
+        "timeout": 10000
+    })
+    
+    # Extract email if present
+    email_match = EMAIL_RE.search(prompt)
+    email = email_match.group() if email_match else "jyoti@test.com"
+    
+    if "email" in hits or "@" in prompt:
+        actions.append({
+            "type": "type",
+            "description": "Enter email address",
+            "target": "email",
+            "value": email,
+            "timeout": 10000
+        })
+    
+    # Extract password if present
+    password_match = PASSWORD_RE.search(prompt)
+    password = password_match.group(1) if password_match else "123456"
+    
+    if "password" in hits:
+        actions.append({
+            "type": "type",
+            "description": "Enter password",
+            "target": "password",
+            "value": password,
+            "timeout": 10000
+        })
+    
+    actions.append({
+        "type": "click",
+        "description": "Submit login form",
+        "target": "button[type='submit']",
+        "value": "",
+        "timeout": 10000,
+        "post_wait": "networkidle"
+    })
+    
+    # A backend holding a saved login for this site can skip the whole block
+    for action in actions:
+        action["skip_if_authenticated"] = True
+    
+    return actions
+
+def _generate_search_actions(prompt, options):
+    """Generate search-specific actions"""
+    actions = []
+    
+    # Extract search term
+    search_term = options["search_term"]  # Default
+    for search_re in SEARCH_RES:
+        match = search_re.search(prompt)
+        if match:
+            search_term = match.group(1).strip().strip('"\'')
+            break
+    
+    actions.extend([
+        {
+            "type": "click",
+            "description": "Click search box",
+            "target": options["search_box"],
+            "value": "",
+            "timeout": 10000
+        },
+        {
+            "type": "type",
+            "description": f"Search for {search_term}",
+            "target": "search",
+            "value": search_term,
+            "timeout": 10000
+        },
+        {
+            "type": "click",
+            "description": "Submit search",
+            "target": options["search_button"],
+            "value": "",
+            "timeout": 10000,
+            "post_wait": "networkidle"
+        }
+    ])
+    
+    return actions
+
+def _generate_form_actions(prompt, hits):
+    """Generate form filling actions"""
+    actions = []
+    
+    # Extract name if present
+    name_match = FORM_NAME_RE.search(prompt)
+    name = name_match.group(1) if name_match else "John Doe"
+    
+    # Extract email if present
+    email_match = FORM_EMAIL_RE.search(prompt)
+    email = email_match.group(1) if email_match else "john.doe@example.com"
+    
+    actions.extend([
+        {
+            "type": "type",
+            "description": "Fill name field",
+            "target": "name",
+            "value": name,
+            "timeout": 10000
+        },
+        {
+            "type": "type",
+            "description": "Fill email field",
+            "target": "email",
+            "value": email,
+            "timeout": 10000
+        }
+    ])
+    
+    if "submit" in hits:
+        actions.append({
+            "type": "click",
+            "description": "Submit form",
+            "target": "button[type='submit']",
+            "value": "",
+            "timeout": 10000,
+            "post_wait": "networkidle"
+        })
+    
+    return actions
+
+def _generate_cart_actions(prompt, options):
+    """Generate shopping cart actions"""
+    return [
+        {
+            "type": "click",
+            "description": "Click first product",
+            "target": options["first_product"],
+            "value": "",
+            "timeout": 10000,
+            "post_wait": "networkidle"
+        },
+        {
+            "type": "click",
+            "description": "Add to cart",
+            "target": "add to cart",
+            "value": "",
+            "timeout": 10000
+        }
+    ]
+
+def _generate_verification_actions(prompt, hits):
+    """Generate verification actions"""
+    actions = []
+    
+    if "title" in hits:
+        title_match = TITLE_RE.search(prompt)
+        title_text = title_match.group(1) if title_match else "Example"
+        
+        actions.append({
+            "type": "verify",
+            "description": f"Verify page title contains '{title_text}'",
+            "target": "title",
+            "value": title_text,
+            "timeout": 5000
+        })
+    
+    return actions
@@ -4,14 +4,20 @@ Minimal backend that actually opens a browser and performs actions
 """
 import asyncio
 import json
+import logging
 import os
+import queue
+import random
 import subprocess
 import sys
 import time
 import uuid
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from typing import Any, Dict, List, Optional
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+from logging.handlers import QueueHandler, QueueListener
 import threading
 
 # Try to import Playwright
@@ -22,10 +28,55 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     print("⚠️  Playwright not available. Install with: pip install playwright")
 
+# Logging - records are queued and written to stderr by a background listener
+log_queue = queue.Queue(-1)
+logger = logging.getLogger("minimal_backend")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+
+# Session ids only need to be unique, not unguessable, so draw them from a
+# seeded PRNG instead of hitting os.urandom on every create
+_rng = random.Random(os.urandom(16))
+
+def fast_uuid():
+    """Return a random version-4 UUID string without a getrandom() syscall"""
+    return str(uuid.UUID(int=_rng.getrandbits(128), version=4))
+
+# Session state
+@dataclass(slots=True)
+class Session:
+    id: str
+    website_url: str
+    original_prompt: str
+    action_plan: Dict[str, Any]
+    created_at: str
+    total_actions: int
+    status: str = "pending"
+    successful_actions: int = 0
+    failed_actions: int = 0
+    screenshots: List[str] = field(default_factory=list)
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    total_duration: Optional[int] = None
+    error_summary: Optional[str] = None
+
+@dataclass(slots=True)
+class Execution:
+    browser: Any
+    start_time: float
+    current_action: int = 0
+
 # Global storage
 test_sessions = {}
 active_executions = {}
 
+# Each running session holds a Chromium process, so cap how many run at once
+MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", "4"))
+SESSION_SLOT_WAIT = 0.5  # seconds /execute waits for a free slot before answering 429
+session_slots = threading.BoundedSemaphore(MAX_CONCURRENT_SESSIONS)
+
 class BrowserAutomation:
     def __init__(self):
         self.playwright = None
@@ -56,6 +107,24 @@ class BrowserAutomation:
         if self.playwright:
             self.playwright.stop()
     
+    def _find_element(self, selectors):
+        """Return the first element matching any selector, or None"""
+        for selector in selectors:
+            try:
+                if ":has-text(" in selector:
+                    # query_selector doesn't resolve :has-text on every Playwright version
+                    element = self.page.locator(selector).first
+                    if element.count() > 0:
+                        return element
+                else:
+                    # query_selector returns None straight away on a miss
+                    element = self.page.query_selector(selector)
+                    if element:
+                        return element
+            except Exception:
+                continue
+        return None
+    
     def execute_action(self, action, session_id):
         """Execute a single action"""
         action_type = action["type"]
@@ -63,7 +132,7 @@ class BrowserAutomation:
         value = action.get("value", "")
         
         try:
-            print(f"🔄 Executing: {action['description']}")
+            logger.info("🔄 Executing: %s", action["description"])
             
             if action_type == "navigate":
                 self.page.goto(target, wait_until="networkidle")
@@ -80,16 +149,8 @@ class BrowserAutomation:
                         f"*:has-text('{target}'):visible"
                     ])
                 
-                element = None
-                for selector in selectors:
-                    try:
-                        element = self.page.locator(selector).first
-                        if element.count() > 0:
-                            break
-                    except:
-                        continue
-                
-                if element and element.count() > 0:
+                element = self._find_element(selectors)
+                if element:
                     element.click(timeout=10000)
                     result = f"Clicked element: {target}"
                 else:
@@ -108,17 +169,8 @@ class BrowserAutomation:
                         "input:visible"
                     ])
                 
-                element = None
-                for selector in selectors:
-                    try:
-                        element = self.page.locator(selector).first
-                        if element.count() > 0:
-                            break
-                    except:
-                        continue
-                
-                if element and element.count() > 0:
-                    element.clear()
+                element = self._find_element(selectors)
+                if element:
                     element.fill(value)
                     result = f"Typed '{value}' into {target}"
                 else:
@@ -130,7 +182,7 @@ class BrowserAutomation:
                 result = f"Waited {wait_time}ms"
                 
             elif action_type == "screenshot":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = f"{time.time_ns() // 1_000_000:013d}"
                 filename = f"{session_id}_{timestamp}.png"
                 filepath = os.path.join("screenshots", filename)
                 os.makedirs("screenshots", exist_ok=True)
@@ -140,12 +192,12 @@ class BrowserAutomation:
             else:
                 result = f"Action type '{action_type}' not implemented"
             
-            print(f"✅ {result}")
+            logger.info("✅ %s", result)
             return {"status": "success", "result": result, "error": None}
             
         except Exception as e:
             error_msg = str(e)
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return {"status": "failed", "result": None, "error": error_msg}
 
 def generate_action_plan(prompt, website_url):
@@ -199,24 +251,23 @@ def execute_test_session(session_id):
     browser_automation = None
     
     try:
-        print(f"🚀 Starting test execution for session {session_id}")
+        logger.info("🚀 Starting test execution for session %s", session_id)
         
         # Initialize browser
         browser_automation = BrowserAutomation()
         browser_automation.initialize()
         
-        active_executions[session_id] = {
-            "browser": browser_automation,
-            "current_action": 0,
-            "start_time": time.time()
-        }
+        active_executions[session_id] = Execution(
+            browser=browser_automation,
+            start_time=time.time()
+        )
         
         successful_actions = 0
         failed_actions = 0
         
         # Execute each action
-        for i, action in enumerate(session["action_plan"]["actions"]):
-            active_executions[session_id]["current_action"] = i
+        for i, action in enumerate(session.action_plan["actions"]):
+            active_executions[session_id].current_action = i
             
             result = browser_automation.execute_action(action, session_id)
             
@@ -229,19 +280,19 @@ def execute_test_session(session_id):
             time.sleep(1)
         
         # Update session with results
-        session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
-        session["successful_actions"] = successful_actions
-        session["failed_actions"] = failed_actions
-        session["total_duration"] = int(time.time() - active_executions[session_id]["start_time"])
+        session.status = "completed"
+        session.completed_at = datetime.utcnow().isoformat()
+        session.successful_actions = successful_actions
+        session.failed_actions = failed_actions
+        session.total_duration = int(time.time() - active_executions[session_id].start_time)
         
-        print(f"🎉 Test completed: {successful_actions} successful, {failed_actions} failed")
+        logger.info("🎉 Test completed: %d successful, %d failed", successful_actions, failed_actions)
         
     except Exception as e:
-        print(f"❌ Test execution failed: {e}")
-        session["status"] = "failed"
-        session["error_summary"] = str(e)
-        session["completed_at"] = datetime.utcnow().isoformat()
+        logger.error("❌ Test execution failed: %s", e)
+        session.status = "failed"
+        session.error_summary = str(e)
+        session.completed_at = datetime.utcnow().isoformat()
         
     finally:
         # Cleanup
@@ -249,6 +300,7 @@ def execute_test_session(session_id):
             browser_automation.cleanup()
         if session_id in active_executions:
             del active_executions[session_id]
+        session_slots.release()
 
 class RequestHandler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
@@ -295,12 +347,12 @@ class RequestHandler(BaseHTTPRequestHandler):
                 if session_id in active_executions:
                     exec_info = active_executions[session_id]
                     execution_status = {
-                        "current_action": exec_info["current_action"],
-                        "progress": (exec_info["current_action"] / len(session["action_plan"]["actions"])) * 100
+                        "current_action": exec_info.current_action,
+                        "progress": (exec_info.current_action / len(session.action_plan["actions"])) * 100
                     }
                 
                 response = {
-                    "session": session,
+                    "session": asdict(session),
                     "execution_status": execution_status
                 }
                 self.wfile.write(json.dumps(response).encode())
@@ -332,13 +384,13 @@ class RequestHandler(BaseHTTPRequestHandler):
         
         if path == '/api/tests/create':
             # Create test
-            session_id = str(uuid.uuid4())
+            session_id = fast_uuid()
             
             # Generate action plan
             actions = generate_action_plan(data["prompt"], data["website_url"])
             
             action_plan = {
-                "id": str(uuid.uuid4()),
+                "id": fast_uuid(),
                 "website_url": data["website_url"],
                 "actions": actions,
                 "confidence": 0.8,
@@ -348,18 +400,14 @@ class RequestHandler(BaseHTTPRequestHandler):
             }
             
             # Store session
-            test_sessions[session_id] = {
-                "id": session_id,
-                "website_url": data["website_url"],
-                "original_prompt": data["prompt"],
-                "action_plan": action_plan,
-                "status": "pending",
-                "created_at": datetime.utcnow().isoformat(),
-                "total_actions": len(actions),
-                "successful_actions": 0,
-                "failed_actions": 0,
-                "screenshots": []
-            }
+            test_sessions[session_id] = Session(
+                id=session_id,
+                website_url=data["website_url"],
+                original_prompt=data["prompt"],
+                action_plan=action_plan,
+                created_at=datetime.utcnow().isoformat(),
+                total_actions=len(actions)
+            )
             
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
@@ -384,14 +432,20 @@ class RequestHandler(BaseHTTPRequestHandler):
             
             session = test_sessions[session_id]
             
-            if session["status"] != "pending":
+            if session.status != "pending":
                 self.send_response(400)
                 self.end_headers()
                 return
             
+            # The slot is released by execute_test_session when it finishes
+            if not session_slots.acquire(timeout=SESSION_SLOT_WAIT):
+                self.send_response(429)
+                self.end_headers()
+                return
+            
             # Start execution in background thread
-            session["status"] = "running"
-            session["started_at"] = datetime.utcnow().isoformat()
+            session.status = "running"
+            session.started_at = datetime.utcnow().isoformat()
             
             thread = threading.Thread(target=execute_test_session, args=(session_id,))
             thread.daemon = True
@@ -428,11 +482,14 @@ def run_server():
         print("   playwright install")
         print()
     
+    log_listener.start()
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n🛑 Server stopped")
         httpd.shutdown()
+    finally:
+        log_listener.stop()
 
 if __name__ == "__main__":
     run_server()
@@ -2,19 +2,29 @@
 """
 Production-ready Intelligent Web Tester with Real Browser Automation
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import uvicorn
 import asyncio
+import hashlib
+import logging
 import os
-import json
+import orjson
+import queue
+import random
 import uuid
-import re
 import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from action_planner import generate_intelligent_action_plan
 
 # Try to import Playwright
 try:
@@ -24,13 +34,47 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     print("⚠️  Playwright not available. Install with: pip install playwright")
 
+# Try to import the Redis client (only used when REDIS_URL is set)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# Logging - records are queued and written to stderr by a background listener
+log_queue = queue.Queue(-1)
+logger = logging.getLogger("production_backend")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent Web Tester - Production",
     description="AI-powered web testing with real browser automation",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Parse JSON request bodies with orjson too, so both directions skip the stdlib json module
+class ORJSONRequest(Request):
+    async def json(self):
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+        
+        async def orjson_route_handler(request: Request):
+            return await route_handler(ORJSONRequest(request.scope, request.receive))
+        
+        return orjson_route_handler
+
+app.router.route_class = ORJSONRoute
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -45,10 +89,187 @@ os.makedirs("screenshots", exist_ok=True)
 os.makedirs("logs", exist_ok=True)
 app.mount("/screenshots", StaticFiles(directory="screenshots"), name="screenshots")
 
+# Session ids only need to be unique, not unguessable, so draw them from a
+# seeded PRNG instead of hitting os.urandom on every create
+_rng = random.Random(os.urandom(16))
+
+def fast_uuid():
+    """Return a random version-4 UUID string without a getrandom() syscall"""
+    return str(uuid.UUID(int=_rng.getrandbits(128), version=4))
+
+# Sessions are immutable: every update swaps in a new snapshot, so a reader
+# never sees one half-way through a change
+@dataclass(slots=True, frozen=True)
+class Session:
+    id: str
+    website_url: str
+    original_prompt: str
+    action_plan: Dict[str, Any]
+    created_at: str
+    total_actions: int
+    status: str = "pending"
+    successful_actions: int = 0
+    failed_actions: int = 0
+    screenshots: tuple = ()
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    total_duration: Optional[int] = None
+    error_summary: Optional[str] = None
+    action_results: tuple = ()
+
+def iso_from_ns(timestamp_ns):
+    """Format a time.time_ns() value like datetime.utcnow().isoformat()"""
+    return datetime.utcfromtimestamp(timestamp_ns / 1e9).isoformat()
+
+# Status endpoints only need second resolution, so reuse the formatted string
+_iso_cache = [0, ""]
+
+def cached_utc_iso():
+    """Current UTC time as ISO, reformatted at most once a second"""
+    now_ns = time.time_ns()
+    if now_ns - _iso_cache[0] > 1_000_000_000:
+        _iso_cache[0] = now_ns
+        _iso_cache[1] = iso_from_ns(now_ns)
+    return _iso_cache[1]
+
 # Global storage
-test_sessions = {}
+test_sessions: Dict[str, Session] = {}
 active_executions = {}
 
+# Creation-ordered index over test_sessions so list_tests can slice a page
+# without materialising every session
+session_ids = []
+session_positions = {}
+
+# Finished sessions are kept for SESSION_TTL seconds, then swept
+SESSION_TTL = int(os.getenv("SESSION_TTL_HOURS", "24")) * 3600
+SESSION_SWEEP_INTERVAL = 300  # seconds
+STREAM_POLL_INTERVAL = 0.5  # seconds between /stream checks while a run hasn't registered yet
+finished_sessions = {}  # session id -> time.time_ns() it finished
+session_sweeper = None
+
+# With REDIS_URL set, sessions live in Redis so every uvicorn worker sees the same
+# state; active_executions stays local since it holds the live browser
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = None
+
+async def save_session(session):
+    """Persist a session after it has been created or changed"""
+    if redis_client:
+        await redis_client.set(f"sess:{session.id}", orjson.dumps(session))
+    else:
+        test_sessions[session.id] = session
+
+async def load_session(session_id):
+    """Return a session by id, or None if it doesn't exist"""
+    if redis_client:
+        payload = await redis_client.get(f"sess:{session_id}")
+        if not payload:
+            return None
+        data = orjson.loads(payload)
+        data["screenshots"] = tuple(data["screenshots"])
+        data["action_results"] = tuple(data["action_results"])
+        return Session(**data)
+    return test_sessions.get(session_id)
+
+async def index_session(session_id):
+    """Append a new session to the creation-ordered index"""
+    if redis_client:
+        await redis_client.zadd("sess:index", {session_id: time.time()})
+    else:
+        session_positions[session_id] = len(session_ids)
+        session_ids.append(session_id)
+
+async def count_sessions():
+    """Return how many sessions have been created"""
+    if redis_client:
+        return await redis_client.zcard("sess:index")
+    return len(session_ids)
+
+async def session_position(session_id):
+    """Return a session's place in the creation order, or None if unknown"""
+    if redis_client:
+        return await redis_client.zrank("sess:index", session_id)
+    return session_positions.get(session_id)
+
+async def session_id_range(start, count):
+    """Return up to count session ids from the creation order, starting at start"""
+    if redis_client:
+        return [sid.decode() for sid in await redis_client.zrange("sess:index", start, start + count - 1)]
+    return session_ids[start:start + count]
+
+async def publish_progress(session_id, current_action):
+    """Share the running action index so any worker can report progress"""
+    if redis_client:
+        await redis_client.set(f"sess:{session_id}:progress", current_action)
+
+async def load_progress(session_id):
+    """Return the running action index, or None if the session isn't running"""
+    if session_id in active_executions:
+        return active_executions[session_id]["current_action"]
+    if redis_client:
+        current_action = await redis_client.get(f"sess:{session_id}:progress")
+        return int(current_action) if current_action is not None else None
+    return None
+
+_claimed_sessions = set()
+
+async def claim_session(session_id):
+    """Atomically reserve a session for execution; False if another request has it"""
+    if redis_client:
+        return bool(await redis_client.set(f"sess:{session_id}:run", 1, nx=True, ex=SESSION_TTL))
+    if session_id in _claimed_sessions:
+        return False
+    _claimed_sessions.add(session_id)
+    return True
+
+async def release_claim(session_id):
+    """Give up a claim taken by claim_session"""
+    if redis_client:
+        await redis_client.delete(f"sess:{session_id}:run")
+    else:
+        _claimed_sessions.discard(session_id)
+
+# Each running session holds a Chromium process, so cap how many run at once
+MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", "4"))
+SESSION_SLOT_WAIT = 0.5  # seconds /execute waits for a free slot before answering 429
+_SESSION_SEM = asyncio.Semaphore(MAX_CONCURRENT_SESSIONS)
+
+# Saved logins: browser storage state (cookies + localStorage) keyed by site and
+# account, so later sessions can skip replaying the login steps
+LOGIN_STATE_CACHE_SIZE = 32
+LOGIN_STATE_TTL = 30 * 60  # seconds, roughly a typical session cookie lifetime
+login_states = OrderedDict()
+
+def _login_cache_key(website_url, actions):
+    """Return the saved-login key for a plan, or None if it doesn't log in"""
+    login_actions = [a for a in actions if a.get("skip_if_authenticated")]
+    if not login_actions:
+        return None
+    email = next((a["value"] for a in login_actions if a["target"] == "email"), "")
+    password = next((a["value"] for a in login_actions if a["target"] == "password"), "")
+    # A different password must not reuse a saved login; only its digest goes into the key
+    return hash((website_url, email, hashlib.sha256(password.encode()).digest()))
+
+def get_login_state(key):
+    """Return a fresh saved login for key, dropping it if it has expired"""
+    entry = login_states.get(key)
+    if entry is None:
+        return None
+    saved_at, state = entry
+    if time.time() - saved_at > LOGIN_STATE_TTL:
+        del login_states[key]
+        return None
+    login_states.move_to_end(key)
+    return state
+
+def save_login_state(key, state):
+    """Remember a login, evicting the least recently used one when full"""
+    login_states[key] = (time.time(), state)
+    login_states.move_to_end(key)
+    while len(login_states) > LOGIN_STATE_CACHE_SIZE:
+        login_states.popitem(last=False)
+
 # Models
 class CreateTestRequest(BaseModel):
     website_url: str
@@ -59,34 +280,124 @@ class ExecuteTestRequest(BaseModel):
     session_id: str
     options: Optional[Dict[str, Any]] = None
 
+class SessionSummary(BaseModel):
+    id: str
+    website_url: str
+    status: str
+    total_actions: int
+    successful_actions: int
+    failed_actions: int
+    created_at: str
+
+class ListTestsResponse(BaseModel):
+    sessions: List[SessionSummary]
+    total: int
+    page: int
+    per_page: int
+    next_cursor: Optional[str] = None
+
+# Browser pool - Chromium is launched once at startup and reused by every
+# session; each session gets its own BrowserContext for isolation
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", str(MAX_CONCURRENT_SESSIONS)))
+# A slot holding None lost its browser and is relaunched by the next session that takes it
+BROWSER_POOL = asyncio.Queue()
+# Seconds a session waits for a free pooled browser before failing
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "120"))
+playwright_instance = None
+
+async def _launch_browser():
+    return await playwright_instance.chromium.launch(
+        headless=False,  # Show browser for demonstration
+        args=[
+            '--no-sandbox',
+            '--disable-setuid-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-web-security',
+            '--disable-features=VizDisplayCompositor'
+        ]
+    )
+
+async def start_browser_pool():
+    """Start Playwright and prelaunch the pooled browsers"""
+    global playwright_instance
+    if not PLAYWRIGHT_AVAILABLE:
+        return
+    
+    try:
+        playwright_instance = await async_playwright().start()
+        for _ in range(BROWSER_POOL_SIZE):
+            BROWSER_POOL.put_nowait(await _launch_browser())
+        logger.info("🌐 Browser pool ready with %d browsers", BROWSER_POOL.qsize())
+    except Exception as e:
+        logger.error("❌ Failed to start browser pool: %s", e)
+        if BROWSER_POOL.empty():
+            # Nothing launched: leave Playwright unset so sessions fail fast instead of waiting forever
+            if playwright_instance:
+                await playwright_instance.stop()
+                playwright_instance = None
+
+async def stop_browser_pool():
+    """Close every pooled browser and stop Playwright"""
+    global playwright_instance
+    while not BROWSER_POOL.empty():
+        browser = BROWSER_POOL.get_nowait()
+        if browser is None:
+            continue
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.error("Cleanup error: %s", e)
+    if playwright_instance:
+        await playwright_instance.stop()
+        playwright_instance = None
+
+def _write_file(path, data):
+    """Write bytes to a file (run in a worker thread)"""
+    with open(path, "wb") as f:
+        f.write(data)
+
 # Advanced Browser Automation Engine
 class AdvancedBrowserAutomation:
+    # Click fallbacks, tried one at a time in this order after the raw target
+    CLICK_FALLBACKS = (
+        "button:has-text('{t}')",
+        "a:has-text('{t}')",
+        "[aria-label*='{t}' i]",
+        "[title*='{t}' i]",
+        "*:has-text('{t}'):visible",
+        ".{slug}",
+        "#{slug}",
+        "input[value*='{t}' i]",
+    )
+    
     def __init__(self):
-        self.playwright = None
         self.browser = None
         self.page = None
         self.context = None
     
-    async def initialize(self):
-        """Initialize Playwright browser with advanced settings"""
-        if not PLAYWRIGHT_AVAILABLE:
+    async def acquire(self, storage_state=None):
+        """Check a browser out of the pool and open a fresh context on it"""
+        if not PLAYWRIGHT_AVAILABLE or playwright_instance is None:
             raise Exception("Playwright not available")
         
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=False,  # Show browser for demonstration
-            args=[
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
+        try:
+            browser = await asyncio.wait_for(BROWSER_POOL.get(), BROWSER_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise Exception(f"No browser became free within {BROWSER_ACQUIRE_TIMEOUT:.0f}s")
         
+        if browser is None or not browser.is_connected():
+            # The slot's browser died earlier; relaunch it now, keeping the slot if that fails too
+            try:
+                browser = await _launch_browser()
+            except Exception:
+                BROWSER_POOL.put_nowait(None)
+                raise
+        
+        self.browser = browser
         self.context = await self.browser.new_context(
             viewport={'width': 1280, 'height': 720},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            storage_state=storage_state
         )
         
         self.page = await self.context.new_page()
@@ -95,19 +406,22 @@ class AdvancedBrowserAutomation:
         self.page.set_default_timeout(30000)
         self.page.set_default_navigation_timeout(30000)
         
-    async def cleanup(self):
-        """Clean up browser resources"""
+    async def release(self):
+        """Close the session's context and hand the browser back to the pool"""
         try:
-            if self.page:
-                await self.page.close()
             if self.context:
                 await self.context.close()
-            if self.browser:
-                await self.browser.close()
-            if self.playwright:
-                await self.playwright.stop()
         except Exception as e:
-            print(f"Cleanup error: {e}")
+            logger.error("Cleanup error: %s", e)
+        
+        if self.browser:
+            # A browser that crashed during the session goes back as an empty slot;
+            # the next acquire relaunches it, so the pool never shrinks
+            BROWSER_POOL.put_nowait(self.browser if self.browser.is_connected() else None)
+        
+        self.browser = None
+        self.context = None
+        self.page = None
     
     async def execute_action(self, action, session_id):
         """Execute a single action with advanced error handling"""
@@ -116,7 +430,7 @@ class AdvancedBrowserAutomation:
         value = action.get("value", "")
         
         try:
-            print(f"🔄 Executing: {action['description']}")
+            logger.info("🔄 Executing: %s", action["description"])
             
             if action_type == "navigate":
                 await self.page.goto(target, wait_until="networkidle", timeout=30000)
@@ -129,8 +443,9 @@ class AdvancedBrowserAutomation:
                 
                 element = await self._find_element_with_fallback(selectors)
                 if element:
-                    await element.scroll_into_view_if_needed()
+                    await self._scroll_into_view(element)
                     await element.click(timeout=10000)
+                    await self._release_element(element)
                     result = f"Successfully clicked: {target}"
                 else:
                     raise Exception(f"Could not find clickable element: {target}")
@@ -141,9 +456,13 @@ class AdvancedBrowserAutomation:
                 
                 element = await self._find_element_with_fallback(selectors)
                 if element:
-                    await element.scroll_into_view_if_needed()
-                    await element.clear()
-                    await element.type(value, delay=50)  # Human-like typing
+                    await self._scroll_into_view(element)
+                    if action.get("human_typing"):
+                        await element.fill("")
+                        await element.type(value, delay=50)  # Human-like typing
+                    else:
+                        await element.fill(value)  # Replaces any existing text in one call
+                    await self._release_element(element)
                     result = f"Successfully typed '{value}' into {target}"
                 else:
                     raise Exception(f"Could not find input element: {target}")
@@ -154,10 +473,12 @@ class AdvancedBrowserAutomation:
                 result = f"Waited {wait_time}ms"
                 
             elif action_type == "screenshot":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{session_id}_{timestamp}.png"
+                timestamp = f"{time.time_ns() // 1_000_000:013d}"
+                filename = f"{session_id}_{timestamp}.jpg"
                 filepath = os.path.join("screenshots", filename)
-                await self.page.screenshot(path=filepath, full_page=True)
+                # JPEG encodes far faster than full-page PNG; write it out off the event loop
+                image = await self.page.screenshot(full_page=True, type="jpeg", quality=80)
+                await asyncio.to_thread(_write_file, filepath, image)
                 result = f"Screenshot saved: /screenshots/{filename}"
                 
             elif action_type == "verify":
@@ -173,32 +494,31 @@ class AdvancedBrowserAutomation:
             else:
                 result = f"Action type '{action_type}' not implemented"
             
-            print(f"✅ {result}")
+            await self._settle(action)
+            logger.info("✅ %s", result)
             return {"status": "success", "result": result, "error": None}
             
         except Exception as e:
             error_msg = str(e)
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
             return {"status": "failed", "result": None, "error": error_msg}
     
+    async def _settle(self, action):
+        """Wait for the page to go quiet after an action that triggers navigation"""
+        post_wait = action.get("post_wait")
+        if post_wait:
+            try:
+                await self.page.wait_for_load_state(post_wait, timeout=2000)
+            except Exception:
+                pass  # Pages that keep polling never go idle; carry on
+    
     def _generate_click_selectors(self, target):
         """Generate multiple selector strategies for clicking"""
-        selectors = [target]
+        if ":" in target or "[" in target:
+            return [target]
         
-        if ":" not in target and "[" not in target:
-            # Generate smart selectors for common patterns
-            selectors.extend([
-                f"button:has-text('{target}')",
-                f"a:has-text('{target}')",
-                f"[aria-label*='{target}' i]",
-                f"[title*='{target}' i]",
-                f"*:has-text('{target}'):visible",
-                f".{target.lower().replace(' ', '-')}",
-                f"#{target.lower().replace(' ', '-')}",
-                f"input[value*='{target}' i]"
-            ])
-        
-        return selectors
+        slug = target.lower().replace(' ', '-')
+        return [target, *(t.format(t=target, slug=slug) for t in self.CLICK_FALLBACKS)]
     
     def _generate_input_selectors(self, target, value):
         """Generate multiple selector strategies for inputs"""
@@ -230,297 +550,216 @@ class AdvancedBrowserAutomation:
         """Find element using multiple selector strategies"""
         for selector in selectors:
             try:
-                element = self.page.locator(selector).first
-                if await element.count() > 0:
-                    return element
+                if ":has-text(" in selector:
+                    # query_selector doesn't resolve :has-text on every Playwright version
+                    element = self.page.locator(selector).first
+                    if await element.count() > 0:
+                        return element
+                else:
+                    # query_selector returns None straight away on a miss
+                    element = await self.page.query_selector(selector)
+                    if element:
+                        return element
             except Exception:
                 continue
         return None
-
-def generate_intelligent_action_plan(prompt, website_url):
-    """Generate intelligent action plan with advanced NLP analysis"""
-    actions = []
-    prompt_lower = prompt.lower()
-    
-    # Always start with navigation
-    actions.append({
-        "type": "navigate",
-        "description": f"Navigate to {website_url}",
-        "target": website_url,
-        "value": "",
-        "timeout": 30000
-    })
-    
-    # Smart wait after navigation
-    actions.append({
-        "type": "wait",
-        "description": "Wait for page to fully load",
-        "target": "time",
-        "value": "3000",
-        "timeout": 5000
-    })
-    
-    # Advanced prompt analysis
-    if "login" in prompt_lower:
-        actions.extend(_generate_login_actions(prompt))
-    
-    if "search" in prompt_lower:
-        actions.extend(_generate_search_actions(prompt))
-    
-    if "fill" in prompt_lower and "form" in prompt_lower:
-        actions.extend(_generate_form_actions(prompt))
-    
-    if "add to cart" in prompt_lower or "add first" in prompt_lower:
-        actions.extend(_generate_cart_actions(prompt))
-    
-    if "verify" in prompt_lower or "check" in prompt_lower:
-        actions.extend(_generate_verification_actions(prompt))
-    
-    # Always add screenshot if mentioned or at the end
-    if "screenshot" in prompt_lower or len([a for a in actions if a["type"] == "screenshot"]) == 0:
-        actions.append({
-            "type": "screenshot",
-            "description": "Take final screenshot",
-            "target": "",
-            "value": "",
-            "timeout": 5000
-        })
-    
-    return actions
-
-def _generate_login_actions(prompt):
-    """Generate login-specific actions"""
-    actions = []
-    
-    actions.append({
-        "type": "click",
-        "description": "Click login button",
-        "target": "login",
-        "value": "",
-        "timeout": 10000
-    })
-    
-    # Extract email if present
-    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', prompt)
-    email = email_match.group() if email_match else "jyoti@test.com"
-    
-    if "email" in prompt.lower() or "@" in prompt:
-        actions.append({
-            "type": "type",
-            "description": "Enter email address",
-            "target": "email",
-            "value": email,
-            "timeout": 10000
-        })
-    
-    # Extract password if present
-    password_match = re.search(r'password[:\s]+([^\s,]+)', prompt, re.IGNORECASE)
-    password = password_match.group(1) if password_match else "123456"
-    
-    if "password" in prompt.lower():
-        actions.append({
-            "type": "type",
-            "description": "Enter password",
-            "target": "password",
-            "value": password,
-            "timeout": 10000
-        })
-    
-    actions.append({
-        "type": "click",
-        "description": "Submit login form",
-        "target": "button[type='submit']",
-        "value": "",
-        "timeout": 10000
-    })
-    
-    return actions
-
-def _generate_search_actions(prompt):
-    """Generate search-specific actions"""
-    actions = []
-    
-    # Extract search term
-    search_patterns = [
-        r'search for (.+?)(?:\s+and|\s+then|$)',
-        r'find (.+?)(?:\s+and|\s+then|$)',
-        r'look for (.+?)(?:\s+and|\s+then|$)'
-    ]
-    
-    search_term = "test"  # Default
-    for pattern in search_patterns:
-        match = re.search(pattern, prompt, re.IGNORECASE)
-        if match:
-            search_term = match.group(1).strip().strip('"\'')
-            break
-    
-    actions.extend([
-        {
-            "type": "click",
-            "description": "Click search box",
-            "target": "search",
-            "value": "",
-            "timeout": 10000
-        },
-        {
-            "type": "type",
-            "description": f"Search for {search_term}",
-            "target": "search",
-            "value": search_term,
-            "timeout": 10000
-        },
-        {
-            "type": "click",
-            "description": "Submit search",
-            "target": "button[type='submit']",
-            "value": "",
-            "timeout": 10000
-        }
-    ])
-    
-    return actions
-
-def _generate_form_actions(prompt):
-    """Generate form filling actions"""
-    actions = []
-    
-    # Extract name if present
-    name_match = re.search(r'name ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
-    name = name_match.group(1) if name_match else "John Doe"
-    
-    # Extract email if present
-    email_match = re.search(r'email ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
-    email = email_match.group(1) if email_match else "john.doe@example.com"
-    
-    actions.extend([
-        {
-            "type": "type",
-            "description": "Fill name field",
-            "target": "name",
-            "value": name,
-            "timeout": 10000
-        },
-        {
-            "type": "type",
-            "description": "Fill email field",
-            "target": "email",
-            "value": email,
-            "timeout": 10000
-        }
-    ])
-    
-    if "submit" in prompt.lower():
-        actions.append({
-            "type": "click",
-            "description": "Submit form",
-            "target": "button[type='submit']",
-            "value": "",
-            "timeout": 10000
-        })
-    
-    return actions
-
-def _generate_cart_actions(prompt):
-    """Generate shopping cart actions"""
-    return [
-        {
-            "type": "click",
-            "description": "Click first product",
-            "target": ".product:first-child",
-            "value": "",
-            "timeout": 10000
-        },
-        {
-            "type": "click",
-            "description": "Add to cart",
-            "target": "add to cart",
-            "value": "",
-            "timeout": 10000
-        }
-    ]
-
-def _generate_verification_actions(prompt):
-    """Generate verification actions"""
-    actions = []
     
-    if "title" in prompt.lower():
-        title_match = re.search(r'title contains ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
-        title_text = title_match.group(1) if title_match else "Example"
-        
-        actions.append({
-            "type": "verify",
-            "description": f"Verify page title contains '{title_text}'",
-            "target": "title",
-            "value": title_text,
-            "timeout": 5000
-        })
+    async def _scroll_into_view(self, element):
+        """Scroll element into view unless it is already inside the viewport"""
+        in_viewport = await element.evaluate(
+            "e => { const r = e.getBoundingClientRect();"
+            " return r.top >= 0 && r.left >= 0 && r.bottom <= innerHeight && r.right <= innerWidth; }"
+        )
+        if not in_viewport:
+            await element.scroll_into_view_if_needed()
     
-    return actions
+    async def _release_element(self, element):
+        """Dispose an ElementHandle once an action is done with it"""
+        if hasattr(element, "dispose"):
+            await element.dispose()
 
 # Execution engine
+def _group_actions(actions):
+    """Split a plan into runs of consecutive (index, action) pairs sharing a parallel_group"""
+    groups = []
+    for index, action in enumerate(actions):
+        group_id = action.get("parallel_group")
+        if groups and group_id is not None and groups[-1][-1][1].get("parallel_group") == group_id:
+            groups[-1].append((index, action))
+        else:
+            groups.append([(index, action)])
+    return groups
+
 async def execute_test_session(session_id: str):
     """Execute test session with real browser automation"""
-    session = test_sessions[session_id]
+    async with _SESSION_SEM:
+        await _run_test_session(session_id)
+
+async def _run_test_session(session_id: str):
+    session = await load_session(session_id)
     browser_automation = None
+    # Set after every completed group so /stream subscribers wake instead of polling
+    progress_event = asyncio.Event()
     
     try:
-        print(f"🚀 Starting test execution for session {session_id}")
+        logger.info("🚀 Starting test execution for session %s", session_id)
         
-        # Initialize browser
+        # Reuse a saved login for this site and account if there is one
+        actions = session.action_plan["actions"]
+        login_key = _login_cache_key(session.website_url, actions)
+        login_state = get_login_state(login_key) if login_key is not None else None
+        login_ok = True
+        
+        # Check a browser out of the pool
         browser_automation = AdvancedBrowserAutomation()
-        await browser_automation.initialize()
+        await browser_automation.acquire(storage_state=login_state)
         
         active_executions[session_id] = {
             "browser": browser_automation,
             "current_action": 0,
+            "completed_actions": 0,
+            "progress_event": progress_event,
             "start_time": time.time()
         }
         
         successful_actions = 0
         failed_actions = 0
-        action_results = []
         
-        # Execute each action
-        for i, action in enumerate(session["action_plan"]["actions"]):
-            active_executions[session_id]["current_action"] = i
-            
-            result = await browser_automation.execute_action(action, session_id)
-            action_results.append({
-                "action": action,
-                "result": result,
-                "timestamp": datetime.utcnow().isoformat()
-            })
+        # Execute each action; read-only actions in the same group run concurrently
+        for group in _group_actions(actions):
+            active_executions[session_id]["current_action"] = group[0][0]
+            await publish_progress(session_id, group[0][0])
             
-            if result["status"] == "success":
-                successful_actions += 1
+            if login_state and all(action.get("skip_if_authenticated") for _, action in group):
+                results = [
+                    {"status": "success", "result": "Skipped, reusing saved login", "error": None}
+                    for _ in group
+                ]
             else:
-                failed_actions += 1
+                results = await asyncio.gather(*(
+                    browser_automation.execute_action(action, session_id) for _, action in group
+                ))
+            group_results = []
+            for (_, action), result in zip(group, results):
+                if action.get("skip_if_authenticated") and result["status"] != "success":
+                    login_ok = False
+                group_results.append({
+                    "action": action,
+                    "result": result,
+                    "timestamp_ns": time.time_ns()
+                })
+                
+                if result["status"] == "success":
+                    successful_actions += 1
+                else:
+                    failed_actions += 1
             
-            # Add delay between actions for stability
-            await asyncio.sleep(1)
+            session = replace(
+                session,
+                successful_actions=successful_actions,
+                failed_actions=failed_actions,
+                action_results=session.action_results + tuple(group_results)
+            )
+            await save_session(session)
+            active_executions[session_id]["completed_actions"] = len(session.action_results)
+            progress_event.set()
+            progress_event.clear()
+            
+            # Yield to the event loop between actions
+            await asyncio.sleep(0)
+        
+        if login_key is not None and login_state is None and login_ok:
+            save_login_state(login_key, await browser_automation.context.storage_state())
         
         # Update session with results
-        session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
-        session["successful_actions"] = successful_actions
-        session["failed_actions"] = failed_actions
-        session["total_duration"] = int(time.time() - active_executions[session_id]["start_time"])
-        session["action_results"] = action_results
+        session = replace(
+            session,
+            status="completed",
+            completed_at=datetime.utcnow().isoformat(),
+            total_duration=int(time.time() - active_executions[session_id]["start_time"])
+        )
         
-        print(f"🎉 Test completed: {successful_actions} successful, {failed_actions} failed")
+        logger.info("🎉 Test completed: %d successful, %d failed", successful_actions, failed_actions)
         
     except Exception as e:
-        print(f"❌ Test execution failed: {e}")
-        session["status"] = "failed"
-        session["error_summary"] = str(e)
-        session["completed_at"] = datetime.utcnow().isoformat()
+        logger.error("❌ Test execution failed: %s", e)
+        session = replace(
+            session,
+            status="failed",
+            error_summary=str(e),
+            completed_at=datetime.utcnow().isoformat()
+        )
         
     finally:
         # Cleanup
         if browser_automation:
-            await browser_automation.cleanup()
+            await browser_automation.release()
         if session_id in active_executions:
             del active_executions[session_id]
+        await save_session(session)
+        if redis_client:
+            await redis_client.delete(f"sess:{session_id}:progress")
+            await redis_client.expire(f"sess:{session_id}", SESSION_TTL)
+        else:
+            finished_sessions[session_id] = time.time_ns()
+        progress_event.set()
+
+async def sweep_finished_sessions():
+    """Periodically drop sessions that finished more than SESSION_TTL ago"""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            if redis_client:
+                # Session payloads expire on their own; prune index entries that outlived them
+                stale_ids = await redis_client.zrangebyscore("sess:index", "-inf", time.time() - SESSION_TTL)
+                for sid in stale_ids:
+                    if not await redis_client.exists(f"sess:{sid.decode()}"):
+                        await redis_client.zrem("sess:index", sid)
+                continue
+            
+            cutoff = time.time_ns() - SESSION_TTL * 1_000_000_000
+            expired = [sid for sid, finished in finished_sessions.items() if finished < cutoff]
+            if not expired:
+                continue
+            for sid in expired:
+                del finished_sessions[sid]
+                test_sessions.pop(sid, None)
+                _claimed_sessions.discard(sid)
+            
+            # Rebuild the creation-order index without the dropped sessions
+            session_ids[:] = [sid for sid in session_ids if sid in test_sessions]
+            session_positions.clear()
+            session_positions.update((sid, i) for i, sid in enumerate(session_ids))
+            logger.info("🧹 Dropped %d finished sessions", len(expired))
+        except Exception as e:
+            logger.error("Session sweep error: %s", e)
+
+# Lifecycle
+@app.on_event("startup")
+async def startup_event():
+    global redis_client, session_sweeper
+    # Start new tasks eagerly so a session's synchronous prefix runs without
+    # waiting a loop turn (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    log_listener.start()
+    if REDIS_URL:
+        if REDIS_AVAILABLE:
+            redis_client = aioredis.from_url(REDIS_URL)
+            logger.info("🗄️ Storing sessions in Redis at %s", REDIS_URL)
+        else:
+            logger.warning("⚠️ REDIS_URL is set but redis is not installed, keeping sessions in memory")
+    session_sweeper = asyncio.create_task(sweep_finished_sessions())
+    await start_browser_pool()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if session_sweeper:
+        session_sweeper.cancel()
+    await stop_browser_pool()
+    if redis_client:
+        await redis_client.aclose()
+    log_listener.stop()
 
 # API Routes
 @app.get("/")
@@ -537,7 +776,7 @@ async def root():
             "Screenshot Capture",
             "Real-time Monitoring"
         ],
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": cached_utc_iso()
     }
 
 @app.get("/health")
@@ -546,20 +785,20 @@ async def health_check():
         "status": "healthy",
         "playwright_available": PLAYWRIGHT_AVAILABLE,
         "active_sessions": len(active_executions),
-        "total_sessions": len(test_sessions),
-        "timestamp": datetime.utcnow().isoformat()
+        "total_sessions": await count_sessions(),
+        "timestamp": cached_utc_iso()
     }
 
 @app.post("/api/tests/create")
 async def create_test(request: CreateTestRequest):
     try:
-        session_id = str(uuid.uuid4())
+        session_id = fast_uuid()
         
-        # Generate intelligent action plan
-        actions = generate_intelligent_action_plan(request.prompt, request.website_url)
+        # Generate intelligent action plan off the event loop
+        actions = await run_in_threadpool(generate_intelligent_action_plan, request.prompt, request.website_url)
         
         action_plan = {
-            "id": str(uuid.uuid4()),
+            "id": fast_uuid(),
             "website_url": request.website_url,
             "actions": actions,
             "confidence": 0.95,
@@ -569,18 +808,15 @@ async def create_test(request: CreateTestRequest):
         }
         
         # Store session
-        test_sessions[session_id] = {
-            "id": session_id,
-            "website_url": request.website_url,
-            "original_prompt": request.prompt,
-            "action_plan": action_plan,
-            "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
-            "total_actions": len(actions),
-            "successful_actions": 0,
-            "failed_actions": 0,
-            "screenshots": []
-        }
+        await save_session(Session(
+            id=session_id,
+            website_url=request.website_url,
+            original_prompt=request.prompt,
+            action_plan=action_plan,
+            created_at=datetime.utcnow().isoformat(),
+            total_actions=len(actions)
+        ))
+        await index_session(session_id)
         
         return {
             "session_id": session_id,
@@ -593,19 +829,27 @@ async def create_test(request: CreateTestRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tests/execute")
-async def execute_test(request: ExecuteTestRequest, background_tasks: BackgroundTasks):
+async def execute_test(request: ExecuteTestRequest):
     try:
-        if request.session_id not in test_sessions:
+        session = await load_session(request.session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Test session not found")
         
-        session = test_sessions[request.session_id]
+        if session.status != "pending":
+            raise HTTPException(status_code=400, detail=f"Test is already {session.status}")
         
-        if session["status"] != "pending":
-            raise HTTPException(status_code=400, detail=f"Test is already {session['status']}")
+        # Claim before the slot wait so a second /execute can't also pass the check above
+        if not await claim_session(request.session_id):
+            raise HTTPException(status_code=400, detail="Test is already running")
+        
+        if _SESSION_SEM.locked():
+            await asyncio.sleep(SESSION_SLOT_WAIT)
+            if _SESSION_SEM.locked():
+                await release_claim(request.session_id)
+                raise HTTPException(status_code=429, detail="Too many concurrent test sessions, try again shortly")
         
         # Start execution in background
-        session["status"] = "running"
-        session["started_at"] = datetime.utcnow().isoformat()
+        await save_session(replace(session, status="running", started_at=datetime.utcnow().isoformat()))
         
         # Use asyncio.create_task for proper async execution
         asyncio.create_task(execute_test_session(request.session_id))
@@ -624,20 +868,24 @@ async def execute_test(request: ExecuteTestRequest, background_tasks: Background
 @app.get("/api/tests/{session_id}")
 async def get_test_results(session_id: str):
     try:
-        if session_id not in test_sessions:
+        session = await load_session(session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Test session not found")
         
-        session = test_sessions[session_id]
-        
         # Get execution status
         execution_status = {}
-        if session_id in active_executions:
-            exec_info = active_executions[session_id]
+        current_action = await load_progress(session_id)
+        if current_action is not None:
             execution_status = {
-                "current_action": exec_info["current_action"],
-                "progress": (exec_info["current_action"] / len(session["action_plan"]["actions"])) * 100
+                "current_action": current_action,
+                "progress": (current_action / len(session.action_plan["actions"])) * 100
             }
         
+        # Action timestamps are stored as nanoseconds and only formatted here
+        session = replace(session, action_results=tuple(
+            {**entry, "timestamp": iso_from_ns(entry["timestamp_ns"])} for entry in session.action_results
+        ))
+        
         return {
             "session": session,
             "execution_status": execution_status
@@ -648,24 +896,75 @@ async def get_test_results(session_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/tests")
-async def list_tests(page: int = 1, per_page: int = 20):
+@app.get("/api/tests/{session_id}/stream")
+async def stream_test_progress(session_id: str):
+    """Server-sent events with the session's progress, one per completed action group"""
+    session = await load_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Test session not found")
+    
+    total_actions = len(session.action_plan["actions"])
+    
+    async def progress_events():
+        while True:
+            exec_info = active_executions.get(session_id)
+            if exec_info is not None:
+                completed = exec_info["completed_actions"]
+                yield "data: " + orjson.dumps({
+                    "status": "running",
+                    "completed_actions": completed,
+                    "progress": (completed / total_actions) * 100
+                }).decode() + "\n\n"
+                if exec_info["completed_actions"] == completed:
+                    await exec_info["progress_event"].wait()
+                continue
+            
+            # No registered run: it may not have started yet (not executed, or waiting for a
+            # pooled browser) or may be saving its result, so only a final status ends the stream
+            final = await load_session(session_id)
+            if final is None:
+                return
+            if final.status not in ("pending", "running"):
+                break
+            await asyncio.sleep(STREAM_POLL_INTERVAL)
+        
+        # Finished - send the final state and end the stream
+        yield "data: " + orjson.dumps({
+            "status": final.status,
+            "successful_actions": final.successful_actions,
+            "failed_actions": final.failed_actions
+        }).decode() + "\n\n"
+    
+    return StreamingResponse(progress_events(), media_type="text/event-stream")
+
+@app.get("/api/tests", response_model=ListTestsResponse)
+async def list_tests(page: int = 1, per_page: int = 20, after: Optional[str] = None):
     try:
-        sessions = list(test_sessions.values())
-        total = len(sessions)
-        
-        # Simple pagination
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_sessions = sessions[start:end]
+        # Keyset pagination when a cursor is given, offset pagination otherwise
+        if after is not None:
+            position = await session_position(after)
+            if position is None:
+                raise HTTPException(status_code=400, detail="Unknown cursor")
+            start = position + 1
+        else:
+            start = (page - 1) * per_page
+        
+        page_ids = await session_id_range(start, per_page)
+        sessions = [await load_session(sid) for sid in page_ids]
+        total = await count_sessions()
+        has_more = start + per_page < total
         
         return {
-            "sessions": paginated_sessions,
+            # A Redis payload can expire before the sweeper prunes its index entry
+            "sessions": [session for session in sessions if session is not None],
             "total": total,
             "page": page,
-            "per_page": per_page
+            "per_page": per_page,
+            "next_cursor": page_ids[-1] if page_ids and has_more else None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -688,5 +987,10 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        # "auto" picks uvloop + httptools when installed and falls back to asyncio + h11,
+        # so the backend still starts where uvloop isn't available (e.g. Windows)
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=False
     )
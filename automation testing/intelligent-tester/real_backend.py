@@ -2,18 +2,23 @@
 """
 Real backend with Playwright integration for actual browser automation
 """
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import uvicorn
 import asyncio
+import logging
 import os
 import json
+import queue
 import uuid
 from datetime import datetime
 import time
+from logging.handlers import QueueHandler, QueueListener
+from action_planner import generate_intelligent_action_plan
 
 # Try to import Playwright, fall back gracefully if not available
 try:
@@ -23,6 +28,14 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     print("⚠️  Playwright not available. Install with: pip install playwright")
 
+# Logging - records are queued and written to stderr by a background listener
+log_queue = queue.Queue(-1)
+logger = logging.getLogger("real_backend")
+logger.setLevel(logging.INFO)
+logger.addHandler(QueueHandler(log_queue))
+logger.propagate = False
+log_listener = QueueListener(log_queue, logging.StreamHandler())
+
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent Web Tester - Real Execution",
@@ -43,6 +56,14 @@ app.add_middleware(
 os.makedirs("screenshots", exist_ok=True)
 app.mount("/screenshots", StaticFiles(directory="screenshots"), name="screenshots")
 
+# real_backend's own search and product targets, kept from before the shared planner
+PLAN_OVERRIDES = {
+    "search_term": "headphones",
+    "search_box": "input[type='search']",
+    "search_button": "search",
+    "first_product": ".product:first-child, .item:first-child, [data-testid*='product']:first",
+}
+
 # Global storage
 test_sessions = {}
 active_executions = {}
@@ -57,36 +78,123 @@ class ExecuteTestRequest(BaseModel):
     session_id: str
     options: Optional[Dict[str, Any]] = None
 
+# Browser pool - Chromium is launched once at startup and reused by every
+# session; each session gets its own BrowserContext for isolation
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "4"))
+# A slot holding None lost its browser and is relaunched by the next session that takes it
+BROWSER_POOL = asyncio.Queue()
+# Seconds a session waits for a free pooled browser before failing
+BROWSER_ACQUIRE_TIMEOUT = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "120"))
+playwright_instance = None
+
+async def _launch_browser():
+    return await playwright_instance.chromium.launch(
+        headless=False,  # Set to True for headless mode
+        args=['--no-sandbox', '--disable-setuid-sandbox']
+    )
+
+async def start_browser_pool():
+    """Start Playwright and prelaunch the pooled browsers"""
+    global playwright_instance
+    if not PLAYWRIGHT_AVAILABLE:
+        return
+    
+    try:
+        playwright_instance = await async_playwright().start()
+        for _ in range(BROWSER_POOL_SIZE):
+            BROWSER_POOL.put_nowait(await _launch_browser())
+        logger.info("🌐 Browser pool ready with %d browsers", BROWSER_POOL.qsize())
+    except Exception as e:
+        logger.error("❌ Failed to start browser pool: %s", e)
+        if BROWSER_POOL.empty():
+            # Nothing launched: leave Playwright unset so sessions fail fast instead of waiting forever
+            if playwright_instance:
+                await playwright_instance.stop()
+                playwright_instance = None
+
+async def stop_browser_pool():
+    """Close every pooled browser and stop Playwright"""
+    global playwright_instance
+    while not BROWSER_POOL.empty():
+        browser = BROWSER_POOL.get_nowait()
+        if browser is None:
+            continue
+        try:
+            await browser.close()
+        except Exception as e:
+            logger.error("Cleanup error: %s", e)
+    if playwright_instance:
+        await playwright_instance.stop()
+        playwright_instance = None
+
+def _write_file(path, data):
+    """Write bytes to a file (run in a worker thread)"""
+    with open(path, "wb") as f:
+        f.write(data)
+
 # Browser automation class
 class BrowserAutomation:
+    # Fallback strategies, tried one at a time in this order after the raw target
+    CLICK_FALLBACKS = (
+        "button:has-text('{t}')",
+        "a:has-text('{t}')",
+        "[aria-label*='{t}']",
+        "*:has-text('{t}'):visible",
+    )
+    INPUT_FALLBACKS = (
+        "input[placeholder*='{t}']",
+        "input[name*='{lower}']",
+        "input[type='text']",
+        "input[type='email']",
+        "input[type='password']",
+        "input:visible",
+    )
+    
     def __init__(self):
-        self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
     
-    async def initialize(self):
-        """Initialize Playwright browser"""
-        if not PLAYWRIGHT_AVAILABLE:
+    async def acquire(self):
+        """Check a browser out of the pool and open a fresh context on it"""
+        if not PLAYWRIGHT_AVAILABLE or playwright_instance is None:
             raise Exception("Playwright not available. Please install: pip install playwright && playwright install")
         
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=False,  # Set to True for headless mode
-            args=['--no-sandbox', '--disable-setuid-sandbox']
-        )
-        context = await self.browser.new_context(
+        try:
+            browser = await asyncio.wait_for(BROWSER_POOL.get(), BROWSER_ACQUIRE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise Exception(f"No browser became free within {BROWSER_ACQUIRE_TIMEOUT:.0f}s")
+        
+        if browser is None or not browser.is_connected():
+            # The slot's browser died earlier; relaunch it now, keeping the slot if that fails too
+            try:
+                browser = await _launch_browser()
+            except Exception:
+                BROWSER_POOL.put_nowait(None)
+                raise
+        
+        self.browser = browser
+        self.context = await self.browser.new_context(
             viewport={'width': 1280, 'height': 720}
         )
-        self.page = await context.new_page()
+        self.page = await self.context.new_page()
+        
+    async def release(self):
+        """Close the session's context and hand the browser back to the pool"""
+        try:
+            if self.context:
+                await self.context.close()
+        except Exception as e:
+            logger.error("Cleanup error: %s", e)
         
-    async def cleanup(self):
-        """Clean up browser resources"""
-        if self.page:
-            await self.page.close()
         if self.browser:
-            await self.browser.close()
-        if self.playwright:
-            await self.playwright.stop()
+            # A browser that crashed during the session goes back as an empty slot;
+            # the next acquire relaunches it, so the pool never shrinks
+            BROWSER_POOL.put_nowait(self.browser if self.browser.is_connected() else None)
+        
+        self.browser = None
+        self.context = None
+        self.page = None
     
     async def execute_action(self, action, session_id):
         """Execute a single action"""
@@ -103,23 +211,10 @@ class BrowserAutomation:
                 # Try multiple selector strategies
                 selectors = [target]
                 if ":" not in target:  # If not a complex selector, add alternatives
-                    selectors.extend([
-                        f"button:has-text('{target}')",
-                        f"a:has-text('{target}')",
-                        f"[aria-label*='{target}']",
-                        f"*:has-text('{target}'):visible"
-                    ])
-                
-                element = None
-                for selector in selectors:
-                    try:
-                        element = self.page.locator(selector).first
-                        if await element.count() > 0:
-                            break
-                    except:
-                        continue
+                    selectors.extend(t.format(t=target) for t in self.CLICK_FALLBACKS)
                 
-                if element and await element.count() > 0:
+                element = await self._first_match(selectors)
+                if element:
                     await element.click(timeout=10000)
                     result = f"Clicked element: {target}"
                 else:
@@ -129,27 +224,11 @@ class BrowserAutomation:
                 # Try multiple input selector strategies
                 selectors = [target]
                 if "input" not in target.lower():
-                    selectors.extend([
-                        f"input[placeholder*='{target}']",
-                        f"input[name*='{target.lower()}']",
-                        f"input[type='text']",
-                        f"input[type='email']",
-                        f"input[type='password']",
-                        "input:visible"
-                    ])
-                
-                element = None
-                for selector in selectors:
-                    try:
-                        element = self.page.locator(selector).first
-                        if await element.count() > 0:
-                            break
-                    except:
-                        continue
+                    selectors.extend(t.format(t=target, lower=target.lower()) for t in self.INPUT_FALLBACKS)
                 
-                if element and await element.count() > 0:
-                    await element.clear()
-                    await element.fill(value)
+                element = await self._first_match(selectors)
+                if element:
+                    await element.fill(value)  # Replaces any existing text, no clear() needed
                     result = f"Typed '{value}' into {target}"
                 else:
                     raise Exception(f"Could not find input element: {target}")
@@ -161,182 +240,56 @@ class BrowserAutomation:
                 
             elif action_type == "screenshot":
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{session_id}_{timestamp}.png"
+                filename = f"{session_id}_{timestamp}.jpg"
                 filepath = os.path.join("screenshots", filename)
-                await self.page.screenshot(path=filepath, full_page=True)
+                # JPEG encodes far faster than full-page PNG; write it out off the event loop
+                image = await self.page.screenshot(full_page=True, type="jpeg", quality=80)
+                await asyncio.to_thread(_write_file, filepath, image)
                 result = f"Screenshot saved: /screenshots/{filename}"
                 
             else:
                 result = f"Action type '{action_type}' not implemented"
             
+            await self._settle(action)
             return {"status": "success", "result": result, "error": None}
             
         except Exception as e:
             return {"status": "failed", "result": None, "error": str(e)}
 
-def generate_action_plan(prompt, website_url):
-    """Generate action plan from natural language prompt"""
-    actions = []
-    prompt_lower = prompt.lower()
-    
-    # Always start with navigation
-    actions.append({
-        "type": "navigate",
-        "description": f"Navigate to {website_url}",
-        "target": website_url,
-        "value": "",
-        "timeout": 30000
-    })
-    
-    # Add wait after navigation
-    actions.append({
-        "type": "wait",
-        "description": "Wait for page to load",
-        "target": "time",
-        "value": "3000",
-        "timeout": 5000
-    })
-    
-    # Parse login actions
-    if "login" in prompt_lower:
-        actions.append({
-            "type": "click",
-            "description": "Click login button",
-            "target": "login",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        if "email" in prompt_lower or "@" in prompt:
-            email = "jyoti@test.com"  # Default
-            # Try to extract email from prompt
-            import re
-            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', prompt)
-            if email_match:
-                email = email_match.group()
-            
-            actions.append({
-                "type": "type",
-                "description": "Enter email address",
-                "target": "email",
-                "value": email,
-                "timeout": 10000
-            })
-        
-        if "password" in prompt_lower:
-            password = "123456"  # Default
-            # Try to extract password from prompt
-            password_match = re.search(r'password[:\s]+([^\s,]+)', prompt, re.IGNORECASE)
-            if password_match:
-                password = password_match.group(1)
-            
-            actions.append({
-                "type": "type",
-                "description": "Enter password",
-                "target": "password",
-                "value": password,
-                "timeout": 10000
-            })
-        
-        actions.append({
-            "type": "click",
-            "description": "Submit login form",
-            "target": "button[type='submit']",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "wait",
-            "description": "Wait for login to complete",
-            "target": "time",
-            "value": "3000",
-            "timeout": 5000
-        })
-    
-    # Parse search actions
-    if "search" in prompt_lower:
-        search_term = "headphones"  # Default
-        # Try to extract search term
-        search_patterns = [
-            r'search for (.+?)(?:\s+and|\s+then|$)',
-            r'find (.+?)(?:\s+and|\s+then|$)',
-            r'look for (.+?)(?:\s+and|\s+then|$)'
-        ]
-        for pattern in search_patterns:
-            match = re.search(pattern, prompt, re.IGNORECASE)
-            if match:
-                search_term = match.group(1).strip()
-                break
-        
-        actions.append({
-            "type": "click",
-            "description": "Click search box",
-            "target": "input[type='search']",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "type",
-            "description": f"Search for {search_term}",
-            "target": "search",
-            "value": search_term,
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "click",
-            "description": "Click search button",
-            "target": "search",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "wait",
-            "description": "Wait for search results",
-            "target": "time",
-            "value": "3000",
-            "timeout": 5000
-        })
-    
-    # Parse add to cart actions
-    if "add to cart" in prompt_lower or "add first" in prompt_lower:
-        actions.append({
-            "type": "click",
-            "description": "Click first product",
-            "target": ".product:first-child, .item:first-child, [data-testid*='product']:first",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "wait",
-            "description": "Wait for product page to load",
-            "target": "time",
-            "value": "2000",
-            "timeout": 5000
-        })
-        
-        actions.append({
-            "type": "click",
-            "description": "Add to cart",
-            "target": "add to cart",
-            "value": "",
-            "timeout": 10000
-        })
-    
-    # Always end with screenshot
-    actions.append({
-        "type": "screenshot",
-        "description": "Take final screenshot",
-        "target": "",
-        "value": "",
-        "timeout": 5000
-    })
-    
-    return actions
+    async def _first_match(self, selectors):
+        """Return a locator for the first selector, in priority order, that matches anything on the page"""
+        for selector in selectors:
+            try:
+                element = self.page.locator(selector).first
+                if await element.count() > 0:
+                    return element
+            except Exception:
+                continue
+        return None
+
+    async def _settle(self, action):
+        """Wait for the page to go quiet after an action that triggers navigation"""
+        post_wait = action.get("post_wait")
+        if post_wait:
+            try:
+                await self.page.wait_for_load_state(post_wait, timeout=2000)
+            except Exception:
+                pass  # Pages that keep polling never go idle; carry on
+
+# Lifecycle
+@app.on_event("startup")
+async def startup_event():
+    # Start new tasks eagerly so a session's synchronous prefix runs without
+    # waiting a loop turn (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    log_listener.start()
+    await start_browser_pool()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_browser_pool()
+    log_listener.stop()
 
 # Routes
 @app.get("/")
@@ -363,8 +316,10 @@ async def create_test(request: CreateTestRequest):
     try:
         session_id = str(uuid.uuid4())
         
-        # Generate action plan
-        actions = generate_action_plan(request.prompt, request.website_url)
+        # Generate action plan off the event loop
+        actions = await run_in_threadpool(
+            generate_intelligent_action_plan, request.prompt, request.website_url, **PLAN_OVERRIDES
+        )
         
         action_plan = {
             "id": str(uuid.uuid4()),
@@ -401,7 +356,7 @@ async def create_test(request: CreateTestRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tests/execute")
-async def execute_test(request: ExecuteTestRequest, background_tasks: BackgroundTasks):
+async def execute_test(request: ExecuteTestRequest):
     try:
         if request.session_id not in test_sessions:
             raise HTTPException(status_code=404, detail="Test session not found")
@@ -411,13 +366,13 @@ async def execute_test(request: ExecuteTestRequest, background_tasks: Background
         if session["status"] != "pending":
             raise HTTPException(status_code=400, detail=f"Test is already {session['status']}")
         
-        # Start execution in background
-        background_tasks.add_task(execute_test_session, request.session_id)
-        
         # Update session status
         session["status"] = "running"
         session["started_at"] = datetime.utcnow().isoformat()
         
+        # Start execution in background
+        asyncio.create_task(execute_test_session(request.session_id))
+        
         return {
             "session_id": request.session_id,
             "status": "running",
@@ -435,9 +390,9 @@ async def execute_test_session(session_id: str):
     browser_automation = None
     
     try:
-        # Initialize browser
+        # Check a browser out of the pool
         browser_automation = BrowserAutomation()
-        await browser_automation.initialize()
+        await browser_automation.acquire()
         
         active_executions[session_id] = {
             "browser": browser_automation,
@@ -452,19 +407,19 @@ async def execute_test_session(session_id: str):
         for i, action in enumerate(session["action_plan"]["actions"]):
             active_executions[session_id]["current_action"] = i
             
-            print(f"Executing action {i+1}/{len(session['action_plan']['actions'])}: {action['description']}")
+            logger.info("Executing action %d/%d: %s", i + 1, len(session["action_plan"]["actions"]), action["description"])
             
             result = await browser_automation.execute_action(action, session_id)
             
             if result["status"] == "success":
                 successful_actions += 1
-                print(f"✅ {result['result']}")
+                logger.info("✅ %s", result["result"])
             else:
                 failed_actions += 1
-                print(f"❌ {result['error']}")
+                logger.error("❌ %s", result["error"])
             
-            # Add small delay between actions
-            await asyncio.sleep(1)
+            # Yield to the event loop between actions
+            await asyncio.sleep(0)
         
         # Update session with results
         session["status"] = "completed"
@@ -473,10 +428,10 @@ async def execute_test_session(session_id: str):
         session["failed_actions"] = failed_actions
         session["total_duration"] = int(time.time() - active_executions[session_id]["start_time"])
         
-        print(f"🎉 Test completed: {successful_actions} successful, {failed_actions} failed")
+        logger.info("🎉 Test completed: %d successful, %d failed", successful_actions, failed_actions)
         
     except Exception as e:
-        print(f"❌ Test execution failed: {e}")
+        logger.error("❌ Test execution failed: %s", e)
         session["status"] = "failed"
         session["error_summary"] = str(e)
         session["completed_at"] = datetime.utcnow().isoformat()
@@ -484,7 +439,7 @@ async def execute_test_session(session_id: str):
     finally:
         # Cleanup
         if browser_automation:
-            await browser_automation.cleanup()
+            await browser_automation.release()
         if session_id in active_executions:
             del active_executions[session_id]
 
@@ -527,5 +482,8 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=False
     )
@@ -2,99 +2,396 @@
 """
 Real Browser Automation Backend - Actually opens browsers and performs actions
 """
-import json
+from fastapi import FastAPI, HTTPException
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+import uvicorn
+import asyncio
+import bisect
+import functools
 import os
 import uuid
 import time
-import threading
 import re
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
 
-# Try to import Playwright
+# Try to import pyahocorasick, fall back to a single regex scan if not available
 try:
-    from playwright.sync_api import sync_playwright
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Try to import Playwright (availability is reported once by the startup banner)
+try:
+    from playwright.async_api import async_playwright
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     PLAYWRIGHT_AVAILABLE = True
-    print("✅ Playwright is available - Real browser automation enabled!")
 except ImportError:
-    try:
-        # Try alternative import
-        import subprocess
-        result = subprocess.run(['python', '-c', 'from playwright.sync_api import sync_playwright; print("OK")'],
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            from playwright.sync_api import sync_playwright
-            PLAYWRIGHT_AVAILABLE = True
-            print("✅ Playwright is available - Real browser automation enabled!")
+    PlaywrightTimeoutError = TimeoutError
+    PLAYWRIGHT_AVAILABLE = False
+
+# Create FastAPI app
+app = FastAPI(
+    title="Intelligent Web Tester - Real Browser Automation",
+    description="Opens real browsers and performs the planned actions",
+    version="1.0.0"
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Create screenshots directory
+os.makedirs("screenshots", exist_ok=True)
+app.mount("/screenshots", StaticFiles(directory="screenshots"), name="screenshots")
+
+# Seconds to leave the browser up after a run (AUTOMATION_VIEW_SECS); 0 returns it to the pool right away
+VIEW_SECS = int(os.environ.get("AUTOMATION_VIEW_SECS", "0"))
+
+# Characters that mark a target as already being a CSS selector
+_CSS_CHARS = frozenset("[.#:>")
+
+# Playwright-only pseudo-classes can't be checked with document.querySelectorAll
+_PLAYWRIGHT_PSEUDOS = (":has-text(", ":visible", ":text(")
+
+@functools.lru_cache(maxsize=256)
+def _selector_runs(selectors):
+    """Split a priority-ordered strategy list into runs of plain CSS selectors and single Playwright selectors"""
+    runs = []
+    for selector in selectors:
+        if any(p in selector for p in _PLAYWRIGHT_PSEUDOS):
+            runs.append(selector)
+        elif runs and isinstance(runs[-1], list):
+            runs[-1].append(selector)
         else:
-            raise ImportError("Playwright not found")
-    except:
-        PLAYWRIGHT_AVAILABLE = False
-        print("⚠️  Playwright not available. Install with: pip install playwright && playwright install")
+            runs.append([selector])
+    return tuple(tuple(run) if isinstance(run, list) else run for run in runs)
+
+# Returns the index of the first selector, in priority order, with a visible match (-1 if none);
+# selectors that aren't valid CSS are skipped instead of failing the whole check
+_FIRST_VISIBLE_JS = """
+(selectors) => {
+    for (let i = 0; i < selectors.length; i++) {
+        try {
+            for (const el of document.querySelectorAll(selectors[i])) {
+                if (el.getClientRects().length) return i;
+            }
+        } catch (e) {}
+    }
+    return -1;
+}
+"""
+
+# Prompt parsing patterns, compiled once at import
+_LOGIN_EMAIL_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'with\s+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
+    r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
+))
+_LOGIN_PW_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'password[:\s/]+([^\s,]+)',
+    r'/\s*([^\s,]+)',
+    r'with\s+\w+\s*/\s*([^\s,]+)'
+))
+_LOGIN_USER_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'with\s+([a-zA-Z0-9_]+)\s*/',
+    r'username[:\s]+([a-zA-Z0-9_]+)',
+    r'user[:\s]+([a-zA-Z0-9_]+)'
+))
+_SEARCH_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'search for ["\']([^"\']+)["\']',
+    r'search for (.+?)(?:\s+and|\s+then|\s+in|$)',
+    r'find ["\']([^"\']+)["\']',
+    r'find (.+?)(?:\s+and|\s+then|\s+in|$)',
+    r'look for ["\']([^"\']+)["\']',
+    r'look for (.+?)(?:\s+and|\s+then|\s+in|$)',
+    r'query ["\']([^"\']+)["\']',
+    r'query (.+?)(?:\s+and|\s+then|\s+in|$)'
+))
+_CLICK_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'click (?:on )?(?:the )?["\']([^"\']+)["\']',
+    r'click (?:on )?(?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)',
+    r'press (?:the )?["\']([^"\']+)["\']',
+    r'press (?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)',
+    r'tap (?:on )?(?:the )?["\']([^"\']+)["\']',
+    r'tap (?:on )?(?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)',
+    r'select (?:the )?["\']([^"\']+)["\']',
+    r'select (?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)'
+))
+_TYPE_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'type ["\']([^"\']+)["\'] (?:in|into) (?:the )?(.+?)(?:\s+and|\s+then|$)',
+    r'enter ["\']([^"\']+)["\'] (?:in|into) (?:the )?(.+?)(?:\s+and|\s+then|$)',
+    r'input ["\']([^"\']+)["\'] (?:in|into) (?:the )?(.+?)(?:\s+and|\s+then|$)',
+    r'fill (?:the )?(.+?) with ["\']([^"\']+)["\']',
+    r'type ["\']([^"\']+)["\']',
+    r'enter ["\']([^"\']+)["\']'
+))
+_NAV_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'go to (?:the )?(.+?)(?:\s+and|\s+then|$)',
+    r'navigate to (?:the )?(.+?)(?:\s+and|\s+then|$)',
+    r'visit (?:the )?(.+?)(?:\s+and|\s+then|$)',
+    r'open (?:the )?(.+?)(?:\s+and|\s+then|$)'
+))
+_WAIT_TIME_RE = re.compile(r'(\d+)\s*(?:second|sec|ms|millisecond)', re.IGNORECASE)
+_FORM_NAME_RE = re.compile(r'name ["\']([^"\']+)["\']', re.IGNORECASE)
+_FORM_EMAIL_RE = re.compile(r'email ["\']([^"\']+)["\']', re.IGNORECASE)
+_TITLE_RE = re.compile(r'title contains ["\']([^"\']+)["\']', re.IGNORECASE)
+
+# Selector strategies for targets that don't depend on runtime text
+_STATIC_CLICK_SELECTORS = {
+    "first_result": (
+        ".search-result:first-child a",
+        ".result:first-child a",
+        ".search-results > div:first-child a",
+        "h3:first-child a",
+        ".repo-list-item:first-child a"
+    ),
+    "first_product": (
+        ".product:first-child",
+        ".product-item:first-child",
+        ".inventory-item:first-child",
+        "[data-testid='product']:first-child",
+        ".product-card:first-child"
+    ),
+    "first_link": (
+        "a:first-child",
+        "main a:first-child",
+        ".content a:first-child"
+    ),
+    "first_item": (
+        ":first-child",
+        "li:first-child",
+        "div:first-child"
+    ),
+    "add_to_cart": (
+        "button:has-text('Add to cart')",
+        "button:has-text('Add to Cart')",
+        ".add-to-cart",
+        "#add-to-cart",
+        "[data-testid='add-to-cart']",
+        "button[name='add-to-cart']"
+    ),
+    "search_button": (
+        "button[type='submit']",
+        "input[type='submit']",
+        "button:has-text('Search')",
+        ".search-btn",
+        "#search-btn",
+        "[data-testid='search-button']"
+    ),
+    "form_submit": (
+        "button[type='submit']",
+        "input[type='submit']",
+        "form button:last-child",
+        ".submit-btn"
+    ),
+}
+
+_STATIC_INPUT_SELECTORS = {
+    "username": (
+        "input[name='username']",
+        "input[id='username']",
+        "input[name='user']",
+        "input[id='user']",
+        "input[placeholder*='username' i]",
+        "input[placeholder*='user' i]",
+        "[data-testid*='username']"
+    ),
+    "email": (
+        "input[type='email']",
+        "input[name*='email' i]",
+        "input[id*='email' i]",
+        "input[placeholder*='email' i]",
+        "[data-testid*='email']"
+    ),
+    "password": (
+        "input[type='password']",
+        "input[name*='password' i]",
+        "input[id*='password' i]",
+        "input[placeholder*='password' i]",
+        "[data-testid*='password']"
+    ),
+    "search": (
+        "input[type='search']",
+        "input[name*='search' i]",
+        "input[id*='search' i]",
+        "input[placeholder*='search' i]",
+        "[data-testid*='search']",
+        ".search-input", "#search-input",
+        "input[name='q']",  # Common search parameter
+        "input[name='query']"
+    ),
+    "name": (
+        "input[name*='name' i]",
+        "input[id*='name' i]",
+        "input[placeholder*='name' i]",
+        "[data-testid*='name']",
+        "input[name='first_name']",
+        "input[name='last_name']",
+        "input[name='full_name']"
+    ),
+    "first name": (
+        "input[name*='first' i]",
+        "input[id*='first' i]",
+        "input[placeholder*='first' i]"
+    ),
+    "last name": (
+        "input[name*='last' i]",
+        "input[id*='last' i]",
+        "input[placeholder*='last' i]"
+    ),
+}
+
+_GENERIC_INPUT_SELECTORS = ("input[type='text']", "input:not([type])", "input:visible")
+
+# Click targets that usually load a new page, so the click waits for that navigation
+_NAVIGATING_TARGETS = frozenset({"login", "submit", "form_submit", "search_submit", "search_button"})
+# How long such a click waits for a navigation to start; AJAX forms and validation errors never navigate
+_NAVIGATION_GRACE_MS = 1500
+
+# Sentence classifier: trigger word -> category, with categories listed in dispatch priority
+_SENTENCE_TRIGGERS = {
+    "login": ("login", "log in", "sign in", "signin"),
+    "search": ("search", "find", "look for", "query"),
+    "click": ("click", "press", "tap", "select"),
+    "type": ("type", "enter", "input", "fill"),
+    "navigate": ("go to", "navigate", "visit", "open"),
+    "submit": ("submit", "send", "post"),
+    "cart": ("add to cart", "buy", "purchase", "add first"),
+    "scroll": ("scroll",),
+    "wait": ("wait", "pause", "delay"),
+}
+_TRIGGER_CATEGORY = {word: category for category, words in _SENTENCE_TRIGGERS.items() for word in words}
+
+if AHOCORASICK_AVAILABLE:
+    # One automaton walk finds every trigger word in a sentence
+    _CLASSIFIER = ahocorasick.Automaton()
+    for _word, _category in _TRIGGER_CATEGORY.items():
+        _CLASSIFIER.add_word(_word, (len(_word), _category))
+    _CLASSIFIER.make_automaton()
+
+# Regex fallback; the lookahead lets overlapping trigger words all match
+_TRIGGER_RE = re.compile("(?=(" + "|".join(re.escape(w) for w in _TRIGGER_CATEGORY) + "))")
+
+def _scan_triggers(text_lower):
+    """Yield (start offset, category) for every trigger word in the text"""
+    if AHOCORASICK_AVAILABLE:
+        for end, (length, category) in _CLASSIFIER.iter(text_lower):
+            yield end - length + 1, category
+    else:
+        for m in _TRIGGER_RE.finditer(text_lower):
+            yield m.start(), _TRIGGER_CATEGORY[m.group(1)]
 
 # Global storage
 test_sessions = {}
 active_executions = {}
 
+# Models
+class CreateTestRequest(BaseModel):
+    website_url: str
+    prompt: str
+    context: Optional[Dict[str, Any]] = None
+
+class ExecuteTestRequest(BaseModel):
+    session_id: str
+    options: Optional[Dict[str, Any]] = None
+
+# Browsers are kept running between sessions; each session only gets a fresh context
+playwright_instance = None
+browser_pool = []
+_browser_pool_lock = asyncio.Lock()
+
+async def _checkout_browser():
+    """Take an idle browser from the pool, launching one if none is free"""
+    global playwright_instance
+    async with _browser_pool_lock:
+        while browser_pool:
+            browser = browser_pool.pop()
+            if browser.is_connected():
+                return browser
+        
+        if playwright_instance is None:
+            playwright_instance = await async_playwright().start()
+    
+    print("🚀 Launching real browser...")
+    # Launch browser with visible window
+    return await playwright_instance.chromium.launch(
+        headless=False,  # Show the browser window
+        args=[
+            '--start-maximized',
+            '--disable-blink-features=AutomationControlled',
+            '--disable-web-security',
+            '--disable-features=VizDisplayCompositor'
+        ]
+    )
+
+async def close_browser_pool():
+    """Close every pooled browser and stop Playwright"""
+    global playwright_instance
+    async with _browser_pool_lock:
+        while browser_pool:
+            try:
+                await browser_pool.pop().close()
+            except Exception as e:
+                print(f"⚠️ Cleanup error: {e}")
+        if playwright_instance:
+            await playwright_instance.stop()
+            playwright_instance = None
+
 class RealBrowserAutomation:
     def __init__(self):
-        self.playwright = None
         self.browser = None
         self.page = None
         self.context = None
+        self._locator_cache = {}  # selector -> Locator on the current page
+        self._title_cache = None  # page title, kept until an action may change the page
     
-    def initialize(self):
+    async def initialize(self):
         """Initialize real Playwright browser"""
         if not PLAYWRIGHT_AVAILABLE:
             raise Exception("Playwright not available. Please install: pip install playwright && playwright install")
         
-        print("🚀 Launching real browser...")
-        self.playwright = sync_playwright().start()
+        self.browser = await _checkout_browser()
         
-        # Launch browser with visible window
-        self.browser = self.playwright.chromium.launch(
-            headless=False,  # Show the browser window
-            args=[
-                '--start-maximized',
-                '--disable-blink-features=AutomationControlled',
-                '--disable-web-security',
-                '--disable-features=VizDisplayCompositor'
-            ]
-        )
-        
-        # Create browser context
-        self.context = self.browser.new_context(
+        # Create browser context (a new context starts with no cookies or permissions)
+        self.context = await self.browser.new_context(
             viewport={'width': 1280, 'height': 720},
             user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         )
         
         # Create new page
-        self.page = self.context.new_page()
+        self.page = await self.context.new_page()
         
         # Set timeouts
         self.page.set_default_timeout(30000)
         self.page.set_default_navigation_timeout(30000)
         
-        print("✅ Browser launched successfully!")
+        print("✅ Browser ready!")
         
-    def cleanup(self):
+    async def cleanup(self):
         """Clean up browser resources"""
         try:
             print("🧹 Cleaning up browser...")
             if self.page:
-                self.page.close()
+                await self.page.close()
             if self.context:
-                self.context.close()
-            if self.browser:
-                self.browser.close()
-            if self.playwright:
-                self.playwright.stop()
+                await self.context.close()
+            if self.browser and self.browser.is_connected():
+                # Keep the browser running for the next session
+                browser_pool.append(self.browser)
             print("✅ Browser cleanup complete")
         except Exception as e:
             print(f"⚠️ Cleanup error: {e}")
     
-    def execute_action(self, action, session_id):
+    async def execute_action(self, action, session_id):
         """Execute a single action on the real browser"""
         action_type = action["type"]
         target = action["target"]
@@ -103,105 +400,117 @@ class RealBrowserAutomation:
         try:
             print(f"🔄 Executing: {action['description']}")
             
+            if action_type not in ("verify", "screenshot"):
+                self._title_cache = None
+            
             if action_type == "navigate":
                 print(f"🌐 Navigating to: {target}")
-                self.page.goto(target, wait_until="networkidle", timeout=30000)
-                self.page.wait_for_load_state("domcontentloaded")
-                time.sleep(2)  # Extra wait for dynamic content
+                self._locator_cache.clear()
+                await self.page.goto(target, wait_until="networkidle", timeout=30000)
+                await self.page.wait_for_load_state("domcontentloaded")
                 result = f"✅ Successfully navigated to {target}"
                 
             elif action_type == "click":
                 print(f"🖱️ Clicking: {target}")
-                selectors = self._generate_click_selectors(target)
-                
-                element_found = False
-                for selector in selectors:
-                    try:
-                        print(f"   Trying selector: {selector}")
-                        element = self.page.locator(selector).first
-                        if element.count() > 0:
-                            element.scroll_into_view_if_needed()
-                            element.click(timeout=10000)
-                            element_found = True
-                            result = f"✅ Successfully clicked: {target} (using {selector})"
-                            break
-                    except Exception as e:
-                        print(f"   ❌ Selector failed: {selector} - {e}")
-                        continue
-                
-                if not element_found:
+                element = await self._find_element(self._generate_click_selectors(target),
+                                                  self._semantic_locator(target, "click"))
+                if element is None:
                     raise Exception(f"Could not find clickable element: {target}")
+                navigates = action.get("waits_for_navigation", target in _NAVIGATING_TARGETS)
+                try:
+                    # click() scrolls the element into view as part of its actionability checks
+                    await self._click(element, navigates)
+                except PlaywrightTimeoutError:
+                    await element.scroll_into_view_if_needed()
+                    await self._click(element, navigates)
+                result = f"✅ Successfully clicked: {target}"
                     
             elif action_type == "type":
                 print(f"⌨️ Typing: '{value}' into {target}")
-                selectors = self._generate_input_selectors(target, value)
-                
-                element_found = False
-                for selector in selectors:
-                    try:
-                        print(f"   Trying input selector: {selector}")
-                        element = self.page.locator(selector).first
-                        if element.count() > 0:
-                            element.scroll_into_view_if_needed()
-                            element.clear()
-                            element.type(value, delay=100)  # Human-like typing
-                            element_found = True
-                            result = f"✅ Successfully typed '{value}' into {target} (using {selector})"
-                            break
-                    except Exception as e:
-                        print(f"   ❌ Input selector failed: {selector} - {e}")
-                        continue
-                
-                if not element_found:
+                element = await self._find_element(self._generate_input_selectors(target, "@" in value),
+                                                  self._semantic_locator(target, "input"))
+                if element is None:
                     raise Exception(f"Could not find input element: {target}")
+                await self._enter_text(element, value, action)
+                result = f"✅ Successfully typed '{value}' into {target}"
+                
+            elif action_type == "fill_form":
+                print(f"📝 Filling form: {', '.join(action['fields'])}")
+                result = await self._fill_form(action["fields"], action.get("submit"))
                     
             elif action_type == "wait":
-                wait_time = int(value) if value.isdigit() else 3000
-                print(f"⏱️ Waiting {wait_time}ms...")
-                time.sleep(wait_time / 1000)
-                result = f"✅ Waited {wait_time}ms"
+                if target in ("networkidle", "after_action"):
+                    # Wait for the network to go quiet instead of a fixed delay
+                    max_wait = int(value) if value.isdigit() else 5000
+                    print(f"⏱️ Waiting for network idle (up to {max_wait}ms)...")
+                    try:
+                        await self.page.wait_for_load_state("networkidle", timeout=max_wait)
+                    except Exception:
+                        pass  # Pages that keep polling never go idle; carry on
+                    result = "✅ Page settled"
+                elif not _CSS_CHARS.isdisjoint(target):
+                    max_wait = int(value) if value.isdigit() else 10000
+                    print(f"⏱️ Waiting for {target}...")
+                    await self.page.wait_for_selector(target, timeout=max_wait)
+                    result = f"✅ {target} appeared"
+                else:
+                    wait_time = int(value) if value.isdigit() else 3000
+                    print(f"⏱️ Waiting {wait_time}ms...")
+                    await self.page.wait_for_timeout(wait_time)
+                    result = f"✅ Waited {wait_time}ms"
                 
             elif action_type == "screenshot":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"real_{session_id}_{timestamp}.png"
-                filepath = os.path.join("screenshots", filename)
-                os.makedirs("screenshots", exist_ok=True)
+                # Interim captures default to a viewport JPEG; the final screenshot asks for a full-page PNG
+                image_type = action.get("format", "jpeg")
+                options = {"type": image_type}
+                if image_type == "jpeg":
+                    options["quality"] = action.get("quality", 70)
+                
+                # The screenshots directory is created once at import time
+                filename = f"real_{session_id}_{datetime.now():%Y%m%d_%H%M%S}.{'png' if image_type == 'png' else 'jpg'}"
+                filepath = f"screenshots/{filename}"
                 
                 print(f"📸 Taking screenshot: {filename}")
-                self.page.screenshot(path=filepath, full_page=True)
+                if target:
+                    # Capture just the targeted element
+                    await self._locator(target).first.screenshot(path=filepath, **options)
+                else:
+                    await self.page.screenshot(path=filepath, full_page=action.get("full_page", False), **options)
                 result = f"✅ Screenshot saved: /screenshots/{filename}"
                 
             elif action_type == "key":
                 print(f"⌨️ Pressing key: {value}")
                 if target == "search":
                     # Find search input and press key
-                    search_selectors = self._generate_input_selectors("search", "")
+                    search_selectors = self._generate_input_selectors("search", False)
                     for selector in search_selectors:
                         try:
-                            element = self.page.locator(selector).first
-                            if element.count() > 0:
-                                element.press(value)
-                                result = f"✅ Pressed {value} key in search box"
-                                break
+                            element = self._locator(selector).first
+                            await element.wait_for(state="attached", timeout=500)
+                            await element.press(value)
+                            result = f"✅ Pressed {value} key in search box"
+                            break
                         except:
                             continue
                 else:
-                    self.page.keyboard.press(value)
+                    await self.page.keyboard.press(value)
                     result = f"✅ Pressed {value} key"
 
             elif action_type == "scroll":
                 print(f"📜 Scrolling {target}")
                 if target == "down":
                     scroll_amount = int(value) if value.isdigit() else 500
-                    self.page.mouse.wheel(0, scroll_amount)
+                    await self.page.mouse.wheel(0, scroll_amount)
                 elif target == "up":
                     scroll_amount = int(value) if value.isdigit() else 500
-                    self.page.mouse.wheel(0, -scroll_amount)
+                    await self.page.mouse.wheel(0, -scroll_amount)
                 result = f"✅ Scrolled {target} by {value}px"
 
             elif action_type == "verify":
                 if target == "title":
-                    page_title = self.page.title()
+                    page_title = self._title_cache
+                    if page_title is None:
+                        page_title = self._title_cache = await self.page.title()
                     print(f"🔍 Verifying title: '{page_title}' contains '{value}'")
                     if value.lower() in page_title.lower():
                         result = f"✅ Title verification passed: '{page_title}' contains '{value}'"
@@ -221,95 +530,143 @@ class RealBrowserAutomation:
             print(f"❌ Action failed: {error_msg}")
             return {"status": "failed", "result": None, "error": error_msg}
     
-    def _generate_click_selectors(self, target):
+    async def _fill_form(self, fields, submit=None):
+        """Fill several inputs and optionally click submit, with no pauses in between"""
+        for field, field_value in fields.items():
+            element = await self._find_element(self._generate_input_selectors(field, "@" in field_value),
+                                              self._semantic_locator(field, "input"))
+            if element is None:
+                raise Exception(f"Could not find input element: {field}")
+            await element.fill(field_value)
+        
+        if submit:
+            element = await self._find_element(self._generate_click_selectors(submit),
+                                              self._semantic_locator(submit, "click"))
+            if element is None:
+                raise Exception(f"Could not find clickable element: {submit}")
+            await self._click(element, submit in _NAVIGATING_TARGETS)
+            return f"✅ Filled {', '.join(fields)} and clicked {submit}"
+        return f"✅ Filled {', '.join(fields)}"
+    
+    async def _click(self, element, navigates=False):
+        """Click an element; if that starts a navigation, return once the new page's DOM is ready"""
+        if not navigates:
+            await element.click(timeout=10000)
+            return
+        main_frame = self.page.main_frame
+        navigation = asyncio.ensure_future(self.page.wait_for_event(
+            "framenavigated", predicate=lambda frame: frame == main_frame, timeout=_NAVIGATION_GRACE_MS
+        ))
+        try:
+            await element.click(timeout=10000)
+        except Exception:
+            navigation.cancel()
+            raise
+        try:
+            await navigation
+        except PlaywrightTimeoutError:
+            print("   ⚠️ Click did not trigger a navigation")
+            return
+        await self.page.wait_for_load_state("domcontentloaded", timeout=10000)
+        self._locator_cache.clear()
+    
+    async def _find_element(self, selectors, semantic=None):
+        """Find an element: semantic locators, then each strategy in priority order"""
+        # is_visible() answers right away, so a target with no semantic match costs one round trip, not a timeout
+        if semantic is not None:
+            try:
+                if await semantic.is_visible():
+                    print("   ✅ Matched by role/label/placeholder")
+                    return semantic
+            except Exception:
+                pass
+        
+        for run in _selector_runs(selectors):
+            if isinstance(run, tuple):
+                # A run of plain CSS strategies is checked in one round trip, still in priority order
+                index = await self.page.evaluate(_FIRST_VISIBLE_JS, list(run))
+                if index >= 0:
+                    print(f"   ✅ Matched selector: {run[index]}")
+                    return self._locator(f"{run[index]} >> visible=true").first
+                continue
+            try:
+                if run.startswith("*:has-text("):
+                    print(f"   ⚠️ Falling back to a universal text scan: {run}")
+                else:
+                    print(f"   Trying selector: {run}")
+                element = self._locator(f"{run} >> visible=true").first
+                if await element.count():
+                    return element
+            except Exception as e:
+                print(f"   ❌ Selector failed: {run} - {e}")
+        return None
+    
+    async def _enter_text(self, element, value, action):
+        """Fill an input in one call, or type key by key when the plan asks for it"""
+        if action.get("human_typing"):
+            await element.clear()
+            await element.type(value, delay=100)
+        else:
+            await element.fill(value)
+    
+    def _semantic_locator(self, target, kind):
+        """Return one combined role/label/placeholder Locator for a plain-text target, or None"""
+        if not target or not _CSS_CHARS.isdisjoint(target):
+            return None
+        key = (kind, target)
+        locator = self._locator_cache.get(key)
+        if locator is None:
+            name = re.compile(re.escape(target.replace("_", " ")), re.I)
+            if kind == "input":
+                locator = (self.page.get_by_label(name)
+                           .or_(self.page.get_by_placeholder(name))
+                           .or_(self.page.get_by_role("textbox", name=name)))
+            else:
+                locator = (self.page.get_by_role("button", name=name)
+                           .or_(self.page.get_by_role("link", name=name)))
+            locator = self._locator_cache[key] = locator.first
+        return locator
+    
+    def _locator(self, selector):
+        """Return the Locator for selector, reusing it until the next navigation"""
+        locator = self._locator_cache.get(selector)
+        if locator is None:
+            locator = self._locator_cache[selector] = self.page.locator(selector)
+        return locator
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _generate_click_selectors(target):
         """Generate multiple selector strategies for clicking"""
         selectors = []
         
         # If it's already a CSS selector, try it first
-        if any(char in target for char in ['[', '.', '#', ':', '>']):
+        if not _CSS_CHARS.isdisjoint(target):
             selectors.append(target)
         
         # Generate smart selectors based on common patterns
         target_lower = target.lower()
 
         # Handle special smart targets
-        if target_lower == "first_result":
-            selectors.extend([
-                ".search-result:first-child a",
-                ".result:first-child a",
-                ".search-results > div:first-child a",
-                "h3:first-child a",
-                ".repo-list-item:first-child a"
-            ])
-        elif target_lower == "first_product":
-            selectors.extend([
-                ".product:first-child",
-                ".product-item:first-child",
-                ".inventory-item:first-child",
-                "[data-testid='product']:first-child",
-                ".product-card:first-child"
-            ])
-        elif target_lower == "first_link":
-            selectors.extend([
-                "a:first-child",
-                "main a:first-child",
-                ".content a:first-child"
-            ])
-        elif target_lower == "first_item":
-            selectors.extend([
-                ":first-child",
-                "li:first-child",
-                "div:first-child"
-            ])
-        elif target_lower == "add_to_cart":
-            selectors.extend([
-                "button:has-text('Add to cart')",
-                "button:has-text('Add to Cart')",
-                ".add-to-cart",
-                "#add-to-cart",
-                "[data-testid='add-to-cart']",
-                "button[name='add-to-cart']"
-            ])
-        elif target_lower == "search_button":
-            selectors.extend([
-                "button[type='submit']",
-                "input[type='submit']",
-                "button:has-text('Search')",
-                ".search-btn",
-                "#search-btn",
-                "[data-testid='search-button']"
-            ])
-        elif target_lower == "form_submit":
-            selectors.extend([
-                "button[type='submit']",
-                "input[type='submit']",
-                "form button:last-child",
-                ".submit-btn"
-            ])
+        if target_lower in _STATIC_CLICK_SELECTORS:
+            selectors.extend(_STATIC_CLICK_SELECTORS[target_lower])
         else:
-            # Standard button selectors
-            selectors.extend([
-                f"button:has-text('{target}')",
-                f"input[type='button']:has([value*='{target}' i])",
-                f"input[type='submit']:has([value*='{target}' i])",
-                f"a:has-text('{target}')",
-            ])
-
-            # Common class and ID patterns
+            # ID and attribute selectors first; they resolve without scanning page text
             target_slug = target_lower.replace(' ', '-').replace('_', '-')
             selectors.extend([
                 f"#{target_slug}",
-                f".{target_slug}",
                 f"[data-testid*='{target_slug}']",
                 f"[aria-label*='{target}' i]",
+                f".{target_slug}",
                 f"[title*='{target}' i]",
             ])
 
-            # Text-based selectors
+            # Standard button selectors
             selectors.extend([
-                f"*:has-text('{target}'):visible",
-                f"span:has-text('{target}')",
-                f"div:has-text('{target}')",
+                f"button:has-text('{target}')",
+                f"input[type='button']:has([value*='{target}' i])",
+                f"input[type='submit']:has([value*='{target}' i])",
+                f"a:has-text('{target}')",
             ])
 
             # Login-specific selectors
@@ -320,79 +677,41 @@ class RealBrowserAutomation:
                     ".login-btn", ".login-button", "#login-btn", "#login-button",
                     "[data-testid='login']", "[data-testid='login-button']"
                 ])
+
+            # Scanning the text of every element is a last resort, and only
+            # worth it for targets specific enough not to match half the page
+            if len(target) > 3:
+                selectors.append(f"*:has-text('{target}'):visible")
         
-        return selectors
+        return tuple(dict.fromkeys(selectors))  # drop duplicates, keep order
     
-    def _generate_input_selectors(self, target, value):
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _generate_input_selectors(target, value_is_email):
         """Generate multiple selector strategies for inputs"""
         selectors = []
         
         # If it's already a CSS selector, try it first
-        if any(char in target for char in ['[', '.', '#', ':', '>']):
+        if not _CSS_CHARS.isdisjoint(target):
             selectors.append(target)
         
         target_lower = target.lower()
 
         # Handle smart input targets
         if target_lower == "username":
-            selectors.extend([
-                "input[name='username']",
-                "input[id='username']",
-                "input[name='user']",
-                "input[id='user']",
-                "input[placeholder*='username' i]",
-                "input[placeholder*='user' i]",
-                "[data-testid*='username']"
-            ])
-        elif 'email' in target_lower or '@' in value:
-            selectors.extend([
-                "input[type='email']",
-                "input[name*='email' i]",
-                "input[id*='email' i]",
-                "input[placeholder*='email' i]",
-                "[data-testid*='email']"
-            ])
+            selectors.extend(_STATIC_INPUT_SELECTORS["username"])
+        elif 'email' in target_lower or value_is_email:
+            selectors.extend(_STATIC_INPUT_SELECTORS["email"])
         elif 'password' in target_lower:
-            selectors.extend([
-                "input[type='password']",
-                "input[name*='password' i]",
-                "input[id*='password' i]",
-                "input[placeholder*='password' i]",
-                "[data-testid*='password']"
-            ])
+            selectors.extend(_STATIC_INPUT_SELECTORS["password"])
         elif 'search' in target_lower:
-            selectors.extend([
-                "input[type='search']",
-                "input[name*='search' i]",
-                "input[id*='search' i]",
-                "input[placeholder*='search' i]",
-                "[data-testid*='search']",
-                ".search-input", "#search-input",
-                "input[name='q']",  # Common search parameter
-                "input[name='query']"
-            ])
+            selectors.extend(_STATIC_INPUT_SELECTORS["search"])
         elif 'name' in target_lower and 'username' not in target_lower:
-            selectors.extend([
-                "input[name*='name' i]",
-                "input[id*='name' i]",
-                "input[placeholder*='name' i]",
-                "[data-testid*='name']",
-                "input[name='first_name']",
-                "input[name='last_name']",
-                "input[name='full_name']"
-            ])
+            selectors.extend(_STATIC_INPUT_SELECTORS["name"])
         elif target_lower in ["first name", "firstname"]:
-            selectors.extend([
-                "input[name*='first' i]",
-                "input[id*='first' i]",
-                "input[placeholder*='first' i]"
-            ])
+            selectors.extend(_STATIC_INPUT_SELECTORS["first name"])
         elif target_lower in ["last name", "lastname"]:
-            selectors.extend([
-                "input[name*='last' i]",
-                "input[id*='last' i]",
-                "input[placeholder*='last' i]"
-            ])
+            selectors.extend(_STATIC_INPUT_SELECTORS["last name"])
         
         # Generic input selectors
         selectors.extend([
@@ -400,13 +719,11 @@ class RealBrowserAutomation:
             f"input[name*='{target.lower()}']",
             f"input[id*='{target.lower()}']",
             f"textarea[placeholder*='{target}' i]",
-            f"textarea[name*='{target.lower()}']",
-            "input[type='text']",
-            "input:not([type])",
-            "input:visible"
+            f"textarea[name*='{target.lower()}']"
         ])
+        selectors.extend(_GENERIC_INPUT_SELECTORS)
         
-        return selectors
+        return tuple(dict.fromkeys(selectors))  # drop duplicates, keep order
 
 def generate_intelligent_action_plan(prompt, website_url):
     """Generate intelligent action plan from natural language prompt with advanced understanding"""
@@ -426,21 +743,23 @@ def generate_intelligent_action_plan(prompt, website_url):
     actions.append({
         "type": "wait",
         "description": "Wait for page to fully load",
-        "target": "time",
-        "value": "3000",
-        "timeout": 5000
+        "target": "networkidle",
+        "value": "5000",
+        "timeout": 6000
     })
 
     # Advanced prompt parsing with better understanding
     actions.extend(_parse_advanced_actions(prompt, website_url))
 
     # Always add screenshot if mentioned or at the end
-    if "screenshot" in prompt_lower or len([a for a in actions if a["type"] == "screenshot"]) == 0:
+    if "screenshot" in prompt_lower or not any(a["type"] == "screenshot" for a in actions):
         actions.append({
             "type": "screenshot",
             "description": "Take final screenshot",
             "target": "",
             "value": "",
+            "format": "png",
+            "full_page": True,
             "timeout": 5000
         })
 
@@ -451,46 +770,42 @@ def _parse_advanced_actions(prompt, website_url):
     actions = []
     prompt_lower = prompt.lower()
 
-    # Split prompt into sentences for better understanding
-    sentences = [s.strip() for s in prompt.replace(',', '.').split('.') if s.strip()]
-
-    for sentence in sentences:
-        sentence_lower = sentence.lower()
-
-        # Login actions with better pattern matching
-        if any(word in sentence_lower for word in ['login', 'log in', 'sign in', 'signin']):
+    # Split prompt into sentences for better understanding, remembering where each starts
+    sentences = []
+    sentence_starts = []
+    offset = 0
+    for part in prompt.replace(',', '.').split('.'):
+        if part.strip():
+            sentences.append(part.strip())
+            sentence_starts.append(offset)
+        offset += len(part) + 1
+
+    # Classify every sentence in one scan over the whole prompt; trigger words never
+    # contain '.' or ',' so each match falls inside a single sentence
+    sentence_categories = [set() for _ in sentences]
+    for start, category in _scan_triggers(prompt.lower()):
+        sentence_categories[bisect.bisect_right(sentence_starts, start) - 1].add(category)
+
+    for sentence, categories in zip(sentences, sentence_categories):
+
+        # Dispatch on the highest-priority category found in the sentence
+        if "login" in categories:
             actions.extend(_generate_smart_login_actions(sentence))
-
-        # Search actions with better understanding
-        elif any(word in sentence_lower for word in ['search', 'find', 'look for', 'query']):
+        elif "search" in categories:
             actions.extend(_generate_smart_search_actions(sentence))
-
-        # Click actions with specific targeting
-        elif any(word in sentence_lower for word in ['click', 'press', 'tap', 'select']):
+        elif "click" in categories:
             actions.extend(_generate_smart_click_actions(sentence))
-
-        # Type/input actions
-        elif any(word in sentence_lower for word in ['type', 'enter', 'input', 'fill']):
+        elif "type" in categories:
             actions.extend(_generate_smart_type_actions(sentence))
-
-        # Navigation actions
-        elif any(word in sentence_lower for word in ['go to', 'navigate', 'visit', 'open']):
+        elif "navigate" in categories:
             actions.extend(_generate_smart_navigation_actions(sentence, website_url))
-
-        # Form submission
-        elif any(word in sentence_lower for word in ['submit', 'send', 'post']):
+        elif "submit" in categories:
             actions.extend(_generate_smart_submit_actions(sentence))
-
-        # Shopping/cart actions
-        elif any(word in sentence_lower for word in ['add to cart', 'buy', 'purchase', 'add first']):
+        elif "cart" in categories:
             actions.extend(_generate_smart_cart_actions(sentence))
-
-        # Scroll actions
-        elif any(word in sentence_lower for word in ['scroll', 'scroll down', 'scroll up']):
+        elif "scroll" in categories:
             actions.extend(_generate_smart_scroll_actions(sentence))
-
-        # Wait actions
-        elif any(word in sentence_lower for word in ['wait', 'pause', 'delay']):
+        elif "wait" in categories:
             actions.extend(_generate_smart_wait_actions(sentence))
 
     return actions
@@ -499,84 +814,48 @@ def _generate_smart_login_actions(sentence):
     """Generate smart login actions from sentence"""
     actions = []
 
-    # Extract credentials with better patterns
-    email_patterns = [
-        r'with\s+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'email[:\s]+([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})',
-        r'([a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})'
-    ]
-
-    password_patterns = [
-        r'password[:\s/]+([^\s,]+)',
-        r'/\s*([^\s,]+)',
-        r'with\s+\w+\s*/\s*([^\s,]+)'
-    ]
-
-    username_patterns = [
-        r'with\s+([a-zA-Z0-9_]+)\s*/',
-        r'username[:\s]+([a-zA-Z0-9_]+)',
-        r'user[:\s]+([a-zA-Z0-9_]+)'
-    ]
-
     email = None
     password = None
     username = None
 
     # Try to extract email
-    for pattern in email_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _LOGIN_EMAIL_RES:
+        match = rx.search(sentence)
         if match:
             email = match.group(1)
             break
 
     # Try to extract password
-    for pattern in password_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _LOGIN_PW_RES:
+        match = rx.search(sentence)
         if match:
             password = match.group(1)
             break
 
     # Try to extract username
-    for pattern in username_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _LOGIN_USER_RES:
+        match = rx.search(sentence)
         if match:
             username = match.group(1)
             break
 
-    # Add login actions based on what we found
+    # Fill every credential we found and submit in a single action
+    fields = {}
     if username:
-        actions.append({
-            "type": "type",
-            "description": f"Enter username: {username}",
-            "target": "username",
-            "value": username,
-            "timeout": 10000
-        })
-
+        fields["username"] = username
     if email:
-        actions.append({
-            "type": "type",
-            "description": f"Enter email: {email}",
-            "target": "email",
-            "value": email,
-            "timeout": 10000
-        })
-
+        fields["email"] = email
     if password:
-        actions.append({
-            "type": "type",
-            "description": f"Enter password: {password}",
-            "target": "password",
-            "value": password,
-            "timeout": 10000
-        })
+        fields["password"] = password
 
-    # Add login button click
     actions.append({
-        "type": "click",
-        "description": "Click login button",
+        "type": "fill_form",
+        "description": "Fill login form and click login button",
         "target": "login",
         "value": "",
+        "fields": fields,
+        "submit": "login",
+        "waits_for_navigation": True,
         "timeout": 10000
     })
 
@@ -586,21 +865,9 @@ def _generate_smart_search_actions(sentence):
     """Generate smart search actions from sentence"""
     actions = []
 
-    # Extract search term with better patterns
-    search_patterns = [
-        r'search for ["\']([^"\']+)["\']',
-        r'search for (.+?)(?:\s+and|\s+then|\s+in|$)',
-        r'find ["\']([^"\']+)["\']',
-        r'find (.+?)(?:\s+and|\s+then|\s+in|$)',
-        r'look for ["\']([^"\']+)["\']',
-        r'look for (.+?)(?:\s+and|\s+then|\s+in|$)',
-        r'query ["\']([^"\']+)["\']',
-        r'query (.+?)(?:\s+and|\s+then|\s+in|$)'
-    ]
-
     search_term = "test"  # Default
-    for pattern in search_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _SEARCH_RES:
+        match = rx.search(sentence)
         if match:
             search_term = match.group(1).strip().strip('"\'')
             break
@@ -638,6 +905,7 @@ def _generate_smart_search_actions(sentence):
             "description": "Click search button",
             "target": "search_button",
             "value": "",
+            "waits_for_navigation": True,
             "timeout": 10000
         })
 
@@ -647,21 +915,9 @@ def _generate_smart_click_actions(sentence):
     """Generate smart click actions from sentence"""
     actions = []
 
-    # Extract what to click with better patterns
-    click_patterns = [
-        r'click (?:on )?(?:the )?["\']([^"\']+)["\']',
-        r'click (?:on )?(?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)',
-        r'press (?:the )?["\']([^"\']+)["\']',
-        r'press (?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)',
-        r'tap (?:on )?(?:the )?["\']([^"\']+)["\']',
-        r'tap (?:on )?(?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)',
-        r'select (?:the )?["\']([^"\']+)["\']',
-        r'select (?:the )?(.+?)(?:\s+and|\s+then|\s+to|$)'
-    ]
-
     target = "button"  # Default
-    for pattern in click_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _CLICK_RES:
+        match = rx.search(sentence)
         if match:
             target = match.group(1).strip().strip('"\'')
             break
@@ -691,23 +947,13 @@ def _generate_smart_type_actions(sentence):
     """Generate smart typing actions from sentence"""
     actions = []
 
-    # Extract what to type and where
-    type_patterns = [
-        r'type ["\']([^"\']+)["\'] (?:in|into) (?:the )?(.+?)(?:\s+and|\s+then|$)',
-        r'enter ["\']([^"\']+)["\'] (?:in|into) (?:the )?(.+?)(?:\s+and|\s+then|$)',
-        r'input ["\']([^"\']+)["\'] (?:in|into) (?:the )?(.+?)(?:\s+and|\s+then|$)',
-        r'fill (?:the )?(.+?) with ["\']([^"\']+)["\']',
-        r'type ["\']([^"\']+)["\']',
-        r'enter ["\']([^"\']+)["\']'
-    ]
-
     text = ""
     target = "input"
 
-    for pattern in type_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _TYPE_RES:
+        match = rx.search(sentence)
         if match:
-            if "with" in pattern:  # fill X with Y pattern
+            if "with" in rx.pattern:  # fill X with Y pattern
                 target = match.group(1).strip()
                 text = match.group(2).strip()
             else:  # type X into Y pattern
@@ -731,17 +977,9 @@ def _generate_smart_navigation_actions(sentence, website_url):
     """Generate smart navigation actions from sentence"""
     actions = []
 
-    # Extract navigation target
-    nav_patterns = [
-        r'go to (?:the )?(.+?)(?:\s+and|\s+then|$)',
-        r'navigate to (?:the )?(.+?)(?:\s+and|\s+then|$)',
-        r'visit (?:the )?(.+?)(?:\s+and|\s+then|$)',
-        r'open (?:the )?(.+?)(?:\s+and|\s+then|$)'
-    ]
-
     target = ""
-    for pattern in nav_patterns:
-        match = re.search(pattern, sentence, re.IGNORECASE)
+    for rx in _NAV_RES:
+        match = rx.search(sentence)
         if match:
             target = match.group(1).strip()
             break
@@ -775,6 +1013,7 @@ def _generate_smart_submit_actions(sentence):
         "description": f"Submit {target}",
         "target": target,
         "value": "",
+        "waits_for_navigation": True,
         "timeout": 10000
     })
 
@@ -829,7 +1068,7 @@ def _generate_smart_wait_actions(sentence):
     actions = []
 
     # Extract wait time if specified
-    time_match = re.search(r'(\d+)\s*(?:second|sec|ms|millisecond)', sentence, re.IGNORECASE)
+    time_match = _WAIT_TIME_RE.search(sentence)
     if time_match:
         wait_time = int(time_match.group(1))
         if "ms" in sentence.lower() or "millisecond" in sentence.lower():
@@ -854,11 +1093,11 @@ def _generate_form_actions(prompt):
     actions = []
     
     # Extract name if present
-    name_match = re.search(r'name ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
+    name_match = _FORM_NAME_RE.search(prompt)
     name = name_match.group(1) if name_match else "John Doe"
     
     # Extract email if present
-    email_match = re.search(r'email ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
+    email_match = _FORM_EMAIL_RE.search(prompt)
     email = email_match.group(1) if email_match else "john.doe@example.com"
     
     actions.extend([
@@ -913,7 +1152,7 @@ def _generate_verification_actions(prompt):
     actions = []
     
     if "title" in prompt.lower():
-        title_match = re.search(r'title contains ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
+        title_match = _TITLE_RE.search(prompt)
         title_text = title_match.group(1) if title_match else "Example"
         
         actions.append({
@@ -926,7 +1165,7 @@ def _generate_verification_actions(prompt):
     
     return actions
 
-def execute_real_test_session(session_id):
+async def execute_real_test_session(session_id: str):
     """Execute test session with REAL browser automation"""
     session = test_sessions[session_id]
     browser_automation = None
@@ -936,7 +1175,7 @@ def execute_real_test_session(session_id):
         
         # Initialize real browser
         browser_automation = RealBrowserAutomation()
-        browser_automation.initialize()
+        await browser_automation.initialize()
         
         active_executions[session_id] = {
             "browser": browser_automation,
@@ -952,7 +1191,7 @@ def execute_real_test_session(session_id):
         for i, action in enumerate(session["action_plan"]["actions"]):
             active_executions[session_id]["current_action"] = i
             
-            result = browser_automation.execute_action(action, session_id)
+            result = await browser_automation.execute_action(action, session_id)
             action_results.append({
                 "action": action,
                 "result": result,
@@ -965,8 +1204,11 @@ def execute_real_test_session(session_id):
                 failed_actions += 1
                 # Continue with other actions even if one fails
             
-            # Add delay between actions for stability
-            time.sleep(2)
+            # Let the page settle instead of sleeping a fixed 2s between actions
+            try:
+                await browser_automation.page.wait_for_load_state("domcontentloaded", timeout=5000)
+            except Exception:
+                pass
         
         # Update session with results
         session["status"] = "completed"
@@ -978,11 +1220,11 @@ def execute_real_test_session(session_id):
         
         print(f"🎉 REAL test completed: {successful_actions} successful, {failed_actions} failed")
         
-        # Keep browser open for longer to see results
-        print("🔍 Keeping browser open for 30 seconds to view results...")
-        print("🌐 You can interact with the browser window that opened!")
-        print("⏰ Browser will close automatically in 30 seconds...")
-        time.sleep(30)
+        # Optionally keep the browser open to see results; it stays checked out meanwhile
+        if VIEW_SECS:
+            print(f"🔍 Keeping browser open for {VIEW_SECS} seconds to view results...")
+            print("🌐 You can interact with the browser window that opened!")
+            await asyncio.sleep(VIEW_SECS)
         
     except Exception as e:
         print(f"❌ REAL test execution failed: {e}")
@@ -993,181 +1235,113 @@ def execute_real_test_session(session_id):
     finally:
         # Cleanup browser
         if browser_automation:
-            browser_automation.cleanup()
+            await browser_automation.cleanup()
         if session_id in active_executions:
             del active_executions[session_id]
 
-class RequestHandler(BaseHTTPRequestHandler):
-    def do_OPTIONS(self):
-        """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+# Lifecycle
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_browser_pool()
+
+# Routes
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "playwright_available": PLAYWRIGHT_AVAILABLE,
+        "active_sessions": len(active_executions),
+        "total_sessions": len(test_sessions),
+        "mode": "REAL_BROWSER_AUTOMATION",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/tests/{session_id}")
+async def get_test_results(session_id: str):
+    if session_id not in test_sessions:
+        raise HTTPException(status_code=404, detail="Test session not found")
     
-    def do_GET(self):
-        """Handle GET requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        
-        if path == '/health':
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
-            response = {
-                "status": "healthy",
-                "playwright_available": PLAYWRIGHT_AVAILABLE,
-                "active_sessions": len(active_executions),
-                "total_sessions": len(test_sessions),
-                "mode": "REAL_BROWSER_AUTOMATION",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif path.startswith('/api/tests/') and len(path.split('/')) == 4:
-            # Get test results
-            session_id = path.split('/')[-1]
-            
-            if session_id in test_sessions:
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
-                session = test_sessions[session_id]
-                execution_status = {}
-                
-                if session_id in active_executions:
-                    exec_info = active_executions[session_id]
-                    execution_status = {
-                        "current_action": exec_info["current_action"],
-                        "progress": (exec_info["current_action"] / len(session["action_plan"]["actions"])) * 100
-                    }
-                
-                response = {
-                    "session": session,
-                    "execution_status": execution_status
-                }
-                self.wfile.write(json.dumps(response).encode())
-            else:
-                self.send_response(404)
-                self.end_headers()
-        else:
-            self.send_response(404)
-            self.end_headers()
+    session = test_sessions[session_id]
+    execution_status = {}
     
-    def do_POST(self):
-        """Handle POST requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        
-        # Read request body
-        content_length = int(self.headers['Content-Length'])
-        post_data = self.rfile.read(content_length)
-        
-        try:
-            data = json.loads(post_data.decode())
-        except:
-            self.send_response(400)
-            self.end_headers()
-            return
-        
-        if path == '/api/tests/create':
-            # Create test
-            session_id = str(uuid.uuid4())
+    if session_id in active_executions:
+        exec_info = active_executions[session_id]
+        execution_status = {
+            "current_action": exec_info["current_action"],
+            "progress": (exec_info["current_action"] / len(session["action_plan"]["actions"])) * 100
+        }
+    
+    return {
+        "session": session,
+        "execution_status": execution_status
+    }
 
-            # Debug: Print received data
-            print(f"🔍 DEBUG: Received prompt: '{data.get('prompt', 'NO PROMPT')}'")
-            print(f"🔍 DEBUG: Received website_url: '{data.get('website_url', 'NO URL')}'")
-            print(f"🔍 DEBUG: Full data received: {data}")
+@app.post("/api/tests/create")
+async def create_test(request: CreateTestRequest):
+    session_id = str(uuid.uuid4())
 
-            # Generate intelligent action plan
-            actions = generate_intelligent_action_plan(data["prompt"], data["website_url"])
-            
-            action_plan = {
-                "id": str(uuid.uuid4()),
-                "website_url": data["website_url"],
-                "actions": actions,
-                "confidence": 0.95,
-                "reasoning": "Generated for REAL browser automation with intelligent element detection",
-                "estimated_duration": len(actions) * 5,
-                "risk_level": "low"
-            }
-            
-            # Store session
-            test_sessions[session_id] = {
-                "id": session_id,
-                "website_url": data["website_url"],
-                "original_prompt": data["prompt"],
-                "action_plan": action_plan,
-                "status": "pending",
-                "created_at": datetime.utcnow().isoformat(),
-                "total_actions": len(actions),
-                "successful_actions": 0,
-                "failed_actions": 0,
-                "screenshots": []
-            }
-            
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
-            response = {
-                "session_id": session_id,
-                "action_plan": action_plan,
-                "estimated_duration": action_plan["estimated_duration"],
-                "risk_assessment": action_plan["risk_level"]
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif path == '/api/tests/execute':
-            # Execute test with REAL browser
-            session_id = data["session_id"]
-            
-            if session_id not in test_sessions:
-                self.send_response(404)
-                self.end_headers()
-                return
-            
-            session = test_sessions[session_id]
-            
-            if session["status"] != "pending":
-                self.send_response(400)
-                self.end_headers()
-                return
-            
-            # Start REAL execution in background thread
-            session["status"] = "running"
-            session["started_at"] = datetime.utcnow().isoformat()
-            
-            thread = threading.Thread(target=execute_real_test_session, args=(session_id,))
-            thread.daemon = True
-            thread.start()
-            
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
-            response = {
-                "session_id": session_id,
-                "status": "running",
-                "message": "🚀 REAL browser automation started! Browser will open shortly..."
-            }
-            self.wfile.write(json.dumps(response).encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
+    # Debug: Print received data
+    print(f"🔍 DEBUG: Received prompt: '{request.prompt}'")
+    print(f"🔍 DEBUG: Received website_url: '{request.website_url}'")
+
+    # Generate intelligent action plan
+    actions = generate_intelligent_action_plan(request.prompt, request.website_url)
+    
+    action_plan = {
+        "id": str(uuid.uuid4()),
+        "website_url": request.website_url,
+        "actions": actions,
+        "confidence": 0.95,
+        "reasoning": "Generated for REAL browser automation with intelligent element detection",
+        "estimated_duration": len(actions) * 5,
+        "risk_level": "low"
+    }
+    
+    # Store session
+    test_sessions[session_id] = {
+        "id": session_id,
+        "website_url": request.website_url,
+        "original_prompt": request.prompt,
+        "action_plan": action_plan,
+        "status": "pending",
+        "created_at": datetime.utcnow().isoformat(),
+        "total_actions": len(actions),
+        "successful_actions": 0,
+        "failed_actions": 0,
+        "screenshots": []
+    }
+    
+    return {
+        "session_id": session_id,
+        "action_plan": action_plan,
+        "estimated_duration": action_plan["estimated_duration"],
+        "risk_assessment": action_plan["risk_level"]
+    }
+
+@app.post("/api/tests/execute")
+async def execute_test(request: ExecuteTestRequest):
+    if request.session_id not in test_sessions:
+        raise HTTPException(status_code=404, detail="Test session not found")
+    
+    session = test_sessions[request.session_id]
+    
+    if session["status"] != "pending":
+        raise HTTPException(status_code=400, detail=f"Test is already {session['status']}")
+    
+    # Start REAL execution in the background on the server's event loop
+    session["status"] = "running"
+    session["started_at"] = datetime.utcnow().isoformat()
+    
+    asyncio.create_task(execute_real_test_session(request.session_id))
+    
+    return {
+        "session_id": request.session_id,
+        "status": "running",
+        "message": "🚀 REAL browser automation started! Browser will open shortly..."
+    }
 
 def run_server():
     """Run the HTTP server"""
-    server_address = ('', 8000)
-    httpd = HTTPServer(server_address, RequestHandler)
-    
     print("🚀 Starting REAL Browser Automation Server")
     print("🌐 This version will actually open browsers and perform actions!")
     print(f"📡 Server running on http://localhost:8000")
@@ -1184,11 +1358,15 @@ def run_server():
         print("✅ Ready to launch real browsers and perform actual automation!")
         print()
     
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\n🛑 Server stopped")
-        httpd.shutdown()
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        log_level="info",
+        access_log=False
+    )
 
 if __name__ == "__main__":
     run_server()
@@ -2,15 +2,28 @@
 """
 Real Browser Automation Backend using Selenium - Actually opens browsers and performs actions
 """
+import atexit
+import base64
+import concurrent.futures
+import functools
+import gzip
 import json
 import os
+import queue
 import uuid
 import time
-import threading
 import re
+import threading
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+
+# Prefer orjson for request/response bodies; it writes bytes directly
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Try to import Selenium
 try:
@@ -20,126 +33,285 @@ try:
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
     from selenium.webdriver.chrome.options import Options
-    from selenium.common.exceptions import TimeoutException, NoSuchElementException
+    from selenium.common.exceptions import (
+        TimeoutException, NoSuchElementException, StaleElementReferenceException,
+        ElementClickInterceptedException, ElementNotInteractableException
+    )
+    # Selector strategy name -> Selenium locator type
+    _BY = {
+        "xpath": By.XPATH,
+        "css": By.CSS_SELECTOR,
+        "id": By.ID,
+        "name": By.NAME,
+        "class": By.CLASS_NAME,
+        "tag": By.TAG_NAME,
+        "link_text": By.LINK_TEXT,
+        "partial_link_text": By.PARTIAL_LINK_TEXT,
+    }
     SELENIUM_AVAILABLE = True
     print("✅ Selenium is available - Real browser automation enabled!")
 except ImportError:
     SELENIUM_AVAILABLE = False
     print("⚠️  Selenium not available. Install with: pip install selenium")
 
+# Create screenshots directory
+os.makedirs("screenshots", exist_ok=True)
+
 # Global storage
 test_sessions = {}
 active_executions = {}
 
+# Each test run drives its own Chrome, so cap how many run at once
+MAX_PARALLEL_RUNS = 4
+EXECUTION_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_PARALLEL_RUNS, thread_name_prefix="exec")
+
+# Warm Chrome drivers waiting for the next session; never holds more than MAX_PARALLEL_RUNS
+_DRIVER_POOL = queue.Queue()
+
+MAX_BODY = 1 << 20  # 1 MiB request body cap
+NAVIGATION_GRACE = 1.5  # seconds a click gets to start a navigation before we treat it as in-page
+
+# Seconds to leave the browser up after a run (AUTOMATION_VIEW_SECS); 0 recycles it right away
+VIEW_SECS = int(os.environ.get("AUTOMATION_VIEW_SECS", "0"))
+
+# /health is polled constantly; only the counts and timestamp change, so fill a pre-encoded template
+_HEALTH_TPL = (
+    b'{"status":"healthy","selenium_available":' + (b'true' if SELENIUM_AVAILABLE else b'false') +
+    b',"active_sessions":%d,"total_sessions":%d,"mode":"REAL_BROWSER_AUTOMATION_SELENIUM","timestamp":"%s"}'
+)
+
+# Guards test_sessions, active_executions and the session JSON cache; sessions are written by
+# run threads and serialized by request threads
+_STATE_LOCK = threading.RLock()
+
+# Serialized session JSON, reused across polls until the session's version moves on
+session_versions = {}
+_session_bodies = {}
+
+# Prompt patterns, compiled once instead of on every action-plan generation
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PASSWORD_RE = re.compile(r'password[:\s]+([^\s,]+)', re.IGNORECASE)
+_SEARCH_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'search for (.+?)(?:\s+and|\s+then|$)',
+    r'find (.+?)(?:\s+and|\s+then|$)',
+    r'look for (.+?)(?:\s+and|\s+then|$)'
+))
+_NAME_RE = re.compile(r'name ["\']([^"\']+)["\']', re.IGNORECASE)
+_EMAIL_QUOTED_RE = re.compile(r'email ["\']([^"\']+)["\']', re.IGNORECASE)
+_TITLE_RE = re.compile(r'title contains ["\']([^"\']+)["\']', re.IGNORECASE)
+# Every planner keyword in one alternation; the lookahead lets overlapping keywords match,
+# so a hit means the same as `in` ("searching" and "logins" count)
+_INTENTS_RE = re.compile(r'(?=(login|search|fill|form|verify|check|add to cart|add first))')
+
+@functools.lru_cache(maxsize=256)
+def _build_selectors(target, element_type):
+    """Generate multiple selector strategies as (strategy, selector) pairs, cached per target"""
+    selectors = []
+    target_lower = target.lower()
+    
+    # If it's already a CSS selector, try it first
+    if any(char in target for char in ['[', '.', '#', ':', '>']):
+        selectors.append(("css", target))
+    
+    if element_type == "click":
+        # Button and link selectors
+        selectors.extend([
+            ("xpath", f"//button[contains(text(), '{target}')]"),
+            ("xpath", f"//input[@type='button' and contains(@value, '{target}')]"),
+            ("xpath", f"//input[@type='submit' and contains(@value, '{target}')]"),
+            ("xpath", f"//a[contains(text(), '{target}')]"),
+            ("link_text", target),
+            ("partial_link_text", target),
+        ])
+        
+        # Login-specific selectors, merged into one union so the browser matches them in one pass
+        if 'login' in target_lower:
+            selectors.append(("css", "button[type='submit'], input[type='submit'], .login-btn, .login-button, "
+                                     "#login-btn, #login-button, button[class*='login' i], input[class*='login' i]"))
+    
+    elif element_type == "input":
+        # Input field selectors; the `i` flag makes attribute matches case-insensitive
+        if 'email' in target_lower:
+            selectors.append(("css", "input[type='email'], input[name*='email' i], input[id*='email' i], "
+                                     "input[placeholder*='email' i], #email, [name='email']"))
+        elif 'password' in target_lower:
+            selectors.append(("css", "input[type='password'], input[name*='password' i], input[id*='password' i], "
+                                     "#password, [name='password']"))
+        elif 'search' in target_lower:
+            selectors.append(("css", "input[type='search'], input[name*='search' i], input[id*='search' i], "
+                                     "input[placeholder*='search' i], #search, [name='search'], .search-input"))
+        elif 'name' in target_lower:
+            selectors.append(("css", "input[name*='name' i], input[id*='name' i], input[placeholder*='name' i], "
+                                     "#name, [name='name']"))
+        else:
+            # Generic input selectors
+            selectors.extend([
+                ("css", f"input[placeholder*='{target}' i], input[name*='{target}' i], input[id*='{target}' i]"),
+                ("css", "input[type='text'], input:not([type])"),
+                ("tag", "input"),
+            ])
+    
+    # Common fallback selectors
+    target_slug = target_lower.replace(' ', '-').replace('_', '-')
+    selectors.extend([
+        ("id", target_slug),
+        ("css", f".{target_slug}"),
+        ("css", f"[data-testid*='{target_slug}']"),
+        ("xpath", f"//*[contains(@aria-label, '{target}')]"),
+        ("xpath", f"//*[contains(@title, '{target}')]"),
+        ("xpath", f"//*[contains(text(), '{target}')]"),
+    ])
+    
+    return tuple(selectors)
+
+# Strategies the in-page lookup below can resolve without a webdriver round-trip each
+_IN_PAGE_STRATEGIES = frozenset({"css", "id", "name", "class", "tag"})
+
+# In-page lookup: walk the strategies and return [first visible match, strategy index], or null
+_FIND_JS_FUNCTION = """
+const isVisible = (el) => el && el.getClientRects().length > 0;
+const find = (strategies) => {
+    for (const [i, [kind, sel]] of strategies.entries()) {
+        let candidates;
+        try {
+            if (kind === "id") candidates = [document.getElementById(sel)];
+            else if (kind === "name") candidates = document.getElementsByName(sel);
+            else if (kind === "class") candidates = document.getElementsByClassName(sel);
+            else if (kind === "tag") candidates = document.getElementsByTagName(sel);
+            else candidates = document.querySelectorAll(sel);
+        } catch (e) {
+            continue;  // not a valid CSS selector
+        }
+        for (const el of candidates) {
+            if (isVisible(el)) return [el, i];
+        }
+    }
+    return null;
+};
+"""
+_FIND_FIRST_VISIBLE_JS = _FIND_JS_FUNCTION + "return find(arguments[0]);"
+# Same lookup for several targets at once, one result per strategy list
+_FIND_MANY_JS = _FIND_JS_FUNCTION + "return arguments[0].map(find);"
+
+# Action types whose targets can be looked up ahead of time, and the lookup kind for each
+_PREFETCH_KINDS = {"type": "input", "click": "click"}
+
+@functools.lru_cache(maxsize=256)
+def _partition_selectors(target, element_type):
+    """Split strategies into ones checked in a single script call and ones left to Selenium"""
+    selectors = _build_selectors(target, element_type)
+    in_page = tuple(pair for pair in selectors if pair[0] in _IN_PAGE_STRATEGIES)
+    remaining = tuple(pair for pair in selectors if pair[0] not in _IN_PAGE_STRATEGIES)
+    return in_page, remaining
+
+def _launch_driver():
+    """Launch a real Chrome browser using Selenium"""
+    print("🚀 Launching real Chrome browser...")
+    
+    # Set up Chrome options
+    chrome_options = Options()
+    chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+    
+    try:
+        # Try to create Chrome driver
+        driver = webdriver.Chrome(options=chrome_options)
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        
+        # Set timeouts
+        driver.implicitly_wait(10)
+        driver.set_page_load_timeout(30)
+        
+        print("✅ Chrome browser launched successfully!")
+        return driver
+        
+    except Exception as e:
+        print(f"❌ Failed to launch Chrome: {e}")
+        print("💡 Make sure Chrome is installed and chromedriver is in PATH")
+        raise
+
+def prewarm_drivers(count=MAX_PARALLEL_RUNS):
+    """Launch browsers ahead of the first test so sessions skip Chrome's cold start"""
+    for _ in range(count):
+        try:
+            _DRIVER_POOL.put(_launch_driver())
+        except Exception:
+            break  # the first session will report the launch error
+
+@atexit.register
+def close_driver_pool():
+    """Quit every pooled browser"""
+    while True:
+        try:
+            driver = _DRIVER_POOL.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
 class RealBrowserAutomation:
     def __init__(self):
         self.driver = None
+        # (target, element_type) -> the strategy that found it last time on this page
+        self._resolved = {}
+        # (target, element_type) -> element found ahead of time by prefetch_targets
+        self._prefetched = {}
     
     def initialize(self):
-        """Initialize real Chrome browser using Selenium"""
+        """Check out a warm Chrome browser from the pool, launching one if none is free"""
         if not SELENIUM_AVAILABLE:
             raise Exception("Selenium not available. Please install: pip install selenium")
         
-        print("🚀 Launching real Chrome browser...")
-        
-        # Set up Chrome options
-        chrome_options = Options()
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        
         try:
-            # Try to create Chrome driver
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            # Set timeouts
-            self.driver.implicitly_wait(10)
-            self.driver.set_page_load_timeout(30)
-            
-            print("✅ Chrome browser launched successfully!")
-            
-        except Exception as e:
-            print(f"❌ Failed to launch Chrome: {e}")
-            print("💡 Make sure Chrome is installed and chromedriver is in PATH")
-            raise
+            self.driver = _DRIVER_POOL.get_nowait()
+            print("♻️ Reusing a warm Chrome browser")
+        except queue.Empty:
+            self.driver = _launch_driver()
         
     def cleanup(self):
-        """Clean up browser resources"""
+        """Wipe the browser's session state and return it to the pool"""
+        if not self.driver:
+            return
         try:
-            print("🧹 Cleaning up browser...")
-            if self.driver:
-                self.driver.quit()
-            print("✅ Browser cleanup complete")
+            print("🧹 Resetting browser for the next session...")
+            self.driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            # Storage is per origin, so wipe every origin the tab's history visited, not just the current one
+            history = self.driver.execute_cdp_cmd("Page.getNavigationHistory", {})["entries"]
+            origins = {"{0.scheme}://{0.netloc}".format(urlsplit(entry["url"])) for entry in history
+                       if entry["url"].startswith(("http://", "https://"))}
+            for origin in origins:
+                self.driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+            # sessionStorage lives with the tab, so the next session gets a new one
+            old_tab = self.driver.current_window_handle
+            self.driver.switch_to.new_window("tab")
+            new_tab = self.driver.current_window_handle
+            self.driver.switch_to.window(old_tab)
+            self.driver.close()
+            self.driver.switch_to.window(new_tab)
+            _DRIVER_POOL.put(self.driver)
+            print("✅ Browser returned to pool")
         except Exception as e:
-            print(f"⚠️ Cleanup error: {e}")
+            # A browser we can't reset cleanly isn't worth keeping
+            print(f"⚠️ Cleanup error, closing browser: {e}")
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
     
     def execute_action(self, action, session_id):
         """Execute a single action on the real browser"""
         action_type = action["type"]
-        target = action["target"]
-        value = action.get("value", "")
+        handler = self._HANDLERS.get(action_type)
         
         try:
             print(f"🔄 Executing: {action['description']}")
-            
-            if action_type == "navigate":
-                print(f"🌐 Navigating to: {target}")
-                self.driver.get(target)
-                time.sleep(3)  # Wait for page to load
-                result = f"✅ Successfully navigated to {target}"
-                
-            elif action_type == "click":
-                print(f"🖱️ Clicking: {target}")
-                element = self._find_element_with_fallback(target, "click")
-                if element:
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                    time.sleep(1)
-                    element.click()
-                    result = f"✅ Successfully clicked: {target}"
-                else:
-                    raise Exception(f"Could not find clickable element: {target}")
-                    
-            elif action_type == "type":
-                print(f"⌨️ Typing: '{value}' into {target}")
-                element = self._find_element_with_fallback(target, "input")
-                if element:
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                    time.sleep(1)
-                    element.clear()
-                    element.send_keys(value)
-                    result = f"✅ Successfully typed '{value}' into {target}"
-                else:
-                    raise Exception(f"Could not find input element: {target}")
-                    
-            elif action_type == "wait":
-                wait_time = int(value) if value.isdigit() else 3000
-                print(f"⏱️ Waiting {wait_time}ms...")
-                time.sleep(wait_time / 1000)
-                result = f"✅ Waited {wait_time}ms"
-                
-            elif action_type == "screenshot":
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"real_{session_id}_{timestamp}.png"
-                filepath = os.path.join("screenshots", filename)
-                os.makedirs("screenshots", exist_ok=True)
-                
-                print(f"📸 Taking screenshot: {filename}")
-                self.driver.save_screenshot(filepath)
-                result = f"✅ Screenshot saved: /screenshots/{filename}"
-                
-            elif action_type == "verify":
-                if target == "title":
-                    page_title = self.driver.title
-                    print(f"🔍 Verifying title: '{page_title}' contains '{value}'")
-                    if value.lower() in page_title.lower():
-                        result = f"✅ Title verification passed: '{page_title}' contains '{value}'"
-                    else:
-                        raise Exception(f"Title verification failed: '{page_title}' does not contain '{value}'")
-                else:
-                    result = f"⚠️ Verification type '{target}' not implemented"
-                    
+            if handler:
+                result = handler(self, action["target"], action.get("value", ""), action, session_id)
             else:
                 result = f"⚠️ Action type '{action_type}' not implemented"
             
@@ -151,136 +323,220 @@ class RealBrowserAutomation:
             print(f"❌ Action failed: {error_msg}")
             return {"status": "failed", "result": None, "error": error_msg}
     
-    def _find_element_with_fallback(self, target, element_type):
-        """Find element using multiple strategies"""
-        selectors = self._generate_selectors(target, element_type)
+    def _do_navigate(self, target, value, action, session_id):
+        """Open a URL and wait for it to finish loading"""
+        print(f"🌐 Navigating to: {target}")
+        self._resolved.clear()
+        self._prefetched.clear()
+        self.driver.get(target)
+        self._wait_for_page_ready()
+        return f"✅ Successfully navigated to {target}"
+    
+    def _do_click(self, target, value, action, session_id):
+        """Find and click an element"""
+        print(f"🖱️ Clicking: {target}")
+        element = self._find_element_with_fallback(target, "click")
+        if not element:
+            raise Exception(f"Could not find clickable element: {target}")
+        old_document, old_url = self.driver.execute_script("return [document.documentElement, location.href];")
+        self._retry_if_stale(target, "click", element, self._click_element)
+        self._prefetched.clear()  # the click may have changed the page
+        self._wait_for_navigation(old_document, old_url)
+        return f"✅ Successfully clicked: {target}"
+    
+    def _do_type(self, target, value, action, session_id):
+        """Find an input and type into it"""
+        print(f"⌨️ Typing: '{value}' into {target}")
+        element = self._find_element_with_fallback(target, "input")
+        if not element:
+            raise Exception(f"Could not find input element: {target}")
+        self._retry_if_stale(target, "input", element, lambda el: self._enter_text(el, value))
+        return f"✅ Successfully typed '{value}' into {target}"
+    
+    def _do_wait(self, target, value, action, session_id):
+        """Wait for an element to show up, or for a fixed time"""
+        if target and target != "time":
+            # Wait for the element itself rather than a fixed delay
+            timeout = action.get("timeout", 10000) / 1000
+            print(f"⏱️ Waiting up to {timeout:g}s for: {target}")
+            WebDriverWait(self.driver, timeout).until(
+                EC.visibility_of_element_located((By.CSS_SELECTOR, target))
+            )
+            return f"✅ Element visible: {target}"
+        wait_time = int(value) if value.isdigit() else 3000
+        print(f"⏱️ Waiting {wait_time}ms...")
+        time.sleep(wait_time / 1000)
+        return f"✅ Waited {wait_time}ms"
+    
+    def _do_screenshot(self, target, value, action, session_id):
+        """Save a JPEG screenshot of the viewport"""
+        filename = f"real_{session_id}_{datetime.now():%Y%m%d_%H%M%S}.jpg"
+        filepath = f"screenshots/{filename}"
         
-        for selector_type, selector in selectors:
-            try:
-                print(f"   Trying {selector_type}: {selector}")
-                
-                if selector_type == "xpath":
-                    element = self.driver.find_element(By.XPATH, selector)
-                elif selector_type == "css":
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                elif selector_type == "id":
-                    element = self.driver.find_element(By.ID, selector)
-                elif selector_type == "name":
-                    element = self.driver.find_element(By.NAME, selector)
-                elif selector_type == "class":
-                    element = self.driver.find_element(By.CLASS_NAME, selector)
-                elif selector_type == "tag":
-                    element = self.driver.find_element(By.TAG_NAME, selector)
-                elif selector_type == "link_text":
-                    element = self.driver.find_element(By.LINK_TEXT, selector)
-                elif selector_type == "partial_link_text":
-                    element = self.driver.find_element(By.PARTIAL_LINK_TEXT, selector)
-                else:
-                    continue
-                
-                if element and element.is_displayed():
-                    print(f"   ✅ Found element with {selector_type}: {selector}")
-                    return element
-                    
-            except (NoSuchElementException, Exception) as e:
-                print(f"   ❌ {selector_type} failed: {selector}")
-                continue
+        print(f"📸 Taking screenshot: {filename}")
+        # Capture a JPEG straight from DevTools: smaller than PNG over the wire and on disk
+        shot = self.driver.execute_cdp_cmd(
+            "Page.captureScreenshot",
+            {"format": "jpeg", "quality": 70, "captureBeyondViewport": False}
+        )
+        with open(filepath, "wb") as f:
+            f.write(base64.b64decode(shot["data"]))
+        return f"✅ Screenshot saved: /screenshots/{filename}"
+    
+    def _do_verify(self, target, value, action, session_id):
+        """Check the page against an expected value"""
+        if target != "title":
+            return f"⚠️ Verification type '{target}' not implemented"
+        page_title = self.driver.title
+        print(f"🔍 Verifying title: '{page_title}' contains '{value}'")
+        if value.lower() not in page_title.lower():
+            raise Exception(f"Title verification failed: '{page_title}' does not contain '{value}'")
+        return f"✅ Title verification passed: '{page_title}' contains '{value}'"
+    
+    # Action type -> handler, looked up once per action instead of an if/elif chain
+    _HANDLERS = {
+        "navigate": _do_navigate,
+        "click": _do_click,
+        "type": _do_type,
+        "wait": _do_wait,
+        "screenshot": _do_screenshot,
+        "verify": _do_verify,
+    }
+    
+    def _enter_text(self, element, value):
+        """Scroll an input into view, clear it and type value"""
+        self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
+        element.clear()
+        element.send_keys(value)
+    
+    def _click_element(self, element):
+        """Scroll an element into view and click it, using a JS click only if the real click is refused"""
+        self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
+        try:
+            element.click()
+        except (ElementClickInterceptedException, ElementNotInteractableException):
+            print("   ⚠️ Native click refused, clicking via JavaScript")
+            self.driver.execute_script("arguments[0].click();", element)
+    
+    def _retry_if_stale(self, target, element_type, element, act):
+        """Run act(element), looking the target up again once if a prefetched reference went stale"""
+        try:
+            act(element)
+        except StaleElementReferenceException:
+            print(f"   ♻️ Element went stale, finding {target} again")
+            element = self._find_element_with_fallback(target, element_type)
+            if not element:
+                raise
+            act(element)
+    
+    def prefetch_targets(self, actions):
+        """Look up the elements for the upcoming type/click actions in one script call"""
+        pending = {}
+        for action in actions:
+            kind = _PREFETCH_KINDS.get(action["type"])
+            if kind is None:
+                break  # stop at the first action that isn't a plain lookup (navigate, wait, ...)
+            key = (action["target"], kind)
+            in_page = _partition_selectors(*key)[0]
+            if in_page and key not in self._prefetched:
+                pending[key] = in_page
+            if kind == "click":
+                break  # a click may change the page, so targets after it can't be looked up yet
+        if not pending:
+            return
         
-        return None
+        try:
+            found = self.driver.execute_script(_FIND_MANY_JS, list(pending.values()))
+        except Exception as e:
+            print(f"   ⚠️ Prefetch failed: {e}")
+            return
+        for (key, strategies), match in zip(pending.items(), found):
+            if match:
+                element, index = match
+                self._prefetched[key] = element
+                self._resolved[key] = tuple(strategies[index])
+        print(f"   ⚡ Prefetched {sum(1 for m in found if m)}/{len(pending)} upcoming elements in one call")
+    
+    def _wait_for_page_ready(self, timeout=10):
+        """Wait until the document has finished loading, instead of sleeping a fixed time"""
+        WebDriverWait(self.driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
     
-    def _generate_selectors(self, target, element_type):
-        """Generate multiple selector strategies"""
-        selectors = []
-        target_lower = target.lower()
+    def _wait_for_navigation(self, old_document, old_url):
+        """Wait for a page load the last click started; readyState alone still reads the old document"""
+        try:
+            WebDriverWait(self.driver, NAVIGATION_GRACE, poll_frequency=0.1).until(
+                lambda d: EC.staleness_of(old_document)(d) or d.current_url != old_url
+            )
+        except TimeoutException:
+            return  # nothing navigated, the current document is already loaded
+        self._wait_for_page_ready()
+    
+    def _find_element_with_fallback(self, target, element_type):
+        """Find element using multiple strategies"""
+        key = (target, element_type)
         
-        # If it's already a CSS selector, try it first
-        if any(char in target for char in ['[', '.', '#', ':', '>']):
-            selectors.append(("css", target))
+        element = self._prefetched.pop(key, None)
+        if element:
+            print(f"   ✅ Using prefetched element for {target}")
+            return element
         
-        if element_type == "click":
-            # Button and link selectors
-            selectors.extend([
-                ("xpath", f"//button[contains(text(), '{target}')]"),
-                ("xpath", f"//input[@type='button' and contains(@value, '{target}')]"),
-                ("xpath", f"//input[@type='submit' and contains(@value, '{target}')]"),
-                ("xpath", f"//a[contains(text(), '{target}')]"),
-                ("link_text", target),
-                ("partial_link_text", target),
-            ])
-            
-            # Login-specific selectors
-            if 'login' in target_lower:
-                selectors.extend([
-                    ("css", "button[type='submit']"),
-                    ("css", "input[type='submit']"),
-                    ("css", ".login-btn"),
-                    ("css", ".login-button"),
-                    ("id", "login-btn"),
-                    ("id", "login-button"),
-                    ("xpath", "//button[contains(@class, 'login')]"),
-                    ("xpath", "//input[contains(@class, 'login')]"),
-                ])
+        # Repeated targets try the strategy that worked last time first
+        hit = self._resolved.get(key)
+        if hit:
+            element = self._find_in_page((hit,)) if hit[0] in _IN_PAGE_STRATEGIES else self._find_with_selenium(*hit)
+            if element:
+                print(f"   ✅ Reused {hit[0]}: {hit[1]}")
+                return element
         
-        elif element_type == "input":
-            # Input field selectors
-            if 'email' in target_lower:
-                selectors.extend([
-                    ("css", "input[type='email']"),
-                    ("css", "input[name*='email']"),
-                    ("css", "input[id*='email']"),
-                    ("css", "input[placeholder*='email']"),
-                    ("name", "email"),
-                    ("id", "email"),
-                ])
-            elif 'password' in target_lower:
-                selectors.extend([
-                    ("css", "input[type='password']"),
-                    ("css", "input[name*='password']"),
-                    ("css", "input[id*='password']"),
-                    ("name", "password"),
-                    ("id", "password"),
-                ])
-            elif 'search' in target_lower:
-                selectors.extend([
-                    ("css", "input[type='search']"),
-                    ("css", "input[name*='search']"),
-                    ("css", "input[id*='search']"),
-                    ("css", "input[placeholder*='search']"),
-                    ("name", "search"),
-                    ("id", "search"),
-                    ("css", ".search-input"),
-                ])
-            elif 'name' in target_lower:
-                selectors.extend([
-                    ("css", "input[name*='name']"),
-                    ("css", "input[id*='name']"),
-                    ("css", "input[placeholder*='name']"),
-                    ("name", "name"),
-                    ("id", "name"),
-                ])
-            else:
-                # Generic input selectors
-                selectors.extend([
-                    ("css", f"input[placeholder*='{target}']"),
-                    ("css", f"input[name*='{target.lower()}']"),
-                    ("css", f"input[id*='{target.lower()}']"),
-                    ("css", "input[type='text']"),
-                    ("css", "input:not([type])"),
-                    ("tag", "input"),
-                ])
+        in_page, remaining = _partition_selectors(target, element_type)
         
-        # Common fallback selectors
-        target_slug = target_lower.replace(' ', '-').replace('_', '-')
-        selectors.extend([
-            ("id", target_slug),
-            ("css", f".{target_slug}"),
-            ("css", f"[data-testid*='{target_slug}']"),
-            ("xpath", f"//*[contains(@aria-label, '{target}')]"),
-            ("xpath", f"//*[contains(@title, '{target}')]"),
-            ("xpath", f"//*[contains(text(), '{target}')]"),
-        ])
+        # One script call covers every CSS-style strategy
+        if in_page:
+            element = self._find_in_page(in_page, key)
+            if element:
+                return element
+        
+        # XPath and link-text strategies still go through Selenium one at a time
+        for strategy in remaining:
+            element = self._find_with_selenium(*strategy)
+            if element:
+                self._resolved[key] = strategy
+                return element
         
-        return selectors
+        return None
+    
+    def _find_in_page(self, strategies, key=None):
+        """Return the first visible match across CSS-style strategies using one script call"""
+        try:
+            found = self.driver.execute_script(_FIND_FIRST_VISIBLE_JS, strategies)
+        except Exception as e:
+            print(f"   ⚠️ In-page lookup failed: {e}")
+            return None
+        if not found:
+            return None
+        element, index = found
+        print(f"   ✅ Found element in-page with {strategies[index][0]}: {strategies[index][1]}")
+        if key:
+            self._resolved[key] = tuple(strategies[index])
+        return element
+    
+    def _visible(self, element):
+        """Cheap visibility check: one small script instead of Selenium's is_displayed atom"""
+        return self.driver.execute_script("return arguments[0].getClientRects().length > 0", element)
+    
+    def _find_with_selenium(self, selector_type, selector):
+        """Look up one strategy through webdriver, returning the element only if displayed"""
+        try:
+            print(f"   Trying {selector_type}: {selector}")
+            element = self.driver.find_element(_BY[selector_type], selector)
+            if element and self._visible(element):
+                print(f"   ✅ Found element with {selector_type}: {selector}")
+                return element
+        except (NoSuchElementException, Exception) as e:
+            print(f"   ❌ {selector_type} failed: {selector}")
+        return None
 
 def generate_intelligent_action_plan(prompt, website_url):
     """Generate intelligent action plan from natural language prompt"""
@@ -305,35 +561,37 @@ def generate_intelligent_action_plan(prompt, website_url):
         "timeout": 5000
     })
     
+    # One regex pass finds every keyword; the checks below are set lookups
+    intents = set(_INTENTS_RE.findall(prompt_lower))
+    
     # Parse login actions
-    if "login" in prompt_lower:
+    if "login" in intents:
         actions.extend(_generate_login_actions(prompt))
     
     # Parse search actions
-    if "search" in prompt_lower:
+    if "search" in intents:
         actions.extend(_generate_search_actions(prompt))
     
     # Parse form filling actions
-    if "fill" in prompt_lower and "form" in prompt_lower:
+    if "fill" in intents and "form" in intents:
         actions.extend(_generate_form_actions(prompt))
     
     # Parse add to cart actions
-    if "add to cart" in prompt_lower or "add first" in prompt_lower:
+    if "add to cart" in intents or "add first" in intents:
         actions.extend(_generate_cart_actions(prompt))
     
     # Parse verification actions
-    if "verify" in prompt_lower or "check" in prompt_lower:
+    if "verify" in intents or "check" in intents:
         actions.extend(_generate_verification_actions(prompt))
     
-    # Always add screenshot if mentioned or at the end
-    if "screenshot" in prompt_lower or len([a for a in actions if a["type"] == "screenshot"]) == 0:
-        actions.append({
-            "type": "screenshot",
-            "description": "Take final screenshot",
-            "target": "",
-            "value": "",
-            "timeout": 5000
-        })
+    # Always end with a screenshot; none of the generators above add one
+    actions.append({
+        "type": "screenshot",
+        "description": "Take final screenshot",
+        "target": "",
+        "value": "",
+        "timeout": 5000
+    })
     
     return actions
 
@@ -342,11 +600,11 @@ def _generate_login_actions(prompt):
     actions = []
     
     # Extract email if present
-    email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', prompt)
+    email_match = _EMAIL_RE.search(prompt)
     email = email_match.group() if email_match else "jyoti@test.com"
     
     # Extract password if present
-    password_match = re.search(r'password[:\s]+([^\s,]+)', prompt, re.IGNORECASE)
+    password_match = _PASSWORD_RE.search(prompt)
     password = password_match.group(1) if password_match else "123456"
     
     if "email" in prompt.lower() or "@" in prompt:
@@ -382,15 +640,9 @@ def _generate_search_actions(prompt):
     actions = []
     
     # Extract search term
-    search_patterns = [
-        r'search for (.+?)(?:\s+and|\s+then|$)',
-        r'find (.+?)(?:\s+and|\s+then|$)',
-        r'look for (.+?)(?:\s+and|\s+then|$)'
-    ]
-    
     search_term = "test"  # Default
-    for pattern in search_patterns:
-        match = re.search(pattern, prompt, re.IGNORECASE)
+    for rx in _SEARCH_RES:
+        match = rx.search(prompt)
         if match:
             search_term = match.group(1).strip().strip('"\'')
             break
@@ -426,11 +678,11 @@ def _generate_form_actions(prompt):
     actions = []
     
     # Extract name if present
-    name_match = re.search(r'name ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
+    name_match = _NAME_RE.search(prompt)
     name = name_match.group(1) if name_match else "John Doe"
     
     # Extract email if present
-    email_match = re.search(r'email ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
+    email_match = _EMAIL_QUOTED_RE.search(prompt)
     email = email_match.group(1) if email_match else "john.doe@example.com"
     
     actions.extend([
@@ -485,7 +737,7 @@ def _generate_verification_actions(prompt):
     actions = []
     
     if "title" in prompt.lower():
-        title_match = re.search(r'title contains ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
+        title_match = _TITLE_RE.search(prompt)
         title_text = title_match.group(1) if title_match else "Example"
         
         actions.append({
@@ -498,6 +750,21 @@ def _generate_verification_actions(prompt):
     
     return actions
 
+def _touch_session(session_id):
+    """Mark a session as changed so the next poll re-serializes it; call with _STATE_LOCK held"""
+    session_versions[session_id] = session_versions.get(session_id, 0) + 1
+
+def _session_body(session_id):
+    """Return (version, JSON bytes) for a session, serializing only when it changed"""
+    cached = _session_bodies.get(session_id)
+    if cached is not None and cached[0] == session_versions.get(session_id, 0):
+        return cached
+    with _STATE_LOCK:
+        # Serialize under the lock so a run thread can't change the session mid-encode
+        cached = (session_versions.get(session_id, 0), _dumps(test_sessions[session_id]))
+        _session_bodies[session_id] = cached
+    return cached
+
 def execute_real_test_session(session_id):
     """Execute test session with REAL browser automation using Selenium"""
     session = test_sessions[session_id]
@@ -510,143 +777,204 @@ def execute_real_test_session(session_id):
         browser_automation = RealBrowserAutomation()
         browser_automation.initialize()
         
-        active_executions[session_id] = {
+        exec_info = {
             "browser": browser_automation,
             "current_action": 0,
             "start_time": time.time()
         }
+        with _STATE_LOCK:
+            active_executions[session_id] = exec_info
         
         successful_actions = 0
         failed_actions = 0
-        action_results = []
+        with _STATE_LOCK:
+            action_results = session["action_results"] = []
         
         # Execute each action on the real browser
-        for i, action in enumerate(session["action_plan"]["actions"]):
-            active_executions[session_id]["current_action"] = i
+        actions = session["action_plan"]["actions"]
+        for i, action in enumerate(actions):
+            exec_info["current_action"] = i
+            
+            # Resolve this and the following type/click targets together (e.g. email, password, login)
+            if action["type"] in _PREFETCH_KINDS:
+                browser_automation.prefetch_targets(actions[i:])
             
             result = browser_automation.execute_action(action, session_id)
-            action_results.append({
-                "action": action,
-                "result": result,
-                "timestamp": datetime.utcnow().isoformat()
-            })
             
             if result["status"] == "success":
                 successful_actions += 1
             else:
                 failed_actions += 1
                 # Continue with other actions even if one fails
-            
-            # Add delay between actions for stability
-            time.sleep(2)
+            with _STATE_LOCK:
+                action_results.append({
+                    "action": action,
+                    "result": result,
+                    "timestamp": datetime.utcnow().isoformat()
+                })
+                session["successful_actions"] = successful_actions
+                session["failed_actions"] = failed_actions
+                _touch_session(session_id)
         
         # Update session with results
-        session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
-        session["successful_actions"] = successful_actions
-        session["failed_actions"] = failed_actions
-        session["total_duration"] = int(time.time() - active_executions[session_id]["start_time"])
-        session["action_results"] = action_results
+        with _STATE_LOCK:
+            session["status"] = "completed"
+            session["completed_at"] = datetime.utcnow().isoformat()
+            session["successful_actions"] = successful_actions
+            session["failed_actions"] = failed_actions
+            session["total_duration"] = int(time.time() - exec_info["start_time"])
+            _touch_session(session_id)
         
         print(f"🎉 REAL test completed: {successful_actions} successful, {failed_actions} failed")
         
-        # Keep browser open for a moment to see results
-        print("🔍 Keeping browser open for 10 seconds to view results...")
-        time.sleep(10)
+        # Optionally keep the browser open to see results; it holds a pool slot meanwhile
+        if VIEW_SECS:
+            print(f"🔍 Keeping browser open for {VIEW_SECS} seconds to view results...")
+            time.sleep(VIEW_SECS)
         
     except Exception as e:
         print(f"❌ REAL test execution failed: {e}")
-        session["status"] = "failed"
-        session["error_summary"] = str(e)
-        session["completed_at"] = datetime.utcnow().isoformat()
+        with _STATE_LOCK:
+            session["status"] = "failed"
+            session["error_summary"] = str(e)
+            session["completed_at"] = datetime.utcnow().isoformat()
+            _touch_session(session_id)
         
     finally:
         # Cleanup browser
         if browser_automation:
             browser_automation.cleanup()
-        if session_id in active_executions:
-            del active_executions[session_id]
+        with _STATE_LOCK:
+            active_executions.pop(session_id, None)
+
+def _default(obj):
+    """Serialize types the JSON encoder doesn't know about"""
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(obj):
+    """Encode obj straight to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, default=_default).encode()
+
+def _loads(data):
+    """Decode a JSON request body"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
 
 class RequestHandler(BaseHTTPRequestHandler):
+    # Keep connections open between polls; every response sends Content-Length
+    protocol_version = "HTTP/1.1"
+    # Buffer the response so headers and body leave in one send(); the base class flushes
+    # wfile after each request
+    wbufsize = 1 << 16
+    
+    def _write_json(self, obj, status=200, etag=None):
+        """Send obj (or already-encoded JSON bytes) with CORS and Content-Length headers, gzipped if worth it"""
+        body = obj if isinstance(obj, bytes) else _dumps(obj)
+        gzipped = len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = gzip.compress(body, compresslevel=1)
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/json')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+        if etag:
+            self.send_header('ETag', etag)
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _not_modified(self, etag):
+        """Answer a conditional GET whose ETag still matches"""
+        self.send_response(304)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('ETag', etag)
+        self.end_headers()
+    
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag')
+        self.send_header('Content-Length', '0')
         self.end_headers()
     
     def do_GET(self):
         """Handle GET requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
+        path = self.path.partition('?')[0]
         
         if path == '/health':
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
+            body = _HEALTH_TPL % (len(active_executions), len(test_sessions), datetime.utcnow().isoformat().encode())
+            self._write_json(body)
             
-            response = {
-                "status": "healthy",
-                "selenium_available": SELENIUM_AVAILABLE,
-                "active_sessions": len(active_executions),
-                "total_sessions": len(test_sessions),
-                "mode": "REAL_BROWSER_AUTOMATION_SELENIUM",
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif path.startswith('/api/tests/') and len(path.split('/')) == 4:
-            # Get test results
-            session_id = path.split('/')[-1]
+        elif path.startswith('/api/tests/') and '/' not in path[11:]:
+            # Get test results; the id is whatever follows the 11-char prefix
+            session_id = path[11:]
             
             if session_id in test_sessions:
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
                 session = test_sessions[session_id]
-                execution_status = {}
+                exec_info = active_executions.get(session_id)
                 
-                if session_id in active_executions:
-                    exec_info = active_executions[session_id]
+                # Skip serializing the session when nothing changed since the last poll
+                version = session_versions.get(session_id, 0)
+                etag = f'"{version}-{exec_info["current_action"] if exec_info else -1}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._not_modified(etag)
+                    return
+                
+                execution_status = {}
+                if exec_info:
                     execution_status = {
                         "current_action": exec_info["current_action"],
-                        "progress": (exec_info["current_action"] / len(session["action_plan"]["actions"])) * 100
+                        "progress": (exec_info["current_action"] / session["total_actions"]) * 100
                     }
                 
-                response = {
-                    "session": session,
-                    "execution_status": execution_status
-                }
-                self.wfile.write(json.dumps(response).encode())
+                # Splice the cached session bytes in rather than re-encoding the whole session
+                _, session_body = _session_body(session_id)
+                body = b'{"session":' + session_body + b',"execution_status":' + _dumps(execution_status) + b'}'
+                self._write_json(body, etag=etag)
             else:
-                self.send_response(404)
-                self.end_headers()
+                self._write_json({"detail": "Test session not found"}, 404)
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._write_json({"detail": "Not found"}, 404)
     
     def do_POST(self):
         """Handle POST requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
+        path = self.path.partition('?')[0]
         
-        # Read request body
-        content_length = int(self.headers['Content-Length'])
+        # Read request body, sized by Content-Length and capped. A body left unread would be
+        # parsed as the next request on this keep-alive connection, so those errors close it
+        try:
+            content_length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self.close_connection = True
+            self._write_json({"detail": "Invalid Content-Length"}, 400)
+            return
+        if content_length > MAX_BODY:
+            self.close_connection = True
+            self._write_json({"detail": "Request body too large"}, 413)
+            return
         post_data = self.rfile.read(content_length)
         
         try:
-            data = json.loads(post_data.decode())
-        except:
-            self.send_response(400)
-            self.end_headers()
+            # Parsed straight from bytes; orjson.JSONDecodeError subclasses ValueError
+            data = _loads(post_data)
+        except ValueError:
+            self._write_json({"detail": "Invalid JSON body"}, 400)
             return
         
         if path == '/api/tests/create':
@@ -667,7 +995,7 @@ class RequestHandler(BaseHTTPRequestHandler):
             }
             
             # Store session
-            test_sessions[session_id] = {
+            session = {
                 "id": session_id,
                 "website_url": data["website_url"],
                 "original_prompt": data["prompt"],
@@ -679,9 +1007,8 @@ class RequestHandler(BaseHTTPRequestHandler):
                 "failed_actions": 0,
                 "screenshots": []
             }
-            
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
+            with _STATE_LOCK:
+                test_sessions[session_id] = session
             
             response = {
                 "session_id": session_id,
@@ -689,49 +1016,46 @@ class RequestHandler(BaseHTTPRequestHandler):
                 "estimated_duration": action_plan["estimated_duration"],
                 "risk_assessment": action_plan["risk_level"]
             }
-            self.wfile.write(json.dumps(response).encode())
+            self._write_json(response)
             
         elif path == '/api/tests/execute':
             # Execute test with REAL browser
             session_id = data["session_id"]
             
-            if session_id not in test_sessions:
-                self.send_response(404)
-                self.end_headers()
-                return
-            
-            session = test_sessions[session_id]
-            
-            if session["status"] != "pending":
-                self.send_response(400)
-                self.end_headers()
+            # Check and claim the session in one step so two requests can't both start it
+            with _STATE_LOCK:
+                session = test_sessions.get(session_id)
+                if session is None:
+                    error = (404, "Test session not found")
+                elif session["status"] != "pending":
+                    error = (400, "Test is not in pending state")
+                else:
+                    error = None
+                    session["status"] = "running"
+                    session["started_at"] = datetime.utcnow().isoformat()
+                    _touch_session(session_id)
+            if error:
+                self._write_json({"detail": error[1]}, error[0])
                 return
             
             # Start REAL execution in background thread
-            session["status"] = "running"
-            session["started_at"] = datetime.utcnow().isoformat()
-            
-            thread = threading.Thread(target=execute_real_test_session, args=(session_id,))
-            thread.daemon = True
-            thread.start()
             
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
+            EXECUTION_POOL.submit(execute_real_test_session, session_id)
             
             response = {
                 "session_id": session_id,
                 "status": "running",
                 "message": "🚀 REAL Chrome browser will open shortly and perform your actions!"
             }
-            self.wfile.write(json.dumps(response).encode())
+            self._write_json(response)
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._write_json({"detail": "Not found"}, 404)
 
 def run_server():
     """Run the HTTP server"""
     server_address = ('', 8000)
-    httpd = HTTPServer(server_address, RequestHandler)
+    # One thread per connection, so a slow results poll doesn't block /health
+    httpd = ThreadingHTTPServer(server_address, RequestHandler)
     
     print("🚀 Starting REAL Browser Automation Server (Selenium)")
     print("🌐 This version will actually open Chrome and perform actions!")
@@ -749,12 +1073,15 @@ def run_server():
         print("✅ Ready to launch real Chrome browser and perform actual automation!")
         print("🎯 When you run a test, a Chrome window will open and perform your actions!")
         print()
+        # Warm browsers in the background so startup isn't blocked
+        threading.Thread(target=prewarm_drivers, daemon=True).start()
     
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n🛑 Server stopped")
         httpd.shutdown()
+        EXECUTION_POOL.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     run_server()
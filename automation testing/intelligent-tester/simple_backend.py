@@ -4,20 +4,34 @@ Simple backend server for testing the intelligent tester
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
-import uvicorn
+from dataclasses import dataclass, fields, is_dataclass
+from collections import Counter
+from itertools import islice
+import orjson
 import os
 import json
-import uuid
+import re
+import time
 from datetime import datetime
 
+# Try to import pyahocorasick, fall back to a single regex scan if not available
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent Web Tester",
     description="AI-powered web testing with natural language prompts",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes responses to bytes directly, much faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -36,6 +50,113 @@ if os.path.exists("screenshots"):
 # Simple in-memory storage
 test_sessions = {}
 
+# Running tallies for /api/stats, updated on create and on every status change so the
+# endpoint never rescans test_sessions; all writers run on the event loop, so no lock
+_status_counts = Counter()
+_site_counts = Counter()
+
+# Sessions and actions use slotted dataclasses rather than dicts: smaller per instance and
+# attribute reads are slot loads; they are turned into JSON only at the response boundary
+@dataclass(slots=True)
+class Action:
+    type: str
+    description: str
+    target: str
+    value: str
+    timeout: int
+    screenshot: bool = False
+
+def _json_default(obj):
+    """Encode the slotted dataclasses; an action leaves out a false screenshot flag, as the plan dicts did"""
+    if isinstance(obj, Action):
+        encoded = {
+            "type": obj.type,
+            "description": obj.description,
+            "target": obj.target,
+            "value": obj.value,
+            "timeout": obj.timeout
+        }
+        if obj.screenshot:
+            encoded["screenshot"] = True
+        return encoded
+    if is_dataclass(obj):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError
+
+def _dumps(obj):
+    """Encode a response payload that may contain Session/Action dataclasses"""
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+
+@dataclass(slots=True)
+class Session:
+    id: str
+    website_url: str
+    original_prompt: str
+    action_plan: Dict[str, Any]
+    created_at: str
+    total_actions: int
+    status: str = "pending"
+    successful_actions: int = 0
+    failed_actions: int = 0
+    started_at: Optional[str] = None
+    completed_at: Optional[str] = None
+
+# / and /health only differ by timestamp: keep their JSON as bytes and re-stamp once per second
+_ROOT_PREFIX = b'{"message":"Intelligent Web Tester API","version":"1.0.0","status":"running","timestamp":"'
+_ROOT_SUFFIX = b'"}'
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","services":{"api":"online","browser":"ready"}}'
+_stamped_bodies = {}  # prefix -> (second, body)
+
+def _stamped_json(prefix, suffix):
+    """Response for a constant JSON payload with the current second's timestamp spliced in"""
+    now = int(time.time())
+    cached = _stamped_bodies.get(prefix)
+    if cached is None or cached[0] != now:
+        stamp = datetime.utcfromtimestamp(now).isoformat().encode()
+        cached = _stamped_bodies[prefix] = (now, prefix + stamp + suffix)
+    return Response(cached[1], media_type="application/json", headers={"Cache-Control": "max-age=1"})
+
+# Every prompt keyword create_test branches on
+_KEYWORDS = ("login", "email", "@", "password", "search", "for ", "add to cart", "add first")
+
+if AHOCORASICK_AVAILABLE:
+    # One automaton walk finds every keyword
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Regex fallback: the lookahead lets overlapping keywords match, so a hit means the same as `in`
+_KEYWORDS_RE = re.compile("(?=(" + "|".join(re.escape(k) for k in _KEYWORDS) + "))")
+
+def _scan_keywords(prompt_lower):
+    """Return the set of keywords present in the lowercased prompt"""
+    if AHOCORASICK_AVAILABLE:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(prompt_lower)}
+    return {m.group(1) for m in _KEYWORDS_RE.finditer(prompt_lower)}
+
+# Selector targets shared by every generated plan
+_LOGIN_TARGET = "button:has-text('login'), a:has-text('login'), .login"
+_EMAIL_TARGET = "input[type='email'], input[name*='email']"
+_PASSWORD_TARGET = "input[type='password'], input[name*='password']"
+_SUBMIT_TARGET = "button[type='submit'], input[type='submit']"
+_SEARCH_INPUT_TARGET = "input[type='search'], input[name*='search'], .search-input"
+_SEARCH_BUTTON_TARGET = "button[type='submit'], .search-btn, button:has-text('search')"
+_PRODUCT_TARGET = ".product:first-child, .item:first-child, [data-testid*='product']:first"
+_ADD_TO_CART_TARGET = "button:has-text('add to cart'), .add-to-cart, [data-testid*='cart']"
+
+def _new_id():
+    """Random version-4 UUID string, formatted straight from os.urandom instead of via uuid.UUID"""
+    h = os.urandom(16).hex()
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+def _set_status(session, status):
+    """Move a session to a new status, keeping the per-status tallies in step"""
+    _status_counts[session.status] -= 1
+    _status_counts[status] += 1
+    session.status = status
+
 # Models
 class CreateTestRequest(BaseModel):
     website_url: str
@@ -61,145 +182,134 @@ class ExecuteTestResponse(BaseModel):
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Intelligent Web Tester API",
-        "version": "1.0.0",
-        "status": "running",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return _stamped_json(_ROOT_PREFIX, _ROOT_SUFFIX)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {
-            "api": "online",
-            "browser": "ready"
-        }
-    }
+    return _stamped_json(_HEALTH_PREFIX, _HEALTH_SUFFIX)
 
 @app.post("/api/tests/create", response_model=CreateTestResponse)
 async def create_test(request: CreateTestRequest):
     """Create a new test from natural language prompt"""
     try:
-        session_id = str(uuid.uuid4())
+        session_id = _new_id()
         
         # Simple action plan generation (fallback logic)
         actions = []
         prompt_lower = request.prompt.lower()
+        hits = _scan_keywords(prompt_lower)
         
         # Always start with navigation
-        actions.append({
-            "type": "navigate",
-            "description": f"Navigate to {request.website_url}",
-            "target": request.website_url,
-            "value": "",
-            "timeout": 30000,
-            "screenshot": True
-        })
+        actions.append(Action(
+            type="navigate",
+            description=f"Navigate to {request.website_url}",
+            target=request.website_url,
+            value="",
+            timeout=30000,
+            screenshot=True
+        ))
         
         # Parse common actions from prompt
-        if "login" in prompt_lower:
-            actions.append({
-                "type": "click",
-                "description": "Click login button",
-                "target": "button:has-text('login'), a:has-text('login'), .login",
-                "value": "",
-                "timeout": 30000
-            })
+        if "login" in hits:
+            actions.append(Action(
+                type="click",
+                description="Click login button",
+                target=_LOGIN_TARGET,
+                value="",
+                timeout=30000
+            ))
             
-            if "email" in prompt_lower or "@" in request.prompt:
-                actions.append({
-                    "type": "type",
-                    "description": "Enter email",
-                    "target": "input[type='email'], input[name*='email']",
-                    "value": "jyoti@test.com",
-                    "timeout": 30000
-                })
+            if "email" in hits or "@" in hits:
+                actions.append(Action(
+                    type="type",
+                    description="Enter email",
+                    target=_EMAIL_TARGET,
+                    value="jyoti@test.com",
+                    timeout=30000
+                ))
             
-            if "password" in prompt_lower:
-                actions.append({
-                    "type": "type",
-                    "description": "Enter password",
-                    "target": "input[type='password'], input[name*='password']",
-                    "value": "123456",
-                    "timeout": 30000
-                })
+            if "password" in hits:
+                actions.append(Action(
+                    type="type",
+                    description="Enter password",
+                    target=_PASSWORD_TARGET,
+                    value="123456",
+                    timeout=30000
+                ))
                 
-                actions.append({
-                    "type": "click",
-                    "description": "Click login submit",
-                    "target": "button[type='submit'], input[type='submit']",
-                    "value": "",
-                    "timeout": 30000,
-                    "screenshot": True
-                })
+                actions.append(Action(
+                    type="click",
+                    description="Click login submit",
+                    target=_SUBMIT_TARGET,
+                    value="",
+                    timeout=30000,
+                    screenshot=True
+                ))
         
-        if "search" in prompt_lower:
+        if "search" in hits:
             # Extract search term
             search_term = "headphones"  # default
-            if "for " in prompt_lower:
+            if "for " in hits:
                 parts = request.prompt.split("for ")
                 if len(parts) > 1:
                     search_term = parts[1].split(" ")[0].strip()
             
-            actions.append({
-                "type": "click",
-                "description": "Click search box",
-                "target": "input[type='search'], input[name*='search'], .search-input",
-                "value": "",
-                "timeout": 30000
-            })
+            actions.append(Action(
+                type="click",
+                description="Click search box",
+                target=_SEARCH_INPUT_TARGET,
+                value="",
+                timeout=30000
+            ))
             
-            actions.append({
-                "type": "type",
-                "description": f"Search for {search_term}",
-                "target": "input[type='search'], input[name*='search'], .search-input",
-                "value": search_term,
-                "timeout": 30000
-            })
+            actions.append(Action(
+                type="type",
+                description=f"Search for {search_term}",
+                target=_SEARCH_INPUT_TARGET,
+                value=search_term,
+                timeout=30000
+            ))
             
-            actions.append({
-                "type": "click",
-                "description": "Click search button",
-                "target": "button[type='submit'], .search-btn, button:has-text('search')",
-                "value": "",
-                "timeout": 30000,
-                "screenshot": True
-            })
+            actions.append(Action(
+                type="click",
+                description="Click search button",
+                target=_SEARCH_BUTTON_TARGET,
+                value="",
+                timeout=30000,
+                screenshot=True
+            ))
         
-        if "add to cart" in prompt_lower or "add first" in prompt_lower:
-            actions.append({
-                "type": "click",
-                "description": "Click first product",
-                "target": ".product:first-child, .item:first-child, [data-testid*='product']:first",
-                "value": "",
-                "timeout": 30000
-            })
+        if "add to cart" in hits or "add first" in hits:
+            actions.append(Action(
+                type="click",
+                description="Click first product",
+                target=_PRODUCT_TARGET,
+                value="",
+                timeout=30000
+            ))
             
-            actions.append({
-                "type": "click",
-                "description": "Add to cart",
-                "target": "button:has-text('add to cart'), .add-to-cart, [data-testid*='cart']",
-                "value": "",
-                "timeout": 30000,
-                "screenshot": True
-            })
+            actions.append(Action(
+                type="click",
+                description="Add to cart",
+                target=_ADD_TO_CART_TARGET,
+                value="",
+                timeout=30000,
+                screenshot=True
+            ))
         
         # Always end with a screenshot
-        actions.append({
-            "type": "screenshot",
-            "description": "Take final screenshot",
-            "target": "",
-            "value": "",
-            "timeout": 5000,
-            "screenshot": True
-        })
+        actions.append(Action(
+            type="screenshot",
+            description="Take final screenshot",
+            target="",
+            value="",
+            timeout=5000,
+            screenshot=True
+        ))
         
         action_plan = {
-            "id": str(uuid.uuid4()),
+            "id": _new_id(),
             "website_url": request.website_url,
             "actions": actions,
             "confidence": 0.8,
@@ -209,24 +319,25 @@ async def create_test(request: CreateTestRequest):
         }
         
         # Store session
-        test_sessions[session_id] = {
-            "id": session_id,
-            "website_url": request.website_url,
-            "original_prompt": request.prompt,
-            "action_plan": action_plan,
-            "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
-            "total_actions": len(actions),
-            "successful_actions": 0,
-            "failed_actions": 0
-        }
-        
-        return CreateTestResponse(
-            session_id=session_id,
+        session = Session(
+            id=session_id,
+            website_url=request.website_url,
+            original_prompt=request.prompt,
             action_plan=action_plan,
-            estimated_duration=action_plan["estimated_duration"],
-            risk_assessment=action_plan["risk_level"]
+            created_at=datetime.utcnow().isoformat(),
+            total_actions=len(actions)
         )
+        test_sessions[session_id] = session
+        _status_counts[session.status] += 1
+        _site_counts[request.website_url] += 1
+        
+        # Returned as a ready Response so FastAPI skips validating and re-encoding the nested plan
+        return Response(_dumps({
+            "session_id": session_id,
+            "action_plan": action_plan,
+            "estimated_duration": action_plan["estimated_duration"],
+            "risk_assessment": action_plan["risk_level"]
+        }), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -240,21 +351,21 @@ async def execute_test(request: ExecuteTestRequest):
         
         session = test_sessions[request.session_id]
         
-        if session["status"] != "pending":
-            raise HTTPException(status_code=400, detail=f"Test is already {session['status']}")
+        if session.status != "pending":
+            raise HTTPException(status_code=400, detail=f"Test is already {session.status}")
         
         # Mock execution - just update status
-        session["status"] = "running"
-        session["started_at"] = datetime.utcnow().isoformat()
+        _set_status(session, "running")
+        session.started_at = datetime.utcnow().isoformat()
         
         # Simulate completion after a short delay
         import asyncio
         async def complete_test():
             await asyncio.sleep(2)  # Simulate execution time
-            session["status"] = "completed"
-            session["completed_at"] = datetime.utcnow().isoformat()
-            session["successful_actions"] = len(session["action_plan"]["actions"])
-            session["failed_actions"] = 0
+            _set_status(session, "completed")
+            session.completed_at = datetime.utcnow().isoformat()
+            session.successful_actions = session.total_actions
+            session.failed_actions = 0
         
         # Start background task
         asyncio.create_task(complete_test())
@@ -270,6 +381,37 @@ async def execute_test(request: ExecuteTestRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _stream_test_results(session_id, session):
+    """Yield the results payload one action at a time instead of encoding it as one buffer"""
+    status = session.status
+    # Mock execution result
+    head = {
+        "session_id": session_id,
+        "status": status,
+        "success_rate": 1.0 if status == "completed" else 0.0,
+        "total_duration": 30  # Mock duration
+    }
+    yield b'{"session":' + _dumps(session) + b',"execution_result":' + orjson.dumps(head)[:-1] + b',"action_results":['
+    
+    action_status = "success" if status == "completed" else "pending"
+    for i, action in enumerate(session.action_plan["actions"]):
+        yield (b"," if i else b"") + orjson.dumps({
+            "id": _new_id(),
+            "type": action.type,
+            "description": action.description,
+            "status": action_status,
+            "execution_time": 5000,
+            "screenshot_path": f"/screenshots/mock_{i}.png" if action.screenshot else None
+        })
+    
+    tail = {
+        "screenshots": [f"/screenshots/mock_{i}.png" for i in range(3)],
+        "summary": f"Mock test execution for {session.website_url}",
+        "recommendations": ["This is a mock implementation", "Install full dependencies for real testing"]
+    }
+    # tail's opening brace is dropped so its keys continue execution_result; its closing brace ends it
+    yield b"]," + orjson.dumps(tail)[1:] + b',"metrics":null}'
+
 @app.get("/api/tests/{session_id}")
 async def get_test_results(session_id: str):
     """Get test results for a session"""
@@ -278,34 +420,7 @@ async def get_test_results(session_id: str):
             raise HTTPException(status_code=404, detail="Test session not found")
         
         session = test_sessions[session_id]
-        
-        # Mock execution result
-        execution_result = {
-            "session_id": session_id,
-            "status": session["status"],
-            "success_rate": 1.0 if session["status"] == "completed" else 0.0,
-            "total_duration": 30,  # Mock duration
-            "action_results": [
-                {
-                    "id": str(uuid.uuid4()),
-                    "type": action["type"],
-                    "description": action["description"],
-                    "status": "success" if session["status"] == "completed" else "pending",
-                    "execution_time": 5000,
-                    "screenshot_path": f"/screenshots/mock_{i}.png" if action.get("screenshot") else None
-                }
-                for i, action in enumerate(session["action_plan"]["actions"])
-            ],
-            "screenshots": [f"/screenshots/mock_{i}.png" for i in range(3)],
-            "summary": f"Mock test execution for {session['website_url']}",
-            "recommendations": ["This is a mock implementation", "Install full dependencies for real testing"]
-        }
-        
-        return {
-            "session": session,
-            "execution_result": execution_result,
-            "metrics": None
-        }
+        return StreamingResponse(_stream_test_results(session_id, session), media_type="application/json")
         
     except HTTPException:
         raise
@@ -316,20 +431,19 @@ async def get_test_results(session_id: str):
 async def list_tests(page: int = 1, per_page: int = 20):
     """List all test sessions"""
     try:
-        sessions = list(test_sessions.values())
-        total = len(sessions)
+        total = len(test_sessions)
         
-        # Simple pagination
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_sessions = sessions[start:end]
+        # Simple pagination; dicts keep insertion (= creation) order, so walk just up to the page
+        start = max(page - 1, 0) * per_page
+        end = start + max(per_page, 0)
+        paginated_sessions = list(islice(test_sessions.values(), start, end))
         
-        return {
+        return Response(_dumps({
             "sessions": paginated_sessions,
             "total": total,
             "page": page,
             "per_page": per_page
-        }
+        }), media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -339,8 +453,8 @@ async def get_stats():
     """Get system statistics"""
     try:
         total_tests = len(test_sessions)
-        completed_tests = sum(1 for s in test_sessions.values() if s["status"] == "completed")
-        running_tests = sum(1 for s in test_sessions.values() if s["status"] == "running")
+        completed_tests = _status_counts["completed"]
+        running_tests = _status_counts["running"]
         
         return {
             "total_tests": total_tests,
@@ -350,7 +464,7 @@ async def get_stats():
             "average_duration": 30,
             "success_rate": 1.0 if total_tests > 0 else 0.0,
             "most_tested_sites": [
-                {"url": "https://example.com", "count": 1}
+                {"url": url, "count": count} for url, count in _site_counts.most_common(5)
             ],
             "common_failures": []
         }
@@ -364,6 +478,8 @@ if __name__ == "__main__":
     print("🔧 Install full dependencies for complete functionality")
     print()
     
+    # Only needed to serve; importing the app elsewhere (e.g. under another ASGI server) skips it
+    import uvicorn
     uvicorn.run(
         app,
         host="0.0.0.0",
@@ -4,6 +4,7 @@ Test script to verify the setup
 """
 import sys
 import os
+import importlib.util
 
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
@@ -17,9 +18,10 @@ def test_imports():
         import fastapi
         print("✅ FastAPI imported successfully")
         
-        # Test Playwright
-        import playwright
-        print("✅ Playwright imported successfully")
+        # Test Playwright (only locate it; importing pulls in the driver bindings)
+        if importlib.util.find_spec("playwright") is None:
+            raise ImportError("No module named 'playwright'")
+        print("✅ Playwright found")
         
         # Test Pydantic
         import pydantic
@@ -6,256 +6,271 @@ import json
 import os
 import uuid
 import time
+import random
+import asyncio
+from array import array
 import threading
+from collections import OrderedDict
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
 import re
 
-# Global storage
-test_sessions = {}
+# Prefer orjson for request/response bodies; it writes bytes directly
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Global storage; test_sessions is an LRU capped at MAX_SESSIONS, oldest-touched first
+MAX_SESSIONS = int(os.environ.get("AUTOMATION_MAX_SESSIONS", "1000"))
+test_sessions = OrderedDict()
+# session_id -> array('q', [current_action, total_actions, start_ms (monotonic)]); the run owns it and
+# does single-slot writes, pollers read it without a lock. Entries are removed when the run finishes.
 active_executions = {}
+_CURRENT, _TOTAL, _START_MS = range(3)
+_SESSIONS_LOCK = threading.Lock()
+
+# Simulated runs are coroutines on one background event loop, so a run costs a task, not a thread;
+# past MAX_ACTIVE_RUNS in flight, /execute answers 429
+MAX_ACTIVE_RUNS = 256
+_RUN_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_RUN_LOOP.run_forever, name="testexec", daemon=True).start()
+
+# Prompt patterns, compiled once instead of on every action-plan generation
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PASSWORD_RE = re.compile(r'password[:\s]+([^\s,]+)', re.IGNORECASE)
+_SEARCH_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'search for (.+?)(?:\s+and|\s+then|$)',
+    r'find (.+?)(?:\s+and|\s+then|$)',
+    r'look for (.+?)(?:\s+and|\s+then|$)'
+))
+_TITLE_RE = re.compile(r'title contains ["\']([^"\']+)["\']', re.IGNORECASE)
+
+# Every planner keyword in one alternation; the lookahead lets overlapping keywords match,
+# so a hit means the same as `in` ("searching" and "screenshots" count)
+_INTENTS_RE = re.compile(
+    r'(?=(login|search|fill|form|verify|check|title|screenshot|add to cart|add first))'
+)
+
+# Action templates: static actions are copied as-is, the rest get their per-prompt fields filled in
+_NAVIGATE = {"type": "navigate", "description": "", "target": "", "value": "", "timeout": 30000}
+_WAIT_PAGE_LOAD = {"type": "wait", "description": "Wait for page to load", "target": "time", "value": "3000", "timeout": 5000}
+_LOGIN_CLICK = {
+    "type": "click",
+    "description": "Click login button",
+    "target": "button:has-text('login'), a:has-text('login'), .login-btn, #login",
+    "value": "",
+    "timeout": 10000
+}
+_LOGIN_EMAIL = {
+    "type": "type",
+    "description": "Enter email address",
+    "target": "input[type='email'], input[name*='email'], #email",
+    "value": "jyoti@test.com",
+    "timeout": 10000
+}
+_LOGIN_PASSWORD = {
+    "type": "type",
+    "description": "Enter password",
+    "target": "input[type='password'], input[name*='password'], #password",
+    "value": "123456",
+    "timeout": 10000
+}
+_LOGIN_SUBMIT = {
+    "type": "click",
+    "description": "Submit login form",
+    "target": "button[type='submit'], input[type='submit'], .login-submit",
+    "value": "",
+    "timeout": 10000
+}
+_LOGIN_WAIT = {"type": "wait", "description": "Wait for login to complete", "target": "time", "value": "3000", "timeout": 5000}
+_SEARCH_BOX = "input[type='search'], input[name*='search'], .search-input, #search"
+_SEARCH_CLICK = {"type": "click", "description": "Click search box", "target": _SEARCH_BOX, "value": "", "timeout": 10000}
+_SEARCH_TYPE = {"type": "type", "description": "", "target": _SEARCH_BOX, "value": "", "timeout": 10000}
+_SEARCH_SUBMIT = {
+    "type": "click",
+    "description": "Click search button",
+    "target": "button[type='submit'], .search-btn, button:has-text('search')",
+    "value": "",
+    "timeout": 10000
+}
+_SEARCH_WAIT = {"type": "wait", "description": "Wait for search results", "target": "time", "value": "3000", "timeout": 5000}
+_FORM_NAME = {
+    "type": "type",
+    "description": "Fill name field",
+    "target": "input[name*='name'], input[placeholder*='name'], #name",
+    "value": "John Doe",
+    "timeout": 10000
+}
+_FORM_EMAIL = {
+    "type": "type",
+    "description": "Fill email field",
+    "target": "input[type='email'], input[name*='email'], #email",
+    "value": "john.doe@example.com",
+    "timeout": 10000
+}
+_FORM_SUBMIT = {
+    "type": "click",
+    "description": "Submit form",
+    "target": "button[type='submit'], input[type='submit'], .submit-btn",
+    "value": "",
+    "timeout": 10000
+}
+_CART_FIRST_PRODUCT = {
+    "type": "click",
+    "description": "Click first product",
+    "target": ".product:first-child, .item:first-child, [data-testid*='product']:first",
+    "value": "",
+    "timeout": 10000
+}
+_CART_WAIT = {"type": "wait", "description": "Wait for product page to load", "target": "time", "value": "2000", "timeout": 5000}
+_CART_ADD = {
+    "type": "click",
+    "description": "Add to cart",
+    "target": "button:has-text('add to cart'), .add-to-cart, [data-testid*='cart']",
+    "value": "",
+    "timeout": 10000
+}
+_VERIFY_TITLE = {"type": "verify", "description": "", "target": "title", "value": "", "timeout": 5000}
+_SCREENSHOT = {"type": "screenshot", "description": "Take screenshot", "target": "", "value": "", "timeout": 5000}
+
+def _action(template, **fields):
+    """Copy an action template, overriding the given fields"""
+    action = template.copy()
+    action.update(fields)
+    return action
 
 def generate_action_plan(prompt, website_url):
     """Generate intelligent action plan from natural language prompt"""
-    actions = []
     prompt_lower = prompt.lower()
+    # One regex pass finds every keyword; the checks below are set lookups
+    intents = set(_INTENTS_RE.findall(prompt_lower))
     
-    # Always start with navigation
-    actions.append({
-        "type": "navigate",
-        "description": f"Navigate to {website_url}",
-        "target": website_url,
-        "value": "",
-        "timeout": 30000
-    })
-    
-    # Add wait after navigation
-    actions.append({
-        "type": "wait",
-        "description": "Wait for page to load",
-        "target": "time",
-        "value": "3000",
-        "timeout": 5000
-    })
+    # Always start with navigation, then wait for the page to load
+    actions = [
+        _action(_NAVIGATE, description=f"Navigate to {website_url}", target=website_url),
+        _WAIT_PAGE_LOAD.copy(),
+    ]
     
     # Parse login actions
-    if "login" in prompt_lower:
-        actions.append({
-            "type": "click",
-            "description": "Click login button",
-            "target": "button:has-text('login'), a:has-text('login'), .login-btn, #login",
-            "value": "",
-            "timeout": 10000
-        })
+    if "login" in intents:
+        actions.append(_LOGIN_CLICK.copy())
         
         if "email" in prompt_lower or "@" in prompt:
-            email = "jyoti@test.com"  # Default
             # Try to extract email from prompt
-            email_match = re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', prompt)
-            if email_match:
-                email = email_match.group()
-            
-            actions.append({
-                "type": "type",
-                "description": "Enter email address",
-                "target": "input[type='email'], input[name*='email'], #email",
-                "value": email,
-                "timeout": 10000
-            })
+            email_match = _EMAIL_RE.search(prompt)
+            actions.append(_action(_LOGIN_EMAIL, value=email_match.group()) if email_match else _LOGIN_EMAIL.copy())
         
         if "password" in prompt_lower:
-            password = "123456"  # Default
             # Try to extract password from prompt
-            password_match = re.search(r'password[:\s]+([^\s,]+)', prompt, re.IGNORECASE)
-            if password_match:
-                password = password_match.group(1)
-            
-            actions.append({
-                "type": "type",
-                "description": "Enter password",
-                "target": "input[type='password'], input[name*='password'], #password",
-                "value": password,
-                "timeout": 10000
-            })
-        
-        actions.append({
-            "type": "click",
-            "description": "Submit login form",
-            "target": "button[type='submit'], input[type='submit'], .login-submit",
-            "value": "",
-            "timeout": 10000
-        })
+            password_match = _PASSWORD_RE.search(prompt)
+            actions.append(_action(_LOGIN_PASSWORD, value=password_match.group(1)) if password_match else _LOGIN_PASSWORD.copy())
         
-        actions.append({
-            "type": "wait",
-            "description": "Wait for login to complete",
-            "target": "time",
-            "value": "3000",
-            "timeout": 5000
-        })
+        actions.append(_LOGIN_SUBMIT.copy())
+        actions.append(_LOGIN_WAIT.copy())
     
     # Parse search actions
-    if "search" in prompt_lower:
+    if "search" in intents:
         search_term = "headphones"  # Default
         # Try to extract search term
-        search_patterns = [
-            r'search for (.+?)(?:\s+and|\s+then|$)',
-            r'find (.+?)(?:\s+and|\s+then|$)',
-            r'look for (.+?)(?:\s+and|\s+then|$)'
-        ]
-        for pattern in search_patterns:
-            match = re.search(pattern, prompt, re.IGNORECASE)
+        for rx in _SEARCH_RES:
+            match = rx.search(prompt)
             if match:
                 search_term = match.group(1).strip().strip('"\'')
                 break
         
-        actions.append({
-            "type": "click",
-            "description": "Click search box",
-            "target": "input[type='search'], input[name*='search'], .search-input, #search",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "type",
-            "description": f"Search for {search_term}",
-            "target": "input[type='search'], input[name*='search'], .search-input, #search",
-            "value": search_term,
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "click",
-            "description": "Click search button",
-            "target": "button[type='submit'], .search-btn, button:has-text('search')",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "wait",
-            "description": "Wait for search results",
-            "target": "time",
-            "value": "3000",
-            "timeout": 5000
-        })
+        actions.append(_SEARCH_CLICK.copy())
+        actions.append(_action(_SEARCH_TYPE, description=f"Search for {search_term}", value=search_term))
+        actions.append(_SEARCH_SUBMIT.copy())
+        actions.append(_SEARCH_WAIT.copy())
     
     # Parse form filling actions
-    if "fill" in prompt_lower and "form" in prompt_lower:
-        actions.append({
-            "type": "type",
-            "description": "Fill name field",
-            "target": "input[name*='name'], input[placeholder*='name'], #name",
-            "value": "John Doe",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "type",
-            "description": "Fill email field",
-            "target": "input[type='email'], input[name*='email'], #email",
-            "value": "john.doe@example.com",
-            "timeout": 10000
-        })
+    if "fill" in intents and "form" in intents:
+        actions.append(_FORM_NAME.copy())
+        actions.append(_FORM_EMAIL.copy())
         
         if "submit" in prompt_lower:
-            actions.append({
-                "type": "click",
-                "description": "Submit form",
-                "target": "button[type='submit'], input[type='submit'], .submit-btn",
-                "value": "",
-                "timeout": 10000
-            })
+            actions.append(_FORM_SUBMIT.copy())
     
     # Parse add to cart actions
-    if "add to cart" in prompt_lower or "add first" in prompt_lower:
-        actions.append({
-            "type": "click",
-            "description": "Click first product",
-            "target": ".product:first-child, .item:first-child, [data-testid*='product']:first",
-            "value": "",
-            "timeout": 10000
-        })
-        
-        actions.append({
-            "type": "wait",
-            "description": "Wait for product page to load",
-            "target": "time",
-            "value": "2000",
-            "timeout": 5000
-        })
-        
-        actions.append({
-            "type": "click",
-            "description": "Add to cart",
-            "target": "button:has-text('add to cart'), .add-to-cart, [data-testid*='cart']",
-            "value": "",
-            "timeout": 10000
-        })
+    if "add to cart" in intents or "add first" in intents:
+        actions.append(_CART_FIRST_PRODUCT.copy())
+        actions.append(_CART_WAIT.copy())
+        actions.append(_CART_ADD.copy())
     
     # Parse verification actions
-    if "verify" in prompt_lower or "check" in prompt_lower:
-        if "title" in prompt_lower:
-            title_text = "Example"  # Default
-            title_match = re.search(r'title contains ["\']([^"\']+)["\']', prompt, re.IGNORECASE)
-            if title_match:
-                title_text = title_match.group(1)
-            
-            actions.append({
-                "type": "verify",
-                "description": f"Verify page title contains '{title_text}'",
-                "target": "title",
-                "value": title_text,
-                "timeout": 5000
-            })
+    if "verify" in intents or "check" in intents:
+        if "title" in intents:
+            title_match = _TITLE_RE.search(prompt)
+            title_text = title_match.group(1) if title_match else "Example"  # Default
+            actions.append(_action(
+                _VERIFY_TITLE,
+                description=f"Verify page title contains '{title_text}'",
+                value=title_text
+            ))
     
     # Always add screenshot if mentioned or at the end
-    if "screenshot" in prompt_lower or len(actions) <= 3:
-        actions.append({
-            "type": "screenshot",
-            "description": "Take screenshot",
-            "target": "",
-            "value": "",
-            "timeout": 5000
-        })
+    if "screenshot" in intents or len(actions) <= 3:
+        actions.append(_SCREENSHOT.copy())
     
     return actions
 
-def simulate_test_execution(session_id):
+def _new_id():
+    """Random version-4 UUID string, formatted straight from os.urandom instead of via uuid.UUID"""
+    h = os.urandom(16).hex()
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+def _lookup_session(session_id):
+    """Return a stored session (or None) and mark it most recently used"""
+    with _SESSIONS_LOCK:
+        session = test_sessions.get(session_id)
+        if session is not None:
+            test_sessions.move_to_end(session_id)
+        return session
+
+def _store_session(session_id, session):
+    """Insert a new session, evicting the least recently used ones past MAX_SESSIONS"""
+    with _SESSIONS_LOCK:
+        while len(test_sessions) >= MAX_SESSIONS:
+            test_sessions.popitem(last=False)
+        test_sessions[session_id] = session
+
+async def simulate_test_execution(session_id):
     """Simulate test execution with realistic timing"""
-    session = test_sessions[session_id]
+    session = test_sessions.get(session_id)
+    if session is None:  # evicted before the run started
+        return
     
     try:
         print(f"🚀 Starting simulated test execution for session {session_id}")
         
-        active_executions[session_id] = {
-            "current_action": 0,
-            "start_time": time.time()
-        }
+        actions = session["action_plan"]["actions"]
+        progress = active_executions[session_id] = array('q', [0, len(actions), time.monotonic_ns() // 1_000_000])
         
         successful_actions = 0
         failed_actions = 0
         
+        # Simulate success (95% success rate), drawn for the whole plan up front
+        outcomes = random.choices((True, False), weights=(95, 5), k=len(actions))
+        
         # Execute each action with realistic timing
-        for i, action in enumerate(session["action_plan"]["actions"]):
-            active_executions[session_id]["current_action"] = i
+        for i, action in enumerate(actions):
+            progress[_CURRENT] = i
             
             print(f"🔄 Simulating: {action['description']}")
             
             # Simulate action execution time
             if action["type"] == "navigate":
-                time.sleep(3)  # Navigation takes longer
+                await asyncio.sleep(3)  # Navigation takes longer
             elif action["type"] == "wait":
                 wait_time = int(action["value"]) / 1000 if action["value"].isdigit() else 2
-                time.sleep(wait_time)
+                await asyncio.sleep(wait_time)
             else:
-                time.sleep(1)  # Other actions
+                await asyncio.sleep(1)  # Other actions
             
-            # Simulate success (95% success rate)
-            import random
-            if random.random() < 0.95:
+            if outcomes[i]:
                 successful_actions += 1
                 print(f"✅ {action['description']} - Success")
             else:
@@ -264,10 +279,10 @@ def simulate_test_execution(session_id):
         
         # Update session with results
         session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
+        session["completed_at"] = datetime.utcnow()
         session["successful_actions"] = successful_actions
         session["failed_actions"] = failed_actions
-        session["total_duration"] = int(time.time() - active_executions[session_id]["start_time"])
+        session["total_duration"] = (time.monotonic_ns() // 1_000_000 - progress[_START_MS]) // 1000
         
         print(f"🎉 Test completed: {successful_actions} successful, {failed_actions} failed")
         
@@ -275,175 +290,215 @@ def simulate_test_execution(session_id):
         print(f"❌ Test execution failed: {e}")
         session["status"] = "failed"
         session["error_summary"] = str(e)
-        session["completed_at"] = datetime.utcnow().isoformat()
+        session["completed_at"] = datetime.utcnow()
         
     finally:
-        if session_id in active_executions:
-            del active_executions[session_id]
+        active_executions.pop(session_id, None)
+
+def _default(obj):
+    """Serialize types the JSON encoder doesn't know about"""
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(obj):
+    """Encode obj straight to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        # Session timestamps are stored as naive UTC datetimes and only formatted here;
+        # without OPT_NAIVE_UTC orjson writes them exactly like datetime.isoformat()
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, default=_default).encode()
+
+def _loads(data):
+    """Decode a JSON request body"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Status line + headers for JSON responses, formatted and written together with the body
+_JSON_PRELUDE = (
+    b"%s %d %s\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Content-Length: %d\r\n%s\r\n"
+)
+# CORS preflight reply is the same every time; browsers may cache it for a day
+_CORS_PREFLIGHT = (
+    b"HTTP/1.1 204 No Content\r\n"
+    b"Access-Control-Allow-Origin: *\r\n"
+    b"Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+    b"Access-Control-Allow-Headers: Content-Type\r\n"
+    b"Access-Control-Max-Age: 86400\r\n"
+    b"Content-Length: 0\r\n\r\n"
+)
+_REASONS = {code: phrase.encode() for code, (phrase, _) in BaseHTTPRequestHandler.responses.items()}
 
 class RequestHandler(BaseHTTPRequestHandler):
+    # Keep connections open between polls; every response sends Content-Length
+    protocol_version = "HTTP/1.1"
+    
+    def _write_json(self, obj, status=200, extra_headers=b""):
+        """Send obj as a JSON response with CORS and Content-Length headers"""
+        body = _dumps(obj)
+        self.log_request(status)
+        # One write for prelude + body instead of one per header line and another for the body
+        self.wfile.write(_JSON_PRELUDE % (self.protocol_version.encode(), status, _REASONS[status], len(body), extra_headers) + body)
+    
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self.log_request(204)
+        self.wfile.write(_CORS_PREFLIGHT)
     
     def do_GET(self):
         """Handle GET requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
+        path = urlparse(self.path).path
         
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        
-        if path == '/health':
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
-            response = {
-                "status": "healthy",
-                "playwright_available": True,  # Simulated
-                "active_sessions": len(active_executions),
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif path.startswith('/api/tests/') and len(path.split('/')) == 4:
-            # Get test results
-            session_id = path.split('/')[-1]
-            
-            if session_id in test_sessions:
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
-                session = test_sessions[session_id]
-                execution_status = {}
-                
-                if session_id in active_executions:
-                    exec_info = active_executions[session_id]
-                    execution_status = {
-                        "current_action": exec_info["current_action"],
-                        "progress": (exec_info["current_action"] / len(session["action_plan"]["actions"])) * 100
-                    }
-                
-                response = {
-                    "session": session,
-                    "execution_status": execution_status
-                }
-                self.wfile.write(json.dumps(response).encode())
-            else:
-                self.send_response(404)
-                self.end_headers()
-        else:
-            self.send_response(404)
-            self.end_headers()
+        # Exact paths are a dict lookup; only parameterized routes run a regex
+        handler = self._GET_ROUTES.get(path)
+        if handler:
+            return handler(self)
+        for pattern, handler in self._GET_PATTERNS:
+            match = pattern.fullmatch(path)
+            if match:
+                return handler(self, *match.groups())
+        self._write_json({"detail": "Not found"}, 404)
     
     def do_POST(self):
         """Handle POST requests"""
-        parsed_path = urlparse(self.path)
-        path = parsed_path.path
-        
-        # CORS headers
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
+        path = urlparse(self.path).path
         
-        # Read request body
+        # Read request body (always, so a kept-alive connection stays in sync)
         content_length = int(self.headers['Content-Length'])
         post_data = self.rfile.read(content_length)
         
+        handler = self._POST_ROUTES.get(path)
+        if handler is None:
+            self._write_json({"detail": "Not found"}, 404)
+            return
+        
         try:
-            data = json.loads(post_data.decode())
-        except:
-            self.send_response(400)
-            self.end_headers()
+            # Parsed straight from bytes; orjson.JSONDecodeError subclasses ValueError
+            data = _loads(post_data)
+        except ValueError:
+            self._write_json({"detail": "Invalid JSON body"}, 400)
             return
         
-        if path == '/api/tests/create':
-            # Create test
-            session_id = str(uuid.uuid4())
-            
-            # Generate intelligent action plan
-            actions = generate_action_plan(data["prompt"], data["website_url"])
-            
-            action_plan = {
-                "id": str(uuid.uuid4()),
-                "website_url": data["website_url"],
-                "actions": actions,
-                "confidence": 0.9,
-                "reasoning": "Generated using intelligent pattern matching and NLP analysis",
-                "estimated_duration": len(actions) * 3,
-                "risk_level": "low"
-            }
-            
-            # Store session
-            test_sessions[session_id] = {
-                "id": session_id,
-                "website_url": data["website_url"],
-                "original_prompt": data["prompt"],
-                "action_plan": action_plan,
-                "status": "pending",
-                "created_at": datetime.utcnow().isoformat(),
-                "total_actions": len(actions),
-                "successful_actions": 0,
-                "failed_actions": 0,
-                "screenshots": []
-            }
-            
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
-            response = {
-                "session_id": session_id,
-                "action_plan": action_plan,
-                "estimated_duration": action_plan["estimated_duration"],
-                "risk_assessment": action_plan["risk_level"]
+        handler(self, data)
+    
+    def _health(self):
+        """GET /health"""
+        response = {
+            "status": "healthy",
+            "playwright_available": True,  # Simulated
+            "active_sessions": len(active_executions),
+            "timestamp": datetime.utcnow()
+        }
+        self._write_json(response)
+    
+    def _get_session(self, session_id):
+        """GET /api/tests/<session_id> - test results"""
+        session = _lookup_session(session_id)
+        if session is None:
+            self._write_json({"detail": "Test session not found"}, 404)
+            return
+        execution_status = {}
+        
+        progress = active_executions.get(session_id)
+        if progress is not None:
+            execution_status = {
+                "current_action": progress[_CURRENT],
+                "progress": (progress[_CURRENT] / progress[_TOTAL]) * 100
             }
-            self.wfile.write(json.dumps(response).encode())
-            
-        elif path == '/api/tests/execute':
-            # Execute test
-            session_id = data["session_id"]
-            
-            if session_id not in test_sessions:
-                self.send_response(404)
-                self.end_headers()
-                return
-            
-            session = test_sessions[session_id]
-            
+        
+        response = {
+            "session": session,
+            "execution_status": execution_status
+        }
+        self._write_json(response)
+    
+    def _create_test(self, data):
+        """POST /api/tests/create"""
+        session_id = _new_id()
+        
+        # Generate intelligent action plan
+        actions = generate_action_plan(data["prompt"], data["website_url"])
+        
+        action_plan = {
+            "id": _new_id(),
+            "website_url": data["website_url"],
+            "actions": actions,
+            "confidence": 0.9,
+            "reasoning": "Generated using intelligent pattern matching and NLP analysis",
+            "estimated_duration": len(actions) * 3,
+            "risk_level": "low"
+        }
+        
+        # Store session
+        _store_session(session_id, {
+            "id": session_id,
+            "website_url": data["website_url"],
+            "original_prompt": data["prompt"],
+            "action_plan": action_plan,
+            "status": "pending",
+            "created_at": datetime.utcnow(),
+            "total_actions": len(actions),
+            "successful_actions": 0,
+            "failed_actions": 0,
+            "screenshots": []
+        })
+        
+        response = {
+            "session_id": session_id,
+            "action_plan": action_plan,
+            "estimated_duration": action_plan["estimated_duration"],
+            "risk_assessment": action_plan["risk_level"]
+        }
+        self._write_json(response)
+    
+    def _execute_test(self, data):
+        """POST /api/tests/execute"""
+        session_id = data["session_id"]
+        
+        session = _lookup_session(session_id)
+        if session is None:
+            self._write_json({"detail": "Test session not found"}, 404)
+            return
+        
+        # Check-and-set under the lock so two concurrent requests can't both start a run
+        with _SESSIONS_LOCK:
             if session["status"] != "pending":
-                self.send_response(400)
-                self.end_headers()
-                return
-            
-            # Start execution in background thread
-            session["status"] = "running"
-            session["started_at"] = datetime.utcnow().isoformat()
-            
-            thread = threading.Thread(target=simulate_test_execution, args=(session_id,))
-            thread.daemon = True
-            thread.start()
-            
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
-            response = {
-                "session_id": session_id,
-                "status": "running",
-                "message": "Intelligent test execution started!"
-            }
-            self.wfile.write(json.dumps(response).encode())
-        else:
-            self.send_response(404)
-            self.end_headers()
+                error = ({"detail": "Test is not in pending state"}, 400)
+            elif len(active_executions) >= MAX_ACTIVE_RUNS:
+                error = ({"detail": "Too many running tests"}, 429, b"Retry-After: 5\r\n")
+            else:
+                error = None
+                session["status"] = "running"
+                session["started_at"] = datetime.utcnow()
+        if error:
+            self._write_json(*error)
+            return
+        
+        # Start execution on the background event loop
+        asyncio.run_coroutine_threadsafe(simulate_test_execution(session_id), _RUN_LOOP)
+        
+        response = {
+            "session_id": session_id,
+            "status": "running",
+            "message": "Intelligent test execution started!"
+        }
+        self._write_json(response)
+    
+    # Route tables: exact paths first, then the parameterized session route
+    _GET_ROUTES = {'/health': _health}
+    _GET_PATTERNS = ((re.compile(r'/api/tests/([0-9a-f-]{36})'), _get_session),)
+    _POST_ROUTES = {'/api/tests/create': _create_test, '/api/tests/execute': _execute_test}
 
 def run_server():
     """Run the HTTP server"""
     server_address = ('', 8000)
-    httpd = HTTPServer(server_address, RequestHandler)
+    httpd = ThreadingHTTPServer(server_address, RequestHandler)
     
     print("🚀 Starting Intelligent Web Tester")
     print("🧠 AI-powered action planning with intelligent prompt analysis")
@@ -456,6 +511,7 @@ def run_server():
     except KeyboardInterrupt:
         print("\n🛑 Server stopped")
         httpd.shutdown()
+        _RUN_LOOP.call_soon_threadsafe(_RUN_LOOP.stop)
 
 if __name__ == "__main__":
     run_server()
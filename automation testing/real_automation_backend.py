@@ -4,21 +4,33 @@ Real Browser Automation Backend - Actually opens browsers and performs actions
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import uvicorn
 import json
-import uuid
+import re
+import secrets
 import asyncio
 import os
+import sys
 from datetime import datetime
 from playwright.async_api import async_playwright, Browser, Page, BrowserContext
 
+# Try to import pyahocorasick, fall back to a single regex scan if not available
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent Web Tester - Real Automation",
     description="AI-powered web testing with REAL browser automation",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes responses to bytes directly, much faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -32,10 +44,62 @@ app.add_middleware(
 
 # Global storage and browser management
 test_sessions = {}
-browser_instances = {}
 playwright_instance = None
 browser = None
 
+# Created once at startup rather than checked before every screenshot
+SCREENSHOT_DIR = "screenshots"
+
+# The pool holds CONTEXT_POOL_SIZE slots: a session checks one out, and on release the used
+# context is closed and a fresh one takes its slot. A slot holds None when creating a context
+# failed; whoever takes it creates one. Concurrent runs wait for a free slot.
+CONTEXT_POOL_SIZE = int(os.environ.get("AUTOMATION_CONTEXT_POOL", "4"))
+CONTEXT_ACQUIRE_TIMEOUT = int(os.environ.get("AUTOMATION_CONTEXT_TIMEOUT", "120"))  # seconds
+context_pool = asyncio.Queue()
+
+# Session and health timestamps share one ISO string, refreshed every half second on the event
+# loop instead of formatting the clock on every request
+_now_iso = datetime.utcnow().isoformat()
+
+# Request/run progress lines go through a queue drained by one writer task, so a burst of
+# steps becomes one stdout write, done in a worker thread so a slow stdout can't stall the loop
+_log_queue = asyncio.Queue()
+_log_writer_task = None
+
+def _log(message):
+    """Queue a line for the background log writer"""
+    _log_queue.put_nowait(message)
+
+def _write_lines(lines):
+    """Write a batch of log lines to stdout"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+async def _log_writer():
+    """Write every queued log line in one batch per wakeup; a None entry means flush and stop"""
+    while True:
+        lines = [await _log_queue.get()]
+        while not _log_queue.empty():
+            lines.append(_log_queue.get_nowait())
+        stop = None in lines
+        lines = [line for line in lines if line is not None]
+        if lines:
+            await asyncio.to_thread(_write_lines, lines)
+        if stop:
+            return
+
+async def _stop_log_writer():
+    """Let the writer flush everything queued so far, then end it"""
+    if _log_writer_task is not None:
+        _log_queue.put_nowait(None)
+        await _log_writer_task
+
+def _refresh_now():
+    """Re-stamp the shared timestamp and schedule the next refresh"""
+    global _now_iso
+    _now_iso = datetime.utcnow().isoformat()
+    asyncio.get_running_loop().call_later(0.5, _refresh_now)
+
 # Models
 class CreateTestRequest(BaseModel):
     website_url: str
@@ -66,12 +130,37 @@ async def initialize_browser():
             headless=False,  # Show browser window
             args=['--start-maximized']
         )
+        for _ in range(CONTEXT_POOL_SIZE):
+            try:
+                context = await browser.new_context()
+            except Exception as e:
+                # Keep the slot so the pool never shrinks; the session that takes it creates its own
+                print(f"⚠️ Could not create browser context: {e}")
+                context = None
+            context_pool.put_nowait(context)
         print("✅ Browser initialized successfully")
         return True
     except Exception as e:
         print(f"❌ Failed to initialize browser: {e}")
         return False
 
+async def release_context(context):
+    """Close a checked-out context and put a fresh one in its pool slot"""
+    # Recycling rather than resetting: cookies, localStorage, sessionStorage and IndexedDB
+    # of every origin the session visited go with the old context
+    if context is not None:
+        try:
+            await context.close()
+        except Exception as e:
+            _log(f"⚠️ Error closing browser context: {e}")
+    try:
+        context = await browser.new_context()
+    except Exception as e:
+        # Keep the slot; the next session to take it creates its own context
+        _log(f"⚠️ Could not create browser context: {e}")
+        context = None
+    context_pool.put_nowait(context)
+
 async def cleanup_browser():
     """Cleanup browser resources"""
     global playwright_instance, browser
@@ -84,10 +173,30 @@ async def cleanup_browser():
     except Exception as e:
         print(f"⚠️ Browser cleanup error: {e}")
 
+# Every prompt keyword parse_action_from_prompt branches on
+_KEYWORDS = ("login", "log in", "search", "screenshot", "click")
+
+if AHOCORASICK_AVAILABLE:
+    # One automaton walk finds every keyword
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Regex fallback: the lookahead lets overlapping keywords match, so a hit means the same as `in`
+_KEYWORDS_RE = re.compile("(?=(" + "|".join(re.escape(k) for k in _KEYWORDS) + "))")
+
+def _scan_keywords(prompt_lower):
+    """Return the set of keywords present in the lowercased prompt"""
+    if AHOCORASICK_AVAILABLE:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(prompt_lower)}
+    return {m.group(1) for m in _KEYWORDS_RE.finditer(prompt_lower)}
+
 def parse_action_from_prompt(prompt: str, website_url: str):
     """Parse natural language prompt into actionable steps"""
     actions = []
     prompt_lower = prompt.lower()
+    hits = _scan_keywords(prompt_lower)
     
     # Always start with navigation
     actions.append({
@@ -108,7 +217,7 @@ def parse_action_from_prompt(prompt: str, website_url: str):
     })
     
     # Parse login actions
-    if "login" in prompt_lower or "log in" in prompt_lower:
+    if "login" in hits or "log in" in hits:
         actions.append({
             "type": "click",
             "description": "Click login button or link",
@@ -145,7 +254,7 @@ def parse_action_from_prompt(prompt: str, website_url: str):
         })
     
     # Parse search actions
-    if "search" in prompt_lower:
+    if "search" in hits:
         search_term = "test search"  # Default search term
         actions.append({
             "type": "fill",
@@ -163,7 +272,7 @@ def parse_action_from_prompt(prompt: str, website_url: str):
         })
     
     # Parse screenshot actions
-    if "screenshot" in prompt_lower:
+    if "screenshot" in hits:
         actions.append({
             "type": "screenshot",
             "description": "Take screenshot of current page",
@@ -173,7 +282,7 @@ def parse_action_from_prompt(prompt: str, website_url: str):
         })
     
     # Parse click actions
-    if "click" in prompt_lower and "login" not in prompt_lower:
+    if "click" in hits and "login" not in hits:
         actions.append({
             "type": "click",
             "description": "Click specified element",
@@ -199,67 +308,79 @@ async def execute_real_automation(session_id: str):
     session = test_sessions[session_id]
     action_plan = session["action_plan"]
     
+    session["execution_log"] = []
+    
+    # Check out a pooled context (waits, up to CONTEXT_ACQUIRE_TIMEOUT, if every context is in use)
     try:
-        # Create new browser context and page
-        context = await browser.new_context()
+        context = await asyncio.wait_for(context_pool.get(), CONTEXT_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        session["status"] = "failed"
+        session["error"] = "No browser context became free in time"
+        session["execution_log"].append(f"❌ Automation failed: {session['error']}")
+        _log(f"❌ Automation failed for session {session_id}: {session['error']}")
+        return
+    
+    try:
+        if context is None:
+            context = await browser.new_context()
         page = await context.new_page()
         
-        session["browser_context"] = context
-        session["page"] = page
-        session["execution_log"] = []
+        _log(f"🚀 Starting real automation for session {session_id}")
         
-        print(f"🚀 Starting real automation for session {session_id}")
+        log = session["execution_log"].append
         
-        # Execute each action
+        # Execute each action; fields are unpacked once instead of re-indexed in every branch
         for i, action in enumerate(action_plan["actions"]):
+            kind, target, value, timeout, description = (
+                action["type"], action["target"], action["value"], action["timeout"], action["description"]
+            )
             try:
                 session["current_action"] = i
-                session["current_action_description"] = action["description"]
+                session["current_action_description"] = description
                 
-                print(f"📋 Executing: {action['description']}")
+                _log(f"📋 Executing: {description}")
                 
-                if action["type"] == "navigate":
-                    await page.goto(action["target"], wait_until="networkidle")
-                    session["execution_log"].append(f"✅ Navigated to {action['target']}")
+                if kind == "navigate":
+                    await page.goto(target, wait_until="networkidle")
+                    log(f"✅ Navigated to {target}")
                 
-                elif action["type"] == "wait":
-                    if action["target"] == "networkidle":
+                elif kind == "wait":
+                    if target == "networkidle":
                         await page.wait_for_load_state("networkidle")
                     else:
-                        await asyncio.sleep(int(action["value"]) / 1000)
-                    session["execution_log"].append(f"✅ Waited as specified")
+                        await asyncio.sleep(int(value) / 1000)
+                    log(f"✅ Waited as specified")
                 
-                elif action["type"] == "click":
+                elif kind == "click":
                     try:
-                        await page.click(action["target"], timeout=action["timeout"])
-                        session["execution_log"].append(f"✅ Clicked: {action['target']}")
+                        await page.click(target, timeout=timeout)
+                        log(f"✅ Clicked: {target}")
                     except Exception as e:
-                        session["execution_log"].append(f"⚠️ Click failed: {str(e)}")
+                        log(f"⚠️ Click failed: {str(e)}")
+                    # A click may have started a navigation; let it commit before the next step
+                    # instead of sleeping a fixed second after every action
+                    await page.wait_for_load_state("domcontentloaded")
                 
-                elif action["type"] == "fill":
+                elif kind == "fill":
                     try:
-                        await page.fill(action["target"], action["value"], timeout=action["timeout"])
-                        session["execution_log"].append(f"✅ Filled: {action['target']} with '{action['value']}'")
+                        await page.fill(target, value, timeout=timeout)
+                        log(f"✅ Filled: {target} with '{value}'")
                     except Exception as e:
-                        session["execution_log"].append(f"⚠️ Fill failed: {str(e)}")
+                        log(f"⚠️ Fill failed: {str(e)}")
                 
-                elif action["type"] == "screenshot":
-                    screenshot_path = f"screenshots/session_{session_id}_{i}.png"
-                    os.makedirs("screenshots", exist_ok=True)
-                    await page.screenshot(path=screenshot_path)
-                    session["execution_log"].append(f"✅ Screenshot saved: {screenshot_path}")
-                
-                # Small delay between actions
-                await asyncio.sleep(1)
+                elif kind == "screenshot":
+                    screenshot_path = f"{SCREENSHOT_DIR}/session_{session_id}_{i}.jpg"
+                    await page.screenshot(path=screenshot_path, type="jpeg", quality=70)
+                    log(f"✅ Screenshot saved: {screenshot_path}")
                 
             except Exception as e:
-                error_msg = f"❌ Action failed: {action['description']} - {str(e)}"
-                session["execution_log"].append(error_msg)
-                print(error_msg)
+                error_msg = f"❌ Action failed: {description} - {str(e)}"
+                log(error_msg)
+                _log(error_msg)
         
         # Mark as completed
         session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
+        session["completed_at"] = _now_iso
         session["result"] = {
             "success": True,
             "message": "Real browser automation completed successfully",
@@ -267,21 +388,24 @@ async def execute_real_automation(session_id: str):
             "actions_completed": len(action_plan["actions"])
         }
         
-        print(f"✅ Automation completed for session {session_id}")
-        
-        # Keep browser open for user to see results
-        # await asyncio.sleep(10)  # Keep open for 10 seconds
-        # await context.close()
+        _log(f"✅ Automation completed for session {session_id}")
         
     except Exception as e:
         session["status"] = "failed"
         session["error"] = str(e)
         session["execution_log"].append(f"❌ Automation failed: {str(e)}")
-        print(f"❌ Automation failed for session {session_id}: {e}")
+        _log(f"❌ Automation failed for session {session_id}: {e}")
+    
+    finally:
+        await release_context(context)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize browser on startup"""
+    global _log_writer_task
+    _refresh_now()
+    _log_writer_task = asyncio.create_task(_log_writer())
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
     try:
         success = await initialize_browser()
         if not success:
@@ -296,6 +420,7 @@ async def shutdown_event():
         await cleanup_browser()
     except Exception as e:
         print(f"⚠️ Shutdown error: {e}")
+    await _stop_log_writer()
 
 @app.get("/")
 async def root():
@@ -305,7 +430,7 @@ async def root():
         "version": "1.0.0",
         "status": "running",
         "browser_ready": browser is not None,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": _now_iso
     }
 
 @app.get("/health")
@@ -313,7 +438,7 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso,
         "services": {
             "api": "online",
             "browser": "ready" if browser else "initializing",
@@ -325,7 +450,7 @@ async def health_check():
 async def create_test(request: CreateTestRequest):
     """Create a new test from natural language prompt"""
     try:
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_hex(12)
         
         # Generate action plan from natural language
         action_plan = parse_action_from_prompt(request.prompt, request.website_url)
@@ -337,18 +462,19 @@ async def create_test(request: CreateTestRequest):
             "prompt": request.prompt,
             "action_plan": action_plan,
             "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": _now_iso,
             "context": request.context or {}
         }
         
-        print(f"📝 Created test session {session_id} for {request.website_url}")
+        _log(f"📝 Created test session {session_id} for {request.website_url}")
         
-        return CreateTestResponse(
-            session_id=session_id,
-            action_plan=action_plan,
-            estimated_duration=action_plan["estimated_duration"],
-            risk_assessment=action_plan["risk_level"]
-        )
+        # Returned as a ready Response so FastAPI skips validating and re-encoding the nested plan
+        return ORJSONResponse({
+            "session_id": session_id,
+            "action_plan": action_plan,
+            "estimated_duration": action_plan["estimated_duration"],
+            "risk_assessment": action_plan["risk_level"]
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -370,12 +496,12 @@ async def execute_test(request: ExecuteTestRequest):
         
         # Update session status
         session["status"] = "running"
-        session["started_at"] = datetime.utcnow().isoformat()
+        session["started_at"] = _now_iso
         
         # Start REAL browser automation
         asyncio.create_task(execute_real_automation(request.session_id))
         
-        print(f"🚀 Started real browser automation for session {request.session_id}")
+        _log(f"🚀 Started real browser automation for session {request.session_id}")
         
         return ExecuteTestResponse(
             session_id=request.session_id,
@@ -399,5 +525,11 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        backlog=65535,
+        log_level="warning",
+        access_log=False,
+        # "auto" runs on uvloop + httptools whenever they are installed (uvicorn[standard])
+        # and falls back to asyncio + h11 instead of failing at startup when they aren't
+        loop="auto",
+        http="auto"
     )
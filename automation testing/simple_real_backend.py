@@ -2,14 +2,18 @@
 """
 Simple Real Browser Automation Backend - Actually opens browsers
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import uvicorn
-import uuid
+import re
+import secrets
 import asyncio
+import functools
 import os
+import sys
 from datetime import datetime
 
 # Try to import Playwright
@@ -21,11 +25,20 @@ except ImportError:
     PLAYWRIGHT_AVAILABLE = False
     print("⚠️ Playwright not available")
 
+# Try to import pyahocorasick, fall back to a single regex scan if not available
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
 # Create FastAPI app
 app = FastAPI(
     title="Simple Real Browser Automation",
     description="Real browser automation with Playwright",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes responses to bytes directly, much faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -37,11 +50,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Credential patterns for login prompts, compiled once
+_USERNAME_RE = re.compile(r'username["\s]*["\']([^"\']+)["\']')
+_PASSWORD_RE = re.compile(r'password["\s]*["\']([^"\']+)["\']')
+
 # Global storage
 test_sessions = {}
 browser = None
 playwright_instance = None
 
+# Created once at startup rather than checked before every screenshot
+SCREENSHOT_DIR = "screenshots"
+
+# The pool holds CONTEXT_POOL_SIZE slots: a session checks one out, and on release the used
+# context is closed and a fresh one takes its slot. A slot holds None when creating a context
+# failed; whoever takes it creates one. Concurrent runs wait for a free slot.
+CONTEXT_POOL_SIZE = int(os.environ.get("AUTOMATION_CONTEXT_POOL", "4"))
+CONTEXT_ACQUIRE_TIMEOUT = int(os.environ.get("AUTOMATION_CONTEXT_TIMEOUT", "120"))  # seconds
+context_pool = asyncio.Queue()
+
+# Session and health timestamps share one ISO string, refreshed every half second on the event
+# loop instead of formatting the clock on every request
+_now_iso = datetime.utcnow().isoformat()
+
+# Request/run progress lines go through a queue drained by one writer task, so a burst of
+# steps becomes one stdout write, done in a worker thread so a slow stdout can't stall the loop
+_log_queue = asyncio.Queue()
+_log_writer_task = None
+
+def _log(message):
+    """Queue a line for the background log writer"""
+    _log_queue.put_nowait(message)
+
+def _write_lines(lines):
+    """Write a batch of log lines to stdout"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+async def _log_writer():
+    """Write every queued log line in one batch per wakeup; a None entry means flush and stop"""
+    while True:
+        lines = [await _log_queue.get()]
+        while not _log_queue.empty():
+            lines.append(_log_queue.get_nowait())
+        stop = None in lines
+        lines = [line for line in lines if line is not None]
+        if lines:
+            await asyncio.to_thread(_write_lines, lines)
+        if stop:
+            return
+
+async def _stop_log_writer():
+    """Let the writer flush everything queued so far, then end it"""
+    if _log_writer_task is not None:
+        _log_queue.put_nowait(None)
+        await _log_writer_task
+
+def _refresh_now():
+    """Re-stamp the shared timestamp and schedule the next refresh"""
+    global _now_iso
+    _now_iso = datetime.utcnow().isoformat()
+    asyncio.get_running_loop().call_later(0.5, _refresh_now)
+
 # Models
 class CreateTestRequest(BaseModel):
     website_url: str
@@ -63,10 +133,34 @@ class ExecuteTestResponse(BaseModel):
     status: str
     message: str
 
+class ExecuteManyRequest(BaseModel):
+    session_ids: List[str]
+    options: Optional[Dict[str, Any]] = None
+
+# Every prompt keyword parse_prompt_to_actions branches on
+_KEYWORDS = ("login", "username", "password", "screenshot")
+
+if AHOCORASICK_AVAILABLE:
+    # One automaton walk finds every keyword
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+
+# Regex fallback: the lookahead lets overlapping keywords match, so a hit means the same as `in`
+_KEYWORDS_RE = re.compile("(?=(" + "|".join(re.escape(k) for k in _KEYWORDS) + "))")
+
+def _scan_keywords(prompt_lower):
+    """Return the set of keywords present in the lowercased prompt"""
+    if AHOCORASICK_AVAILABLE:
+        return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(prompt_lower)}
+    return {m.group(1) for m in _KEYWORDS_RE.finditer(prompt_lower)}
+
 def parse_prompt_to_actions(prompt: str, website_url: str):
     """Parse natural language prompt into browser actions"""
     actions = []
     prompt_lower = prompt.lower()
+    hits = _scan_keywords(prompt_lower)
     
     # Always navigate first
     actions.append({
@@ -87,21 +181,20 @@ def parse_prompt_to_actions(prompt: str, website_url: str):
     })
     
     # Parse login actions
-    if "login" in prompt_lower:
+    if "login" in hits:
         # Extract username and password from prompt if available
         username = "standard_user"  # Default
         password = "secret_sauce"   # Default
         
-        if "username" in prompt_lower:
+        if "username" in hits:
             # Try to extract username from prompt
-            import re
-            username_match = re.search(r'username["\s]*["\']([^"\']+)["\']', prompt_lower)
+            username_match = _USERNAME_RE.search(prompt_lower)
             if username_match:
                 username = username_match.group(1)
         
-        if "password" in prompt_lower:
+        if "password" in hits:
             # Try to extract password from prompt
-            password_match = re.search(r'password["\s]*["\']([^"\']+)["\']', prompt_lower)
+            password_match = _PASSWORD_RE.search(prompt_lower)
             if password_match:
                 password = password_match.group(1)
         
@@ -130,7 +223,7 @@ def parse_prompt_to_actions(prompt: str, website_url: str):
         })
     
     # Parse screenshot actions
-    if "screenshot" in prompt_lower:
+    if "screenshot" in hits:
         actions.append({
             "type": "screenshot",
             "description": "Take screenshot",
@@ -146,6 +239,42 @@ def parse_prompt_to_actions(prompt: str, website_url: str):
         "risk_level": "low"
     }
 
+async def release_context(context):
+    """Close a checked-out context and put a fresh one in its pool slot"""
+    # Recycling rather than resetting: cookies, localStorage, sessionStorage and IndexedDB
+    # of every origin the session visited go with the old context
+    if context is not None:
+        try:
+            await context.close()
+        except Exception as e:
+            _log(f"⚠️ Error closing browser context: {e}")
+    try:
+        context = await browser.new_context()
+    except Exception as e:
+        # Keep the slot; the next session to take it creates its own context
+        _log(f"⚠️ Could not create browser context: {e}")
+        context = None
+    context_pool.put_nowait(context)
+
+# Sets a run of consecutive fill fields in one round trip; uses the prototype's native value
+# setter plus input/change events so framework-controlled inputs (React etc.) see the change.
+# Returns per-field success so misses fall back to page.fill, which waits for the element.
+_FILL_ALL_JS = """
+(fields) => fields.map(([selector, value]) => {
+    try {
+        const el = document.querySelector(selector);
+        if (!el || !('value' in el)) return false;
+        el.focus();
+        Object.getOwnPropertyDescriptor(Object.getPrototypeOf(el), 'value').set.call(el, value);
+        el.dispatchEvent(new Event('input', {bubbles: true}));
+        el.dispatchEvent(new Event('change', {bubbles: true}));
+        return true;
+    } catch (e) {
+        return false;  // Playwright-only selector syntax, or no native value setter
+    }
+})
+"""
+
 async def execute_browser_automation(session_id: str):
     """Execute real browser automation"""
     global browser
@@ -156,58 +285,82 @@ async def execute_browser_automation(session_id: str):
     session = test_sessions[session_id]
     action_plan = session["action_plan"]
     
+    # Check out a pooled context (waits, up to CONTEXT_ACQUIRE_TIMEOUT, if every context is in use)
+    try:
+        context = await asyncio.wait_for(context_pool.get(), CONTEXT_ACQUIRE_TIMEOUT)
+    except asyncio.TimeoutError:
+        session["status"] = "failed"
+        session["error"] = "No browser context became free in time"
+        session["execution_log"] = [f"❌ Automation failed: {session['error']}"]
+        _log(f"❌ Automation failed for session {session_id}: {session['error']}")
+        return
+    
     try:
-        print(f"🚀 Starting browser automation for session {session_id}")
+        _log(f"🚀 Starting browser automation for session {session_id}")
         
-        # Create new browser context and page
-        context = await browser.new_context()
+        if context is None:
+            context = await browser.new_context()
         page = await context.new_page()
         
         session["execution_log"] = []
         session["current_action"] = 0
         
-        # Execute each action
-        for i, action in enumerate(action_plan["actions"]):
+        log = session["execution_log"].append
+        actions = action_plan["actions"]
+        prefilled = set()  # fill steps already applied by a batched run
+        
+        # Execute each action; fields are unpacked once instead of re-indexed in every branch
+        for i, action in enumerate(actions):
+            kind, target, value, timeout = action["type"], action["target"], action["value"], action["timeout"]
             try:
                 session["current_action"] = i
-                print(f"📋 Step {i+1}: {action['description']}")
+                _log(f"📋 Step {i+1}: {action['description']}")
                 
-                if action["type"] == "navigate":
-                    await page.goto(action["target"], wait_until="networkidle", timeout=30000)
-                    session["execution_log"].append(f"✅ Navigated to {action['target']}")
+                if kind == "navigate":
+                    await page.goto(target, wait_until="networkidle", timeout=30000)
+                    log(f"✅ Navigated to {target}")
                 
-                elif action["type"] == "wait":
-                    if action["target"] == "networkidle":
+                elif kind == "wait":
+                    if target == "networkidle":
                         await page.wait_for_load_state("networkidle", timeout=10000)
                     else:
-                        await asyncio.sleep(int(action["value"]) / 1000)
-                    session["execution_log"].append("✅ Wait completed")
+                        await asyncio.sleep(int(value) / 1000)
+                    log("✅ Wait completed")
                 
-                elif action["type"] == "fill":
-                    await page.fill(action["target"], action["value"], timeout=action["timeout"])
-                    session["execution_log"].append(f"✅ Filled '{action['target']}' with '{action['value']}'")
+                elif kind == "fill":
+                    if i not in prefilled:
+                        end = i + 1
+                        while end < len(actions) and actions[end]["type"] == "fill":
+                            end += 1
+                        if end - i > 1:
+                            run = [[a["target"], a["value"]] for a in actions[i:end]]
+                            applied = await page.evaluate(_FILL_ALL_JS, run)
+                            prefilled.update(i + k for k, ok in enumerate(applied) if ok)
+                    if i not in prefilled:
+                        await page.fill(target, value, timeout=timeout)
+                    log(f"✅ Filled '{target}' with '{value}'")
                 
-                elif action["type"] == "click":
-                    await page.click(action["target"], timeout=action["timeout"])
-                    session["execution_log"].append(f"✅ Clicked '{action['target']}'")
+                elif kind == "click":
+                    await page.click(target, timeout=timeout)
+                    log(f"✅ Clicked '{target}'")
                 
-                elif action["type"] == "screenshot":
-                    os.makedirs("screenshots", exist_ok=True)
-                    screenshot_path = f"screenshots/session_{session_id}_{i}.png"
-                    await page.screenshot(path=screenshot_path)
-                    session["execution_log"].append(f"✅ Screenshot saved: {screenshot_path}")
+                elif kind == "screenshot":
+                    screenshot_path = f"{SCREENSHOT_DIR}/session_{session_id}_{i}.jpg"
+                    await page.screenshot(path=screenshot_path, type="jpeg", quality=70)
+                    log(f"✅ Screenshot saved: {screenshot_path}")
                 
-                # Small delay between actions
-                await asyncio.sleep(1)
+                # Small delay between actions, except before a fill the batch already applied
+                if i + 1 not in prefilled:
+                    await asyncio.sleep(1)
                 
             except Exception as e:
                 error_msg = f"⚠️ Step {i+1} failed: {str(e)}"
-                session["execution_log"].append(error_msg)
-                print(error_msg)
+                log(error_msg)
+                _log(error_msg)
         
         # Mark as completed
         session["status"] = "completed"
-        session["completed_at"] = datetime.utcnow().isoformat()
+        session["completed_at"] = _now_iso
         session["result"] = {
             "success": True,
             "message": "Browser automation completed",
@@ -215,21 +368,27 @@ async def execute_browser_automation(session_id: str):
             "actions_completed": len(action_plan["actions"])
         }
         
-        print(f"✅ Automation completed for session {session_id}")
+        _log(f"✅ Automation completed for session {session_id}")
         
-        # Keep browser open for a while so user can see results
+        # Keep the page up for a while so user can see results
         await asyncio.sleep(5)
-        # await context.close()  # Uncomment to auto-close browser
         
     except Exception as e:
         session["status"] = "failed"
         session["error"] = str(e)
-        print(f"❌ Automation failed for session {session_id}: {e}")
+        _log(f"❌ Automation failed for session {session_id}: {e}")
+    
+    finally:
+        await release_context(context)
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize browser on startup"""
-    global playwright_instance, browser
+    global playwright_instance, browser, _log_writer_task
+    
+    _refresh_now()
+    _log_writer_task = asyncio.create_task(_log_writer())
+    os.makedirs(SCREENSHOT_DIR, exist_ok=True)
     
     if PLAYWRIGHT_AVAILABLE:
         try:
@@ -238,6 +397,14 @@ async def startup_event():
                 headless=False,  # Show browser window
                 args=['--start-maximized']
             )
+            for _ in range(CONTEXT_POOL_SIZE):
+                try:
+                    context = await browser.new_context()
+                except Exception as e:
+                    # Keep the slot so the pool never shrinks; the session that takes it creates its own
+                    print(f"⚠️ Could not create browser context: {e}")
+                    context = None
+                context_pool.put_nowait(context)
             print("✅ Browser initialized successfully")
         except Exception as e:
             print(f"❌ Failed to initialize browser: {e}")
@@ -255,6 +422,7 @@ async def shutdown_event():
         print("✅ Browser cleanup completed")
     except Exception as e:
         print(f"⚠️ Cleanup error: {e}")
+    await _stop_log_writer()
 
 @app.get("/")
 async def root():
@@ -265,7 +433,7 @@ async def root():
         "status": "running",
         "browser_ready": browser is not None,
         "playwright_available": PLAYWRIGHT_AVAILABLE,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": _now_iso
     }
 
 @app.get("/health")
@@ -273,7 +441,7 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _now_iso,
         "services": {
             "api": "online",
             "browser": "ready" if browser else "initializing",
@@ -285,7 +453,7 @@ async def health_check():
 async def create_test(request: CreateTestRequest):
     """Create a new test from natural language prompt"""
     try:
-        session_id = str(uuid.uuid4())
+        session_id = secrets.token_hex(12)
         
         # Generate action plan
         action_plan = parse_prompt_to_actions(request.prompt, request.website_url)
@@ -297,21 +465,22 @@ async def create_test(request: CreateTestRequest):
             "prompt": request.prompt,
             "action_plan": action_plan,
             "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": _now_iso,
             "context": request.context or {}
         }
         
-        print(f"📝 Created test session {session_id} for {request.website_url}")
+        _log(f"📝 Created test session {session_id} for {request.website_url}")
         
-        return CreateTestResponse(
-            session_id=session_id,
-            action_plan=action_plan,
-            estimated_duration=action_plan["estimated_duration"],
-            risk_assessment=action_plan["risk_level"]
-        )
+        # Returned as a ready Response so FastAPI skips validating and re-encoding the nested plan
+        return ORJSONResponse({
+            "session_id": session_id,
+            "action_plan": action_plan,
+            "estimated_duration": action_plan["estimated_duration"],
+            "risk_assessment": action_plan["risk_level"]
+        })
         
     except Exception as e:
-        print(f"❌ Error creating test: {e}")
+        _log(f"❌ Error creating test: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tests/execute", response_model=ExecuteTestResponse)
@@ -331,12 +500,12 @@ async def execute_test(request: ExecuteTestRequest):
         
         # Update session status
         session["status"] = "running"
-        session["started_at"] = datetime.utcnow().isoformat()
+        session["started_at"] = _now_iso
         
         # Start real browser automation in background
         asyncio.create_task(execute_browser_automation(request.session_id))
         
-        print(f"🚀 Started browser automation for session {request.session_id}")
+        _log(f"🚀 Started browser automation for session {request.session_id}")
         
         return ExecuteTestResponse(
             session_id=request.session_id,
@@ -347,19 +516,66 @@ async def execute_test(request: ExecuteTestRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error executing test: {e}")
+        _log(f"❌ Error executing test: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/tests/{session_id}")
-async def get_test_results(session_id: str):
-    """Get test results for a session"""
+@app.post("/api/tests/execute_many", response_model=List[ExecuteTestResponse])
+async def execute_many(request: ExecuteManyRequest):
+    """Execute a batch of test sessions concurrently"""
     try:
-        if session_id not in test_sessions:
-            raise HTTPException(status_code=404, detail="Test session not found")
+        session_ids = list(dict.fromkeys(request.session_ids))
+        
+        # Check the whole batch first so a bad id doesn't leave earlier sessions stuck as running
+        for session_id in session_ids:
+            session = test_sessions.get(session_id)
+            if session is None:
+                raise HTTPException(status_code=404, detail=f"Test session not found: {session_id}")
+            if session["status"] != "pending":
+                raise HTTPException(status_code=400, detail=f"Test {session_id} is already {session['status']}")
+        
+        if not browser:
+            raise HTTPException(status_code=503, detail="Browser not ready")
+        
+        for session_id in session_ids:
+            test_sessions[session_id]["status"] = "running"
+            test_sessions[session_id]["started_at"] = _now_iso
+        
+        # gather schedules every run right away; the context pool caps how many drive a browser at once
+        asyncio.gather(
+            *(execute_browser_automation(session_id) for session_id in session_ids),
+            return_exceptions=True
+        )
+        
+        _log(f"🚀 Started browser automation for {len(session_ids)} sessions")
         
-        session = test_sessions[session_id]
+        return [
+            ExecuteTestResponse(
+                session_id=session_id,
+                status="running",
+                message="Real browser automation started - browser window will open"
+            )
+            for session_id in session_ids
+        ]
         
-        return {
+    except HTTPException:
+        raise
+    except Exception as e:
+        _log(f"❌ Error executing tests: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def get_session(session_id: str):
+    """Resolve the session_id path parameter to its session, or 404"""
+    session = test_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Test session not found")
+    return session
+
+@app.get("/api/tests/{session_id}")
+async def get_test_results(session: dict = Depends(get_session)):
+    """Get test results for a session"""
+    try:
+        # Returned as a ready Response so the whole session isn't walked by jsonable_encoder first
+        return ORJSONResponse({
             "session": session,
             "execution_result": session.get("result"),
             "metrics": {
@@ -367,33 +583,42 @@ async def get_test_results(session_id: str):
                 "actions_completed": session.get("current_action", 0),
                 "success_rate": 100 if session["status"] == "completed" else 0
             }
-        }
+        })
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@functools.lru_cache(maxsize=None)
+def _progress_table(total_actions):
+    """Per-step progress percentages and step labels for a plan of total_actions steps"""
+    progress = tuple(int((i / total_actions) * 100) if total_actions > 0 else 0 for i in range(total_actions + 1))
+    labels = tuple(f"Step {i + 1}" for i in range(total_actions + 1))
+    return progress, labels
+
 @app.get("/api/tests/{session_id}/status")
-async def get_test_status(session_id: str):
+async def get_test_status(session_id: str, request: Request, session: dict = Depends(get_session)):
     """Get current status of a test"""
     try:
-        if session_id not in test_sessions:
-            raise HTTPException(status_code=404, detail="Test session not found")
-        
-        session = test_sessions[session_id]
         current_action = session.get("current_action", 0)
         total_actions = session["action_plan"]["total_steps"]
+        progress, labels = _progress_table(total_actions)
         
-        return {
+        # The body only changes with status and step, so pollers that already have them get a bare 304
+        etag = f'W/"{session["status"]}-{current_action}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        return ORJSONResponse({
             "session_id": session_id,
             "status": session["status"],
-            "progress": int((current_action / total_actions) * 100) if total_actions > 0 else 0,
-            "current_action": f"Step {current_action + 1}" if session["status"] == "running" else None,
+            "progress": progress[current_action],
+            "current_action": labels[current_action] if session["status"] == "running" else None,
             "completed_actions": current_action,
             "total_actions": total_actions,
             "estimated_remaining": max(0, (total_actions - current_action) * 5)
-        }
+        }, headers={"ETag": etag})
         
     except HTTPException:
         raise
@@ -411,5 +636,11 @@ if __name__ == "__main__":
         app,
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        backlog=65535,
+        log_level="warning",
+        access_log=False,
+        # "auto" runs on uvloop + httptools whenever they are installed (uvicorn[standard])
+        # and falls back to asyncio + h11 instead of failing at startup when they aren't
+        loop="auto",
+        http="auto"
     )
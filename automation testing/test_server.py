@@ -3,47 +3,58 @@
 Simple test server to verify the setup
 """
 import json
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 
+# Prefer orjson for response bodies; it writes bytes directly
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(obj):
+    """Encode a response body to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+def _json_response(status, obj):
+    """Full HTTP/1.0 response bytes (status line, headers and JSON body)"""
+    body = _dumps(obj)
+    reason = BaseHTTPRequestHandler.responses[status][0]
+    return (
+        f"HTTP/1.0 {status} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    ).encode() + body
+
 class TestRequestHandler(BaseHTTPRequestHandler):
+    # Every GET reply is constant, so each is built once and sent with a single write
+    _ROOT = _json_response(200, {
+        "message": "Test server is working!",
+        "status": "running",
+        "path": "/"
+    })
+    _HEALTH = _json_response(200, {
+        "status": "healthy",
+        "server": "test-server"
+    })
+    _NOT_FOUND = _json_response(404, {"error": "Not found"})
+    
     def do_GET(self):
         """Handle GET requests"""
-        print(f"GET request received: {self.path}")
-        
         if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {
-                "message": "Test server is working!",
-                "status": "running",
-                "path": self.path
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
+            self.log_request(200)
+            self.wfile.write(self._ROOT)
         elif self.path == '/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {
-                "status": "healthy",
-                "server": "test-server"
-            }
-            self.wfile.write(json.dumps(response).encode())
-            
+            self.log_request(200)
+            self.wfile.write(self._HEALTH)
         else:
-            self.send_response(404)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            
-            response = {"error": "Not found"}
-            self.wfile.write(json.dumps(response).encode())
+            self.log_request(404)
+            self.wfile.write(self._NOT_FOUND)
     
     def do_OPTIONS(self):
         """Handle OPTIONS requests for CORS"""
@@ -59,7 +70,7 @@ def run_test_server():
     server_address = ('localhost', port)
 
     try:
-        httpd = HTTPServer(server_address, TestRequestHandler)
+        httpd = ThreadingHTTPServer(server_address, TestRequestHandler)
         print("🚀 Starting Test Server")
         print(f"📡 Server running on http://localhost:{port}")
         print("✅ Ready to test!")
@@ -73,7 +84,7 @@ def run_test_server():
         # Try port 8002
         port = 8002
         server_address = ('localhost', port)
-        httpd = HTTPServer(server_address, TestRequestHandler)
+        httpd = ThreadingHTTPServer(server_address, TestRequestHandler)
         print(f"📡 Server running on http://localhost:{port}")
         httpd.serve_forever()
     except KeyboardInterrupt:
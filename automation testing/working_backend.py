@@ -4,19 +4,35 @@ Working backend for the intelligent tester using FastAPI
 """
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 import uvicorn
-import json
-import uuid
+import orjson
+import secrets
+import os
+import re
+import sys
+import importlib.util
+import functools
+from collections import OrderedDict
 from datetime import datetime
 import asyncio
 
+# Try to import the Redis client (only used when REDIS_URL is set)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent Web Tester",
     description="AI-powered web testing with natural language prompts",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes responses to bytes directly, much faster than the stdlib encoder
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -28,8 +44,91 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Simple in-memory storage
-test_sessions = {}
+# Simple in-memory storage; an LRU capped at MAX_SESSIONS, oldest-touched first
+MAX_SESSIONS = int(os.environ.get("AUTOMATION_MAX_SESSIONS", "1000"))
+test_sessions = OrderedDict()
+
+# With REDIS_URL set, sessions live in Redis so every worker and restart sees the same state.
+# Each session is a JSON blob at session:{id}, plus a small session:{id}:state hash holding
+# status and total_steps so status polls don't decode the whole action plan.
+REDIS_URL = os.getenv("REDIS_URL")
+SESSION_TTL = 3600  # seconds
+redis_client = None
+
+async def save_session(session):
+    """Persist a session after it has been created or changed"""
+    if redis_client:
+        key = f"session:{session['id']}"
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(key, orjson.dumps(session), ex=SESSION_TTL)
+            pipe.hset(f"{key}:state", mapping={
+                "status": session["status"],
+                "total_steps": session["action_plan"]["total_steps"]
+            })
+            pipe.expire(f"{key}:state", SESSION_TTL)
+            await pipe.execute()
+    elif session["id"] in test_sessions:
+        test_sessions[session["id"]] = session
+        test_sessions.move_to_end(session["id"])
+    else:
+        while len(test_sessions) >= MAX_SESSIONS:
+            test_sessions.popitem(last=False)
+        test_sessions[session["id"]] = session
+
+async def load_session(session_id):
+    """Return a session by id, or None if it doesn't exist"""
+    if redis_client:
+        payload = await redis_client.get(f"session:{session_id}")
+        return orjson.loads(payload) if payload is not None else None
+    session = test_sessions.get(session_id)
+    if session is not None:
+        test_sessions.move_to_end(session_id)
+    return session
+
+async def load_session_state(session_id):
+    """Return just (status, total_steps) for a session, or None if it doesn't exist"""
+    if redis_client:
+        state = await redis_client.hgetall(f"session:{session_id}:state")
+        return (state["status"], int(state["total_steps"])) if state else None
+    session = test_sessions.get(session_id)
+    if session is None:
+        return None
+    test_sessions.move_to_end(session_id)
+    return session["status"], session["action_plan"]["total_steps"]
+
+async def claim_session(session_id):
+    """Atomically reserve a session for execution; False if another worker already has it"""
+    if redis_client:
+        return bool(await redis_client.set(f"session:{session_id}:run", 1, nx=True, ex=SESSION_TTL))
+    return True  # in memory, the status check and save in execute_test never yield in between
+
+# Session and health timestamps share one ISO string, refreshed every half second on the event
+# loop instead of formatting the clock on every request
+_now_iso = datetime.utcnow().isoformat()
+
+# / and /health bodies, re-encoded alongside the timestamp so probes just send bytes
+_root_body = b""
+_health_body = b""
+
+def _refresh_now():
+    """Re-stamp the shared timestamp and probe bodies, then schedule the next refresh"""
+    global _now_iso, _root_body, _health_body
+    _now_iso = datetime.utcnow().isoformat()
+    _root_body = orjson.dumps({
+        "message": "Intelligent Web Tester API",
+        "version": "1.0.0",
+        "status": "running",
+        "timestamp": _now_iso
+    })
+    _health_body = orjson.dumps({
+        "status": "healthy",
+        "timestamp": _now_iso,
+        "services": {
+            "api": "online",
+            "browser": "ready"
+        }
+    })
+    asyncio.get_running_loop().call_later(0.5, _refresh_now)
 
 # Models
 class CreateTestRequest(BaseModel):
@@ -54,61 +153,79 @@ class ExecuteTestResponse(BaseModel):
 
 def generate_action_plan(prompt: str, website_url: str):
     """Generate intelligent action plan from natural language prompt"""
-    actions = []
-    prompt_lower = prompt.lower()
-    
-    # Always start with navigation
-    actions.append({
-        "type": "navigate",
-        "description": f"Navigate to {website_url}",
-        "target": website_url,
+    # Repeat prompts reuse the cached plan; copy it so each session owns its own dicts
+    plan = _build_action_plan(prompt, website_url)
+    return {**plan, "actions": [dict(action) for action in plan["actions"]]}
+
+# Every prompt keyword the action plan branches on; none overlaps another, so one
+# case-insensitive alternation finds them all in a single pass without lowercasing the prompt
+_KEYWORDS_RE = re.compile("search|screenshot|click", re.IGNORECASE)
+
+# Plan steps that never vary, shared by every cached plan (generate_action_plan hands out copies)
+_WAIT_FOR_LOAD = {
+    "type": "wait",
+    "description": "Wait for page to load",
+    "target": "time",
+    "value": "3000",
+    "timeout": 5000
+}
+_SEARCH_STEPS = (
+    {
+        "type": "fill",
+        "description": "Fill search field",
+        "target": "input[type='search'], input[name*='search'], input[placeholder*='search'], .search-input",
+        "value": "search term",
+        "timeout": 10000
+    },
+    {
+        "type": "click",
+        "description": "Click search button",
+        "target": "button[type='submit'], .search-button, input[type='submit']",
         "value": "",
-        "timeout": 30000
-    })
+        "timeout": 10000
+    }
+)
+_SCREENSHOT = {
+    "type": "screenshot",
+    "description": "Take screenshot",
+    "target": "page",
+    "value": "",
+    "timeout": 5000
+}
+_CLICK = {
+    "type": "click",
+    "description": "Click element",
+    "target": "button, a, .clickable",
+    "value": "",
+    "timeout": 10000
+}
+
+@functools.lru_cache(maxsize=4096)
+def _build_action_plan(prompt: str, website_url: str):
+    """Build the action plan for a (prompt, url) pair, memoized"""
+    hits = {m.group(0).lower() for m in _KEYWORDS_RE.finditer(prompt)}
     
-    # Add wait after navigation
-    actions.append({
-        "type": "wait",
-        "description": "Wait for page to load",
-        "target": "time",
-        "value": "3000",
-        "timeout": 5000
-    })
+    # Always start with navigation, then wait for the page to load
+    actions = [
+        {
+            "type": "navigate",
+            "description": f"Navigate to {website_url}",
+            "target": website_url,
+            "value": "",
+            "timeout": 30000
+        },
+        _WAIT_FOR_LOAD
+    ]
     
     # Parse different actions based on prompt
-    if "search" in prompt_lower:
-        actions.append({
-            "type": "fill",
-            "description": "Fill search field",
-            "target": "input[type='search'], input[name*='search'], input[placeholder*='search'], .search-input",
-            "value": "search term",
-            "timeout": 10000
-        })
-        actions.append({
-            "type": "click",
-            "description": "Click search button",
-            "target": "button[type='submit'], .search-button, input[type='submit']",
-            "value": "",
-            "timeout": 10000
-        })
+    if "search" in hits:
+        actions.extend(_SEARCH_STEPS)
     
-    if "screenshot" in prompt_lower:
-        actions.append({
-            "type": "screenshot",
-            "description": "Take screenshot",
-            "target": "page",
-            "value": "",
-            "timeout": 5000
-        })
+    if "screenshot" in hits:
+        actions.append(_SCREENSHOT)
     
-    if "click" in prompt_lower:
-        actions.append({
-            "type": "click",
-            "description": "Click element",
-            "target": "button, a, .clickable",
-            "value": "",
-            "timeout": 10000
-        })
+    if "click" in hits:
+        actions.append(_CLICK)
     
     return {
         "actions": actions,
@@ -117,54 +234,62 @@ def generate_action_plan(prompt: str, website_url: str):
         "risk_level": "low"
     }
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the timestamp ticker and connect to Redis when configured"""
+    global redis_client
+    _refresh_now()
+    if REDIS_URL:
+        if REDIS_AVAILABLE:
+            redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+            print(f"🗄️ Storing sessions in Redis at {REDIS_URL}")
+        else:
+            print("⚠️ REDIS_URL is set but redis is not installed, keeping sessions in memory")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the Redis connection pool"""
+    if redis_client:
+        await redis_client.aclose()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Intelligent Web Tester API",
-        "version": "1.0.0",
-        "status": "running",
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return Response(_root_body, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "services": {
-            "api": "online",
-            "browser": "ready"
-        }
-    }
+    return Response(_health_body, media_type="application/json")
 
 @app.post("/api/tests/create", response_model=CreateTestResponse)
 async def create_test(request: CreateTestRequest):
     """Create a new test from natural language prompt"""
     try:
-        session_id = str(uuid.uuid4())
+        # 96 random bits from the OS CSPRNG, with no uuid.UUID to build and format
+        session_id = secrets.token_hex(12)
         
         # Generate action plan
         action_plan = generate_action_plan(request.prompt, request.website_url)
         
         # Store session
-        test_sessions[session_id] = {
+        await save_session({
             "id": session_id,
             "website_url": request.website_url,
             "prompt": request.prompt,
             "action_plan": action_plan,
             "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": _now_iso,
             "context": request.context or {}
-        }
+        })
         
-        return CreateTestResponse(
-            session_id=session_id,
-            action_plan=action_plan,
-            estimated_duration=action_plan["estimated_duration"],
-            risk_assessment=action_plan["risk_level"]
-        )
+        # Returned as a ready Response so FastAPI skips validating and re-encoding the nested plan
+        return ORJSONResponse({
+            "session_id": session_id,
+            "action_plan": action_plan,
+            "estimated_duration": action_plan["estimated_duration"],
+            "risk_assessment": action_plan["risk_level"]
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -173,57 +298,66 @@ async def create_test(request: CreateTestRequest):
 async def execute_test(request: ExecuteTestRequest):
     """Execute a test session"""
     try:
-        if request.session_id not in test_sessions:
+        session = await load_session(request.session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Test session not found")
         
-        session = test_sessions[request.session_id]
-        
         if session["status"] != "pending":
             raise HTTPException(status_code=400, detail=f"Test is already {session['status']}")
         
+        if not await claim_session(request.session_id):
+            raise HTTPException(status_code=400, detail="Test is already running")
+        
         # Update session status
         session["status"] = "running"
-        session["started_at"] = datetime.utcnow().isoformat()
+        session["started_at"] = _now_iso
+        await save_session(session)
         
         # Simulate execution (in a real implementation, this would trigger browser automation)
         # For now, we'll just mark it as completed after a short delay
         asyncio.create_task(simulate_execution(request.session_id))
         
-        return ExecuteTestResponse(
-            session_id=request.session_id,
-            status="running",
-            message="Test execution started"
-        )
+        return ORJSONResponse({
+            "session_id": request.session_id,
+            "status": "running",
+            "message": "Test execution started"
+        })
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Simulated run length in seconds; CI sets SIMULATE_DELAY=0 so runs complete at once
+SIMULATE_DELAY = float(os.getenv("SIMULATE_DELAY", "5"))
+
 async def simulate_execution(session_id: str):
     """Simulate test execution"""
-    await asyncio.sleep(5)  # Simulate execution time
+    if SIMULATE_DELAY:
+        await asyncio.sleep(SIMULATE_DELAY)  # Simulate execution time
     
-    if session_id in test_sessions:
-        test_sessions[session_id]["status"] = "completed"
-        test_sessions[session_id]["completed_at"] = datetime.utcnow().isoformat()
-        test_sessions[session_id]["result"] = {
+    session = await load_session(session_id)
+    if session is not None:
+        session["status"] = "completed"
+        session["completed_at"] = _now_iso
+        session["result"] = {
             "success": True,
             "message": "Test completed successfully",
             "screenshots": [],
-            "actions_completed": len(test_sessions[session_id]["action_plan"]["actions"])
+            "actions_completed": len(session["action_plan"]["actions"])
         }
+        await save_session(session)
 
 @app.get("/api/tests/{session_id}")
 async def get_test_results(session_id: str):
     """Get test results for a session"""
     try:
-        if session_id not in test_sessions:
+        session = await load_session(session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Test session not found")
         
-        session = test_sessions[session_id]
-        
-        return {
+        # Returned as a ready Response so the whole session isn't walked by jsonable_encoder first
+        return ORJSONResponse({
             "session": session,
             "execution_result": session.get("result"),
             "metrics": {
@@ -231,7 +365,7 @@ async def get_test_results(session_id: str):
                 "actions_completed": session["action_plan"]["total_steps"],
                 "success_rate": 100
             }
-        }
+        })
         
     except HTTPException:
         raise
@@ -242,19 +376,20 @@ async def get_test_results(session_id: str):
 async def get_test_status(session_id: str):
     """Get current status of a test"""
     try:
-        if session_id not in test_sessions:
+        state = await load_session_state(session_id)
+        if state is None:
             raise HTTPException(status_code=404, detail="Test session not found")
         
-        session = test_sessions[session_id]
+        status, total_steps = state
         
         return {
             "session_id": session_id,
-            "status": session["status"],
-            "progress": 100 if session["status"] == "completed" else 50 if session["status"] == "running" else 0,
-            "current_action": "Executing actions..." if session["status"] == "running" else None,
-            "completed_actions": session["action_plan"]["total_steps"] if session["status"] == "completed" else 0,
-            "total_actions": session["action_plan"]["total_steps"],
-            "estimated_remaining": 0 if session["status"] == "completed" else 30
+            "status": status,
+            "progress": 100 if status == "completed" else 50 if status == "running" else 0,
+            "current_action": "Executing actions..." if status == "running" else None,
+            "completed_actions": total_steps if status == "completed" else 0,
+            "total_actions": total_steps,
+            "estimated_remaining": 0 if status == "completed" else 30
         }
         
     except HTTPException:
@@ -268,9 +403,30 @@ if __name__ == "__main__":
     print("✅ Ready to process test requests!")
     print()
     
+    # Sessions only survive across processes when they live in Redis, so fan out to
+    # 2*cores+1 gunicorn workers in that case and stay single-process otherwise
+    if REDIS_URL and importlib.util.find_spec("gunicorn"):
+        workers = 2 * (os.cpu_count() or 1) + 1
+        print(f"👥 Running {workers} gunicorn workers (sessions shared via Redis)")
+        os.execv(sys.executable, [
+            sys.executable, "-m", "gunicorn", "working_backend:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(workers),
+            "--bind", "0.0.0.0:8000",
+            "--backlog", "65535",
+            "--preload"
+        ])
+    
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=8000,
-        log_level="info"
+        # The kernel caps this at net.core.somaxconn; raise that too
+        # (sysctl -w net.core.somaxconn=65535) or bursts still get SYN drops
+        backlog=65535,
+        # No per-request access line on stdout; uvloop/httptools are used when installed
+        log_level="warning",
+        access_log=False,
+        loop="auto",
+        http="auto"
     )
@@ -24,7 +24,9 @@ def test_intelligent_tester():
     
     try:
         print("📡 Sending request to intelligent tester backend...")
-        response = requests.post('http://localhost:8000/api/tests/create', json=test_data)
+        # Calls made through the session reuse one keep-alive connection
+        with requests.Session() as session:
+            response = session.post('http://localhost:8000/api/tests/create', json=test_data)
         
         print(f"✅ Response Status: {response.status_code}")
         